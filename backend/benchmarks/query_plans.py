@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import random
+import tempfile
+import textwrap
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.answers.models import Answer
+from domuwa.answers.services import AnswerServices
+from domuwa.database import create_db_and_tables
+from domuwa.game_types.services import GameTypeServices
+from domuwa.players.models import Player
+from domuwa.qna_categories.services import QnACategoryServices
+from domuwa.questions.models import Question
+from domuwa.questions.services import QuestionServices
+from domuwa.users.models import User
+from tests.utils import explain_query_plan, record_queries
+
+Query = Callable[[AsyncSession], Awaitable[object]]
+
+
+async def seed(engine: AsyncEngine, rows: int) -> list[int]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await GameTypeServices().populate(session)
+        await QnACategoryServices().populate(session)
+        game_type_ids = [
+            model.id for model in await GameTypeServices().get_all(session)
+        ]
+        game_category_ids = [
+            model.id for model in await QnACategoryServices().get_all(session)
+        ]
+
+    def random_row(text: str) -> dict:
+        return {
+            "text": text,
+            "excluded": random.random() < 0.1,
+            "deleted": random.random() < 0.2,
+            "author_id": 1,
+            "game_type_id": random.choice(game_type_ids),
+            "game_category_id": random.choice(game_category_ids),
+        }
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{"username": "bench", "hashed_password": ""}])
+        await conn.execute(insert(Player), [{"id": 1}])
+        await conn.execute(
+            insert(Question), [random_row(f"Question {i}") for i in range(rows)]
+        )
+        await conn.execute(
+            insert(Answer), [random_row(f"Answer {i}") for i in range(rows)]
+        )
+        await conn.exec_driver_sql("ANALYZE")
+    return game_type_ids  # type: ignore
+
+
+async def run(engine: AsyncEngine, query: Query, repeat: int) -> tuple[float, str]:
+    with record_queries(engine) as queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            async with AsyncSession(engine) as session:
+                await query(session)
+        elapsed = (time.perf_counter() - start) / repeat
+
+    plan = await explain_query_plan(engine, *queries[-1])
+    return elapsed, textwrap.indent(plan, "    ")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Query plans and timings of the question and answer lists",
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'bench.sqlite3'}"
+        )
+        await create_db_and_tables(engine)
+        game_type_ids = await seed(engine, args.rows)
+        game_type_id = game_type_ids[0]
+
+        queries: dict[str, Query] = {
+            "answers": lambda session: AnswerServices().get_all(session, 1_000),
+            "questions": lambda session: QuestionServices().get_all(session, 1_000),
+            "game type questions": lambda session: GameTypeServices.get_all_questions(
+                session, game_type_id, 1_000
+            ),
+            "question search": lambda session: QuestionServices().search(
+                "question 42", session, 25
+            ),
+        }
+        for name, query in queries.items():
+            elapsed, plan = await run(engine, query, args.repeat)
+            print(f"{name}: {elapsed * 1_000:.2f} ms")
+            print(plan)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.database import (
+    SQLITE_PRAGMAS,
+    create_db_and_tables,
+    get_async_database_url,
+    set_sqlite_pragmas,
+)
+from domuwa.game_types.services import GameTypeServices
+from domuwa.players.models import Player
+from domuwa.qna_categories.services import QnACategoryServices
+from domuwa.questions.models import Question
+from domuwa.questions.services import QuestionServices
+from domuwa.users.models import User
+
+
+async def seed(engine: AsyncEngine, rows: int) -> dict:
+    # every profile runs on a new database
+    GameTypeServices.invalidate_cache()
+    QnACategoryServices.invalidate_cache()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await GameTypeServices().populate(session)
+        await QnACategoryServices().populate(session)
+        game_type = (await GameTypeServices().get_all(session))[0]
+        game_category = (await QnACategoryServices().get_all(session))[0]
+
+    question_data = {
+        "author_id": 1,
+        "game_type_id": game_type.id,
+        "game_category_id": game_category.id,
+    }
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{"username": "bench", "hashed_password": ""}])
+        await conn.execute(insert(Player), [{"id": 1}])
+        await conn.execute(
+            insert(Question),
+            [question_data | {"text": f"Question {i}"} for i in range(rows)],
+        )
+    return question_data
+
+
+async def run(
+    engine: AsyncEngine,
+    question_data: dict,
+    writers: int,
+    readers: int,
+    duration: float,
+) -> tuple[int, int, int]:
+    deadline = time.perf_counter() + duration
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+
+    async def write(worker: int) -> None:
+        while time.perf_counter() < deadline:
+            try:
+                async with AsyncSession(engine) as session:
+                    text = f"Question {worker}-{counts['writes']}"
+                    session.add(Question(text=text, **question_data))
+                    await session.commit()
+                counts["writes"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+    async def read() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                async with AsyncSession(engine) as session:
+                    await QuestionServices().get_all(session, 100)
+                counts["reads"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+    await asyncio.gather(
+        *(write(worker) for worker in range(writers)),
+        *(read() for _ in range(readers)),
+    )
+    return counts["writes"], counts["reads"], counts["errors"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput of concurrent reads and writes with and without "
+        "the SQLite PRAGMAs from the settings",
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for name, pragmas in (("defaults", {}), ("profile", SQLITE_PRAGMAS)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = create_async_engine(
+                get_async_database_url(f"sqlite:///{Path(tmp_dir) / 'bench.sqlite3'}"),
+                pool_size=args.writers + args.readers,
+            )
+            set_sqlite_pragmas(engine, pragmas)
+            await create_db_and_tables(engine)
+            question_data = await seed(engine, args.rows)
+
+            writes, reads, errors = await run(
+                engine, question_data, args.writers, args.readers, args.duration
+            )
+            print(
+                f"{name}: {writes / args.duration:.0f} writes/s, "
+                f"{reads / args.duration:.0f} reads/s, {errors} errors"
+            )
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
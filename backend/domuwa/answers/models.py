@@ -1,8 +1,10 @@
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 from domuwa.answers.constants import TEXT_MAX_LEN, TEXT_MIN_LEN
+from domuwa.core.search import FullTextSearch
 
 if TYPE_CHECKING:
     from domuwa.game_types.models import GameType
@@ -13,13 +15,40 @@ if TYPE_CHECKING:
 
 class Answer(SQLModel, table=True):
     __tablename__ = "answer"
+    __table_args__ = (
+        Index(
+            "ix_answer_game_type_id_deleted_excluded_id",
+            "game_type_id",
+            "deleted",
+            "excluded",
+            "id",
+        ),
+        # partial indexes over the latest versions that were not deleted, used by the
+        # list queries
+        Index(
+            "ix_answer_latest_excluded_id",
+            "excluded",
+            "id",
+            sqlite_where=text("is_latest = 1 AND deleted = 0"),
+            postgresql_where=text("is_latest = true AND deleted = false"),
+        ),
+        Index(
+            "ix_answer_latest_game_type_id_id",
+            "game_type_id",
+            "id",
+            sqlite_where=text("is_latest = 1 AND deleted = 0"),
+            postgresql_where=text("is_latest = true AND deleted = false"),
+        ),
+    )
 
     id: int | None = Field(None, primary_key=True)
     text: str = Field(min_length=TEXT_MIN_LEN, max_length=TEXT_MAX_LEN)
-    excluded: bool = Field(False, index=True)
-    deleted: bool = Field(False, index=True)
+    excluded: bool = False
+    deleted: bool = False
+    # false once the row was replaced by a newer version
+    is_latest: bool = True
 
-    author_id: Optional[int] = Field(None, foreign_key="player.id")
+    author_id: Optional[int] = Field(None, foreign_key="player.id", index=True)
     author: Optional["Player"] = Relationship(back_populates="answers")
 
     game_type_id: Optional[int] = Field(None, foreign_key="game_type.id")
@@ -28,7 +57,11 @@ class Answer(SQLModel, table=True):
     game_category_id: Optional[int] = Field(None, foreign_key="qna_category.id")
     game_category: Optional["QnACategory"] = Relationship(back_populates="answers")
 
-    prev_version_id: Optional[int] = Field(None, foreign_key="answer.id")
+    prev_version_id: Optional[int] = Field(
+        None,
+        foreign_key="answer.id",
+        index=True,
+    )
     prev_version: Optional["Answer"] = Relationship(
         back_populates="next_versions",
         sa_relationship_kwargs={"remote_side": "Answer.id"},
@@ -37,3 +70,6 @@ class Answer(SQLModel, table=True):
 
     question_id: Optional[int] = Field(None, foreign_key="question.id", nullable=True)
     question: Optional["Question"] = Relationship(back_populates="answers")
+
+
+answer_search = FullTextSearch(Answer)
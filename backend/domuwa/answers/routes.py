@@ -1,12 +1,13 @@
 import logging
+from collections.abc import Sequence
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
-from domuwa.answers.models import Answer
+from domuwa.answers.models import Answer, answer_search
 from domuwa.answers.schemas import AnswerCreate, AnswerRead, AnswerUpdate
 from domuwa.answers.services import AnswerServices
 from domuwa.auth import User
@@ -24,12 +25,14 @@ class AnswerRouter(
     services = AnswerServices()
     logger = logging.getLogger(__name__)
     db_model_type_name = Answer.__name__
+    list_load_options = AnswerServices.read_options
+    detail_load_options = AnswerServices.read_options
 
     @override
     async def get_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         model = await super().get_by_id(model_id, session, user)
@@ -40,23 +43,85 @@ class AnswerRouter(
 
         return model
 
+    @override
+    def _init_api_routes(self):
+        # before the single model routes, so `search` is not taken for a model id
+        self.router.add_api_route(
+            "/search",
+            self.search,
+            methods=["GET"],
+            response_model=list[self.response_model],  # type: ignore
+        )
+        super()._init_api_routes()
+        self._add_get_history_route()
+
+    async def search(
+        self,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+        response: Response,
+        query: Annotated[str, Query(alias="q", min_length=1)],
+        page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
+    ):
+        # best matches first, `after` takes the cursor of the previous page
+        return await self._search(
+            response,
+            self.services.search(
+                query,
+                session,
+                page_size,
+                user.is_staff,
+                after=after,
+                options=self.list_load_options,
+            ),
+            page_size,
+            answer_search,
+        )
+
+    async def get_history(
+        self,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+        max_depth: Annotated[
+            int, Query(ge=1, le=AnswerServices.max_history_depth)
+        ] = AnswerServices.max_history_depth,
+    ):
+        return await self._get_history(
+            model_id, session, max_depth, include_deleted=user.is_staff
+        )
+
     @override
     async def get_all(
         self,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
+        response: Response,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
     ):
         offset = (page - 1) * page_size
         include_deleted = user.is_staff
-        return await self.services.get_all(session, offset, page_size, include_deleted)
+        return await self._paginate(
+            response,
+            self.services.get_all(
+                session,
+                offset,
+                page_size,
+                include_deleted,
+                after=after,
+                options=self.list_load_options,
+            ),
+            page_size,
+        )
 
     @override
     async def create(
         self,
         model: AnswerCreate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         model.author_id = user.id
@@ -67,12 +132,34 @@ class AnswerRouter(
         self,
         model_id: int,
         model_update: AnswerUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         model_update.author_id = user.id
         return await super().update(model_id, model_update, session, user)
 
+    @override
+    async def bulk_create(
+        self,
+        models: Sequence[AnswerCreate],
+        session: AsyncSession,
+        user: User,
+    ):
+        for model in models:
+            model.author_id = user.id
+        return await super().bulk_create(models, session, user)
+
+    @override
+    async def bulk_update(
+        self,
+        model_updates: Sequence[tuple[int, AnswerUpdate]],
+        session: AsyncSession,
+        user: User,
+    ):
+        for _, model_update in model_updates:
+            model_update.author_id = user.id
+        return await super().bulk_update(model_updates, session, user)
+
 
 def get_answers_router():
     return AnswerRouter().router
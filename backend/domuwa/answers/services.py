@@ -1,85 +1,98 @@
 import logging
 from typing import Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
-from domuwa.answers.models import Answer
+from domuwa.answers.models import Answer, answer_search
 from domuwa.answers.schemas import AnswerCreate, AnswerUpdate
-from domuwa.core.services import CommonServices
+from domuwa.core.pagination import KeysetPagination
+from domuwa.core.services import CommonServices, CommonServicesForVersionedModels
+from domuwa.players.models import Player
+from domuwa.players.services import PlayerServices, authored_changes
 
 
-class AnswerServices(CommonServices[AnswerCreate, AnswerUpdate, Answer]):
+class AnswerServices(
+    CommonServicesForVersionedModels[AnswerCreate, AnswerUpdate, Answer]
+):
     db_model_type = Answer
     logger = logging.getLogger(__name__)
+    pagination = KeysetPagination("excluded", "id", types=(bool, int))
+    read_options = (
+        joinedload(Answer.author).joinedload(Player.user),  # type: ignore
+        joinedload(Answer.game_type),  # type: ignore
+        joinedload(Answer.game_category),  # type: ignore
+    )
 
     @override
     async def get_all(
         self,
-        session: Session,
+        session: AsyncSession,
         offset: int = 0,
         limit: int = 25,
         include_deleted: bool = False,
+        *,
+        after: str | None = None,
+        options: Sequence[ORMOption] = (),
     ) -> Sequence[Answer]:
-        stmt = select(self.db_model_type)
+        stmt = (
+            select(self.db_model_type).options(*options).where(Answer.is_latest == True)  # noqa: E712
+        )
 
         if not include_deleted:
             stmt = stmt.where(Answer.deleted == False)  # noqa: E712
 
         # TODO: add grouping by excluded
-        stmt = stmt.offset(offset).limit(limit).order_by(Answer.excluded)  # type: ignore
-        return session.exec(stmt).all()
+        stmt = self.pagination.paginate(stmt, Answer, offset, limit, after)
+        result = await session.exec(stmt)
+        return result.all()
+
+    async def search(
+        self,
+        query: str,
+        session: AsyncSession,
+        limit: int = 25,
+        include_deleted: bool = False,
+        *,
+        after: str | None = None,
+        options: Sequence[ORMOption] = (),
+    ) -> Sequence[tuple[Answer, float]]:
+        where = [Answer.is_latest == True]  # noqa: E712
+        if not include_deleted:
+            where.append(Answer.deleted == False)  # noqa: E712
+        return await answer_search.search(
+            query, session, limit, after, where=where, options=options
+        )
 
     @override
     async def update(
         self,
         model: Answer,
         model_update: AnswerUpdate,
-        session: Session,
+        session: AsyncSession,
     ) -> Answer:
         await self.validate_related_models_exist(model, session)
-
-        if model_update.excluded is not None and model.excluded != model_update.excluded:
-            model.excluded = model_update.excluded
-            session.add(model)
-            session.refresh(model)
-            return model
-
-        session.autoflush = False
-
-        update_data = model_update.model_dump(exclude_unset=True)
-        model_data = model.model_dump(exclude={"id"}) | update_data
-        updated_model = Answer(**model_data)
-
-        updated_model.prev_version = model
-        model.next_versions.append(updated_model)
-
-        question = model.question
-        if question is not None:
-            question.answers.remove(model)
-            question.answers.append(updated_model)
-            session.add(question)
-
-        session.add(updated_model)
-        session.add(model)
-        session.commit()
-        session.refresh(updated_model)
-        session.autoflush = True
-        return updated_model
+        return await super().update(model, model_update, session)
 
     @override
     async def save(
         self,
         model: AnswerCreate | Answer,
-        session: Session,
+        session: AsyncSession,
     ) -> Answer:
         await self.validate_related_models_exist(model, session)
+        if not isinstance(model, Answer):
+            model = Answer.model_validate(model)
+        await self.apply_create(model, session)
         return await super().save(model, session)
 
     async def validate_related_models_exist(
         self,
         model: AnswerCreate | AnswerUpdate | Answer,
-        session: Session,
+        session: AsyncSession,
     ) -> None:
         from domuwa.game_types.services import GameTypeServices
         from domuwa.qna_categories.services import QnACategoryServices
@@ -97,8 +110,49 @@ class AnswerServices(CommonServices[AnswerCreate, AnswerUpdate, Answer]):
             )
 
     @override
-    async def delete(self, model: Answer, session: Session):
+    async def delete(self, model: Answer, session: AsyncSession):
+        await self.apply_delete(model, session)
+        await session.commit()
+        self.logger.debug("marked %s(id=%d) as deleted", Answer.__name__, model.id)  # type: ignore
+
+    @override
+    async def apply_create(self, model: Answer, session: AsyncSession) -> None:
+        await super().apply_create(model, session)
+        await PlayerServices().add_authored(Answer, authored_changes([model]), session)
+
+    @override
+    async def apply_delete(self, model: Answer, session: AsyncSession) -> None:
+        if model.is_latest:
+            await PlayerServices().add_authored(
+                Answer, authored_changes(removed=[model]), session
+            )
         model.deleted = True
         session.add(model)
-        session.commit()
-        self.logger.debug("marked %s(id=%d) as deleted", Answer.__name__, model.id)  # type: ignore
+
+    @override
+    async def apply_update(
+        self,
+        model: Answer,
+        update_data: dict,
+        session: AsyncSession,
+    ) -> Answer:
+        updated_model = await super().apply_update(model, update_data, session)
+        if updated_model is not model:
+            # the new version replaces the old one in its question
+            model.question_id = None
+            await PlayerServices().add_authored(
+                Answer, authored_changes([updated_model], [model]), session
+            )
+        return updated_model
+
+    @override
+    def get_related_services(self) -> dict[str, CommonServices]:
+        from domuwa.game_types.services import GameTypeServices
+        from domuwa.qna_categories.services import QnACategoryServices
+        from domuwa.questions.services import QuestionServices
+
+        return {
+            "game_type_id": GameTypeServices(),
+            "game_category_id": QnACategoryServices(),
+            "question_id": QuestionServices(),
+        }
@@ -1,15 +1,17 @@
 import logging
+import secrets
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, HTTPException, Query, Security, WebSocketException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from domuwa.auth.schemas import TokenData
-from domuwa.auth.security import verify_password
+from domuwa.auth.security import password_hasher
 from domuwa.config import settings
 from domuwa.database import get_db_session
+from domuwa.users.cache import user_cache
 from domuwa.users.models import User
 from domuwa.users.services import UserServices
 
@@ -26,12 +28,12 @@ CredentialsException = HTTPException(
 user_services = UserServices()
 
 
-async def authenticate_user(username: str, password: str, session: Session):
+async def authenticate_user(username: str, password: str, session: AsyncSession):
     user = await user_services.get_by_username(username, session)
     if user is None:
         logger.debug("%s(username=%s) not found", User.__name__, username)
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         logger.debug("%s(username=%s) incorrect password", User.__name__, username)
         return False
     return user
@@ -39,7 +41,7 @@ async def authenticate_user(username: str, password: str, session: Session):
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[Session, Depends(get_db_session)],
+    session: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     try:
         payload = jwt.decode(
@@ -55,10 +57,15 @@ async def get_current_user(
         raise CredentialsException
 
     token_data = TokenData(username=username)
+    cached_user = user_cache.get(token_data.username)  # type: ignore
+    if cached_user is not None:
+        return await session.merge(cached_user, load=False)
+
     user = await user_services.get_by_username(token_data.username, session)  # type: ignore
     if user is None:
         raise CredentialsException
 
+    user_cache.set(user)
     return user
 
 
@@ -74,6 +81,22 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_websocket_user(
+    token: Annotated[str, Query()],
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+):
+    # browsers cannot set headers on websockets, so the token is sent as a query param
+    try:
+        current_user = await get_current_user(token, session)
+    except HTTPException as exc:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, exc.detail)
+
+    if not current_user.is_active:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, "Inactive user")
+
+    return current_user
+
+
 async def get_admin_user(
     admin_user: Annotated[User, Security(get_current_active_user)],
 ):
@@ -84,3 +107,17 @@ async def get_admin_user(
         )
 
     return admin_user
+
+
+async def authorize_metrics_scrape(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+):
+    # Prometheus scrapes with METRICS_TOKEN as its bearer token, anybody else has to
+    # be an admin, like for the rest of the metrics
+    if settings.METRICS_TOKEN and secrets.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        return
+    current_user = await get_current_user(token, session)
+    await get_admin_user(await get_current_active_user(current_user))
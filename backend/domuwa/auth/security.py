@@ -1,13 +1,22 @@
+import asyncio
 import datetime as dt
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
 
 import jwt
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
 from domuwa.config import settings
+from domuwa.core.exceptions import ServiceOverloadedError
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ResultT = TypeVar("ResultT")
+
 
 def create_access_token(data: dict, expires_delta: dt.timedelta | None = None):
     to_encode = data.copy()
@@ -48,3 +57,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    def __init__(self, max_workers: int, max_queue_size: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher",
+            )
+        return self._executor
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func: Callable[..., ResultT], *args) -> ResultT:
+        # reject instead of queueing unboundedly behind busy workers
+        if self._pending >= self.max_workers + self.max_queue_size:
+            err_msg = f"password hasher is busy ({self._pending} pending)"
+            logger.warning(err_msg)
+            raise ServiceOverloadedError(err_msg)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASHER_MAX_WORKERS,
+    settings.PASSWORD_HASHER_MAX_QUEUE_SIZE,
+)
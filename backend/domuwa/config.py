@@ -1,15 +1,48 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     SESSION_MIDDLEWARE_KEY: str = "gucci"
     DATABASE_URL: str = "sqlite:///db.sqlite3"
+    # replicas the GET routes read from, reads go to DATABASE_URL when empty
+    DATABASE_READ_URLS: list[str] = []
+    # pool of every engine, the replicas get one each
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    # -1 keeps the connections open for good
+    DATABASE_POOL_RECYCLE_SECONDS: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30
+    # PRAGMAs set on every new SQLite connection, WAL lets reads go on during writes
+    SQLITE_JOURNAL_MODE: Literal["DELETE", "TRUNCATE", "PERSIST", "WAL"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # negative sizes are in KiB
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
     # noinspection PyDataclass
     ALLOWED_ORIGINS: list[str] = ["*"]
     SECRET_KEY: str = "secret"
     HASH_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASHER_MAX_WORKERS: int = 2
+    PASSWORD_HASHER_MAX_QUEUE_SIZE: int = 32
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: float = 60
+    # `memory://` for a single worker, `tcp://host:port` of `domuwa.game_rooms.broker`
+    GAME_ROOM_BROADCAST_URL: str = "memory://"
+    BULK_MAX_SIZE: int = 1000
+    # cards committed at a time by the question import
+    IMPORT_CHUNK_SIZE: int = 1000
+    # the global leaderboard is reloaded after this, to pick up other workers' scores
+    LEADERBOARD_MAX_AGE_SECONDS: float = 60
+    LEADERBOARD_MAX_GAME_ROOMS: int = 1024
+    # bearer token Prometheus scrapes `/metrics` with, admins' tokens work as well
+    METRICS_TOKEN: str = ""
     DEBUG: bool = False
 
     model_config = SettingsConfigDict(
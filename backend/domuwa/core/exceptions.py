@@ -15,6 +15,22 @@ class InvalidModelInputError(Exception):
     pass
 
 
+class ServiceOverloadedError(Exception):
+    pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class GameRoomError(Exception):
+    pass
+
+
+class StaleRoundError(GameRoomError):
+    pass
+
+
 class ModelNotFoundHttpException(HTTPException):
     status_code = status.HTTP_404_NOT_FOUND
 
@@ -34,3 +50,28 @@ class InvalidRequestBodyHttpException(HTTPException):
 
     def __init__(self, detail: str) -> None:
         super().__init__(self.status_code, detail)
+
+
+class InvalidCursorHttpException(HTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(self.status_code, detail)
+
+
+class StaleRoundHttpException(HTTPException):
+    status_code = status.HTTP_409_CONFLICT
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(self.status_code, detail)
+
+
+class ServiceUnavailableHttpException(HTTPException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, detail: str, retry_after: int = 1) -> None:
+        super().__init__(
+            self.status_code,
+            detail,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any, TypeVar
+
+from sqlalchemy import tuple_
+from sqlmodel import SQLModel
+from sqlmodel.sql.expression import SelectOfScalar
+
+from domuwa.core.exceptions import InvalidCursorError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+
+class KeysetPagination:
+    def __init__(
+        self,
+        *sort_keys: str,
+        types: Sequence[type],
+        descending: bool = False,
+    ) -> None:
+        # last key has to be unique (e.g. `id`), so that rows are totally ordered,
+        # the types of the keys are what a cursor has to hold
+        assert len(types) == len(sort_keys)
+        self.sort_keys = sort_keys
+        self.types = tuple(types)
+        self.descending = descending
+
+    def paginate(
+        self,
+        stmt: SelectOfScalar[ModelT],
+        model_type: type[SQLModel],
+        offset: int,
+        limit: int,
+        after: str | None = None,
+    ) -> SelectOfScalar[ModelT]:
+        columns = [getattr(model_type, key) for key in self.sort_keys]
+        if self.descending:
+            stmt = stmt.order_by(*(column.desc() for column in columns))
+        else:
+            stmt = stmt.order_by(*columns)
+
+        if after is None:
+            return stmt.offset(offset).limit(limit)
+
+        last_values = self.decode_cursor(after)
+        if self.descending:
+            stmt = stmt.where(tuple_(*columns) < tuple_(*last_values))
+        else:
+            stmt = stmt.where(tuple_(*columns) > tuple_(*last_values))
+        return stmt.limit(limit)
+
+    def next_cursor(self, models: Sequence[SQLModel], limit: int) -> str | None:
+        if len(models) < limit:
+            return None
+        return self.encode_cursor(models[-1])
+
+    def encode_cursor(self, model: SQLModel) -> str:
+        return self.encode_values([getattr(model, key) for key in self.sort_keys])
+
+    @staticmethod
+    def encode_values(values: Sequence[Any]) -> str:
+        data = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> list[Any]:
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(data)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+            raise InvalidCursorError(f"invalid cursor: {cursor!r}") from exc
+
+        if (
+            not isinstance(values, list)
+            or len(values) != len(self.sort_keys)
+            or not all(map(_has_type, values, self.types))
+        ):
+            raise InvalidCursorError(f"invalid cursor: {cursor!r}")
+        return values
+
+
+def _has_type(value: object, value_type: type) -> bool:
+    # JSON has no separate bools and floats without a fraction
+    if isinstance(value, bool):
+        return value_type is bool
+    if value_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, value_type)
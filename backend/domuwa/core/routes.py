@@ -1,15 +1,25 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Annotated, Generic, TypeVar, final
-
-from fastapi import APIRouter, Depends, Query, status
-from sqlmodel import Session
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Sequence
+from contextlib import aclosing
+from typing import Annotated, Generic, TypeVar, final, get_args
+
+from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import create_model
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.responses import Response
 from typing_extensions import override
 
 from domuwa import auth
 from domuwa.auth import User
+from domuwa.config import settings
 from domuwa.core.exceptions import (
+    InvalidCursorError,
+    InvalidCursorHttpException,
     InvalidModelInputError,
     InvalidRequestBodyHttpException,
     ModelNotFoundError,
@@ -17,16 +27,19 @@ from domuwa.core.exceptions import (
     RelationModelNotFoundError,
     RelationModelNotFoundHttpException,
 )
-from domuwa.core.schemas import APISchemaResponseModel
+from domuwa.core.pagination import NEXT_CURSOR_HEADER, KeysetPagination
+from domuwa.core.schemas import APISchemaModel, APISchemaResponseModel, BulkResult
+from domuwa.core.search import FullTextSearch
 from domuwa.core.services import (
     CommonServices,
     CreateModelT,
     DbModelT,
     UpdateModelT,
 )
-from domuwa.database import get_db_session
+from domuwa.database import get_db_session, get_session_engine
 
 ServicesT = TypeVar("ServicesT", bound=CommonServices, contravariant=True)
+SQLModelT = TypeVar("SQLModelT", bound=SQLModel)
 
 
 class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
@@ -37,6 +50,9 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
     services: ServicesT
     logger: logging.Logger
     db_model_type_name: str
+    # loaders for relationships serialized by the list and single model responses
+    list_load_options: Sequence[ORMOption] = ()
+    detail_load_options: Sequence[ORMOption] = ()
     _lookup = "{model_id}"
 
     def __init__(self) -> None:
@@ -47,10 +63,11 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
     async def get_instance(
         self,
         model_id: int,
-        session: Session = Depends(get_db_session),
+        session: AsyncSession = Depends(get_db_session),
+        options: Sequence[ORMOption] = (),
     ) -> DbModelT:
         try:
-            return await self.services.get_by_id(model_id, session)
+            return await self.services.get_by_id(model_id, session, options)
         except ModelNotFoundError as exc:
             err_msg = f"{self.db_model_type_name}(id={model_id}) not found"
             self.logger.warning(err_msg)
@@ -63,9 +80,65 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
     async def _get_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
-        return await self.get_instance(model_id, session)
+        return await self.get_instance(model_id, session, self.detail_load_options)
+
+    async def _get_history(
+        self,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        max_depth: int | None = None,
+        include_deleted: bool = True,
+    ) -> StreamingResponse:
+        # the versions are streamed from their own session, the first one is read
+        # before the response starts, so a missing model is still a 404
+        history = self._stream_history(model_id, get_session_engine(session), max_depth)
+        model = await anext(history, None)
+        if model is None:
+            err_msg = f"{self.db_model_type_name}(id={model_id}) not found"
+            self.logger.warning(err_msg)
+            raise ModelNotFoundHttpException(err_msg)
+        if model.deleted and not include_deleted:  # type: ignore
+            await history.aclose()
+            err_msg = f"got {self.db_model_type_name}(id={model_id}) to get history of, but it was deleted"
+            self.logger.warning(err_msg)
+            raise ModelNotFoundHttpException(err_msg)
+
+        return StreamingResponse(
+            self._to_json_array(model, history), media_type="application/json"
+        )
+
+    async def _stream_history(
+        self,
+        model_id: int,
+        engine: AsyncEngine,
+        max_depth: int | None,
+    ) -> AsyncGenerator[DbModelT, None]:
+        async with (
+            AsyncSession(engine, expire_on_commit=False) as session,
+            aclosing(
+                self.services.stream_history(  # type: ignore
+                    model_id, session, max_depth, self.list_load_options
+                )
+            ) as models,
+        ):
+            async for model in models:
+                yield model
+
+    async def _to_json_array(
+        self,
+        first_model: DbModelT,
+        models: AsyncIterator[DbModelT],
+    ) -> AsyncIterator[str]:
+        yield "[" + self._dump_response(first_model)
+        async for model in models:
+            yield "," + self._dump_response(model)
+        yield "]"
+
+    def _dump_response(self, model: DbModelT) -> str:
+        response_model = self.response_model.model_validate(model, from_attributes=True)
+        return response_model.model_dump_json(by_alias=True)
 
     @abstractmethod
     async def get_all(self, *args, **kwargs):
@@ -73,12 +146,61 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
 
     async def _get_all(
         self,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        response: Response,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
     ):
         offset = (page - 1) * page_size
-        return await self.services.get_all(session, offset, page_size)
+        return await self._paginate(
+            response,
+            self.services.get_all(
+                session,
+                offset,
+                page_size,
+                after=after,
+                options=self.list_load_options,
+            ),
+            page_size,
+        )
+
+    async def _paginate(
+        self,
+        response: Response,
+        query: Awaitable[Sequence[SQLModelT]],
+        page_size: int,
+        pagination: KeysetPagination | None = None,
+    ) -> Sequence[SQLModelT]:
+        try:
+            models = await query
+        except InvalidCursorError as exc:
+            self.logger.warning("%s", exc)
+            raise InvalidCursorHttpException(str(exc)) from exc
+
+        pagination = pagination or self.services.pagination
+        next_cursor = pagination.next_cursor(models, page_size)
+        if next_cursor is not None:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return models
+
+    async def _search(
+        self,
+        response: Response,
+        query: Awaitable[Sequence[tuple[SQLModelT, float]]],
+        page_size: int,
+        search: FullTextSearch,
+    ) -> list[SQLModelT]:
+        try:
+            results = await query
+        except InvalidCursorError as exc:
+            self.logger.warning("%s", exc)
+            raise InvalidCursorHttpException(str(exc)) from exc
+
+        next_cursor = search.next_cursor(results, page_size)
+        if next_cursor is not None:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [model for model, _ in results]
 
     @abstractmethod
     async def create(self, *args, **kwargs):
@@ -87,7 +209,7 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
     async def _create(
         self,
         model: CreateModelT,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         self.logger.debug(
             "got %s(%s) to create",
@@ -95,13 +217,14 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
             model,
         )
         try:
-            return await self.services.create(model, session)
+            created_model = await self.services.create(model, session)
         except InvalidModelInputError as exc:
             err_msg = f"{self.db_model_type_name} cannot be created: {exc}"
             self.logger.warning(err_msg)
             raise InvalidRequestBodyHttpException(err_msg) from exc
         except RelationModelNotFoundError as exc:
             raise RelationModelNotFoundHttpException(exc.message) from exc
+        return await self._load_detail(created_model, session)
 
     @abstractmethod
     async def update(self, *args, **kwargs):
@@ -111,7 +234,7 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
         self,
         model_id: int,
         model_update: UpdateModelT,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         self.logger.debug(
             "got %s(%s) to update %s(id=%d)",
@@ -122,7 +245,7 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
         )
         model = await self.get_instance(model_id, session)
         try:
-            return await self.services.update(model, model_update, session)
+            updated_model = await self.services.update(model, model_update, session)
         except InvalidModelInputError as exc:
             err_msg = (
                 f"{self.db_model_type_name}(id={model_id}) cannot be updated: {exc}"
@@ -132,6 +255,7 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
         except RelationModelNotFoundError as exc:
             self.logger.warning(exc.message)
             raise RelationModelNotFoundHttpException(exc.message) from exc
+        return await self._load_detail(updated_model, session)
 
     @abstractmethod
     async def delete(self, *args, **kwargs):
@@ -140,7 +264,7 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
     async def _delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         self.logger.debug(
             "got %s(id=%d) to delete",
@@ -150,6 +274,85 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
         model = await self.get_instance(model_id, session)
         return await self.services.delete(model, session)
 
+    async def _bulk_create(
+        self,
+        models: Sequence[CreateModelT],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+    ):
+        results = await self.services.create_many(models, session)
+        return self._get_bulk_results(results, status.HTTP_201_CREATED)
+
+    async def _bulk_update(
+        self,
+        model_updates: Sequence[tuple[int, UpdateModelT]],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+    ):
+        results = await self.services.update_many(model_updates, session)
+        return self._get_bulk_results(results, status.HTTP_200_OK)
+
+    async def _bulk_delete(
+        self,
+        model_ids: Sequence[int],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+    ):
+        results = await self.services.delete_many(model_ids, session)
+        return self._get_bulk_results(results, status.HTTP_204_NO_CONTENT)
+
+    def _get_bulk_results(
+        self,
+        results: Sequence[SQLModel | Exception],
+        status_code: int,
+    ) -> list[BulkResult]:
+        bulk_results = []
+        for index, result in enumerate(results):
+            match result:
+                case ModelNotFoundError():
+                    bulk_result = BulkResult(
+                        index=index,
+                        status_code=ModelNotFoundHttpException.status_code,
+                        detail=str(result),
+                    )
+                case RelationModelNotFoundError():
+                    bulk_result = BulkResult(
+                        index=index,
+                        status_code=RelationModelNotFoundHttpException.status_code,
+                        detail=result.message,
+                    )
+                case InvalidModelInputError():
+                    bulk_result = BulkResult(
+                        index=index,
+                        status_code=InvalidRequestBodyHttpException.status_code,
+                        detail=f"{self.db_model_type_name} cannot be saved: {result}",
+                    )
+                case SQLModel():
+                    bulk_result = BulkResult(
+                        index=index,
+                        id=result.id,  # type: ignore
+                        status_code=status_code,
+                    )
+                case _:
+                    raise result
+            bulk_results.append(bulk_result)
+        return bulk_results
+
+    def _get_schema_types(self) -> tuple[type[APISchemaModel], type[APISchemaModel]]:
+        # create and update schemas the router was parametrized with
+        for cls in type(self).__mro__:
+            for base in getattr(cls, "__orig_bases__", ()):
+                args = get_args(base)
+                if len(args) == 4 and all(isinstance(arg, type) for arg in args):
+                    return args[1], args[2]
+        raise TypeError(f"{type(self).__name__} has no schema types")
+
+    async def _load_detail(self, model: DbModelT, session: AsyncSession) -> DbModelT:
+        if not self.detail_load_options:
+            return model
+        return await self.get_instance(
+            model.id,  # type: ignore
+            session,
+            self.detail_load_options,
+        )
+
     def _init_api_routes(self):
         self._add_create_route()
         self._add_get_all_route()
@@ -182,6 +385,14 @@ class BaseRouter(ABC, Generic[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
             response_model=self.response_model,
         )
 
+    def _add_get_history_route(self):
+        self.router.add_api_route(
+            f"/{self._lookup}/history",
+            self.get_history,  # type: ignore
+            methods=["GET"],
+            response_model=list[self.response_model],  # type: ignore
+        )
+
     def _add_update_route(self):
         self.router.add_api_route(
             f"/{self._lookup}",
@@ -205,24 +416,26 @@ class CommonRouter(BaseRouter[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
     async def get_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         return await self._get_by_id(model_id, session)
 
     @override
     async def get_all(
         self,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        response: Response,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
     ):
-        return await self._get_all(session, page, page_size)
+        return await self._get_all(session, response, page, page_size, after)
 
     @abstractmethod
     async def create(
         self,
         model: CreateModelT,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         return await self._create(model, session)
 
@@ -231,14 +444,14 @@ class CommonRouter(BaseRouter[ServicesT, CreateModelT, UpdateModelT, DbModelT]):
         self,
         model_id: int,
         model_update: UpdateModelT,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         return await self._update(model_id, model_update, session)
 
     async def delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         return await self._delete(model_id, session)
 
@@ -248,7 +461,7 @@ class CommonRouterWithAuth(BaseRouter[ServicesT, CreateModelT, UpdateModelT, DbM
     async def get_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         del user
@@ -257,19 +470,21 @@ class CommonRouterWithAuth(BaseRouter[ServicesT, CreateModelT, UpdateModelT, DbM
     @override
     async def get_all(
         self,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
+        response: Response,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
     ):
         del user
-        return await self._get_all(session, page, page_size)
+        return await self._get_all(session, response, page, page_size, after)
 
     @abstractmethod
     async def create(
         self,
         model: CreateModelT,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         del user
@@ -280,7 +495,7 @@ class CommonRouterWithAuth(BaseRouter[ServicesT, CreateModelT, UpdateModelT, DbM
         self,
         model_id: int,
         model_update: UpdateModelT,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         del user
@@ -289,8 +504,103 @@ class CommonRouterWithAuth(BaseRouter[ServicesT, CreateModelT, UpdateModelT, DbM
     async def delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         del user
         return await self._delete(model_id, session)
+
+    async def bulk_create(
+        self,
+        models: Sequence[CreateModelT],
+        session: AsyncSession,
+        user: User,
+    ):
+        del user
+        return await self._bulk_create(models, session)
+
+    async def bulk_update(
+        self,
+        model_updates: Sequence[tuple[int, UpdateModelT]],
+        session: AsyncSession,
+        user: User,
+    ):
+        del user
+        return await self._bulk_update(model_updates, session)
+
+    async def bulk_delete(
+        self,
+        model_ids: Sequence[int],
+        session: AsyncSession,
+        user: User,
+    ):
+        del user
+        return await self._bulk_delete(model_ids, session)
+
+    @override
+    def _init_api_routes(self):
+        # before the single model routes, so `bulk` is not taken for a model id
+        self._add_bulk_routes()
+        super()._init_api_routes()
+
+    def _add_bulk_routes(self):
+        create_model_type, update_model_type = self._get_schema_types()
+        bulk_update_model_type = create_model(
+            f"{update_model_type.__name__}Item",
+            __base__=update_model_type,
+            id=(int, ...),
+        )
+        bulk_max_size = settings.BULK_MAX_SIZE
+
+        # bulk requests are for importing and moderating packs of cards, so they
+        # are limited to admins
+        async def bulk_create(
+            models: Annotated[
+                list[create_model_type],  # type: ignore
+                Body(min_length=1, max_length=bulk_max_size),
+            ],
+            session: Annotated[AsyncSession, Depends(get_db_session)],
+            user: Annotated[User, Depends(auth.get_admin_user)],
+        ):
+            return await self.bulk_create(models, session, user)
+
+        async def bulk_update(
+            models: Annotated[
+                list[bulk_update_model_type],  # type: ignore
+                Body(min_length=1, max_length=bulk_max_size),
+            ],
+            session: Annotated[AsyncSession, Depends(get_db_session)],
+            user: Annotated[User, Depends(auth.get_admin_user)],
+        ):
+            model_updates = [
+                (
+                    model.id,  # type: ignore
+                    update_model_type.model_validate(
+                        model.model_dump(exclude={"id"}, exclude_unset=True)
+                    ),
+                )
+                for model in models
+            ]
+            return await self.bulk_update(model_updates, session, user)
+
+        async def bulk_delete(
+            model_ids: Annotated[
+                list[int],
+                Body(min_length=1, max_length=bulk_max_size),
+            ],
+            session: Annotated[AsyncSession, Depends(get_db_session)],
+            user: Annotated[User, Depends(auth.get_admin_user)],
+        ):
+            return await self.bulk_delete(model_ids, session, user)
+
+        for endpoint, method in (
+            (bulk_create, "POST"),
+            (bulk_update, "PATCH"),
+            (bulk_delete, "DELETE"),
+        ):
+            self.router.add_api_route(
+                "/bulk",
+                endpoint,
+                methods=[method],
+                response_model=list[BulkResult],
+            )
@@ -15,3 +15,11 @@ class APISchemaModel(BaseModel):
 
 class APISchemaResponseModel(APISchemaModel):
     id: int
+
+
+class BulkResult(APISchemaModel):
+    # outcome of a single item of a bulk request, in the order they were sent
+    index: int
+    id: int | None = None
+    status_code: int
+    detail: str | None = None
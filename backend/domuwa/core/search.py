@@ -0,0 +1,132 @@
+import logging
+from collections.abc import Sequence
+from typing import Generic
+
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    column,
+    event,
+    func,
+    literal,
+    literal_column,
+    table,
+    tuple_,
+)
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.core.pagination import KeysetPagination, ModelT
+
+logger = logging.getLogger(__name__)
+
+
+class FullTextSearch(Generic[ModelT]):
+    # cursors hold the rank and id of the last result
+    pagination = KeysetPagination("rank", "id", types=(float, int))
+
+    def __init__(self, model_type: type[ModelT], column_name: str = "text") -> None:
+        self.model_type = model_type
+        self.column_name = column_name
+        self.table_name = model_type.__tablename__
+        self.fts_table_name = f"{self.table_name}_fts"
+        self.fts_table = table(
+            self.fts_table_name, column("rowid"), column(column_name)
+        )
+        # the FTS5 index only exists on SQLite, other dialects fall back to LIKE
+        event.listen(SQLModel.metadata, "after_create", self.create_index)
+
+    def create_index(self, _target: object, conn: Connection, **_kwargs) -> None:
+        if conn.dialect.name != "sqlite":
+            return
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (self.fts_table_name,),
+        ).first()
+        if exists:
+            return
+
+        fts, source, text = self.fts_table_name, self.table_name, self.column_name
+        # an external content table, rows are kept in sync by the triggers, so bulk
+        # inserts and imports are indexed too
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{text}, content='{source}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER {fts}_after_insert AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts}(rowid, {text}) VALUES (new.id, new.{text}); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER {fts}_after_delete AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {text}) "
+            f"VALUES ('delete', old.id, old.{text}); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER {fts}_after_update AFTER UPDATE OF {text} ON {source} "
+            f"BEGIN INSERT INTO {fts}({fts}, rowid, {text}) "
+            f"VALUES ('delete', old.id, old.{text}); "
+            f"INSERT INTO {fts}(rowid, {text}) VALUES (new.id, new.{text}); END"
+        )
+        # indexes the rows of a database created before the search was added
+        conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        logger.info("created the full-text index %s", fts)
+
+    async def search(
+        self,
+        query: str,
+        session: AsyncSession,
+        limit: int = 25,
+        after: str | None = None,
+        *,
+        where: Sequence[ColumnElement[bool] | bool] = (),
+        options: Sequence[ORMOption] = (),
+    ) -> Sequence[tuple[ModelT, float]]:
+        terms = query.split()
+        if not terms:
+            return []
+
+        model_id = col(self.model_type.id)  # type: ignore
+        rank: ColumnElement[float]
+        if session.bind.dialect.name == "sqlite":  # type: ignore
+            fts_table = self.fts_table
+            # every term is quoted, so the query syntax of FTS5 is not exposed, and
+            # matches as a prefix
+            match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+            matches = (
+                select(
+                    fts_table.c.rowid.label("id"),
+                    func.bm25(literal_column(self.fts_table_name)).label("rank"),
+                )
+                .where(fts_table.c[self.column_name].match(match))
+                .subquery()
+            )
+            rank = matches.c.rank
+            stmt = select(self.model_type, rank).join(matches, matches.c.id == model_id)
+        else:
+            rank = literal(0.0)
+            stmt = select(self.model_type, rank)
+            text_column = col(getattr(self.model_type, self.column_name))
+            for term in terms:
+                escaped = term.replace("\\", "\\\\").replace("%", r"\%")
+                escaped = escaped.replace("_", r"\_")
+                stmt = stmt.where(text_column.ilike(f"%{escaped}%", escape="\\"))
+
+        if after is not None:
+            last_rank, last_id = self.pagination.decode_cursor(after)
+            stmt = stmt.where(tuple_(rank, model_id) > tuple_(last_rank, last_id))
+        stmt = stmt.options(*options).where(*where).order_by(rank, model_id)
+        result = await session.exec(stmt.limit(limit))
+        return result.all()  # type: ignore
+
+    def next_cursor(
+        self,
+        results: Sequence[tuple[ModelT, float]],
+        limit: int,
+    ) -> str | None:
+        if len(results) < limit:
+            return None
+        model, rank = results[-1]
+        return self.pagination.encode_values([rank, model.id])  # type: ignore
@@ -1,17 +1,30 @@
 import logging
 from abc import ABC
-from collections.abc import Sequence
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Mapping,
+    Sequence,
+)
 from enum import Enum
-from typing import Generic, TypeVar
+from typing import ClassVar, Generic, TypeVar
 
+from sqlalchemy import literal
 from sqlalchemy.exc import IntegrityError, PendingRollbackError
-from sqlmodel import SQLModel, Session, select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing_extensions import Self, override
 
 from domuwa.core.exceptions import (
     InvalidModelInputError,
     ModelNotFoundError,
     RelationModelNotFoundError,
 )
+from domuwa.core.pagination import KeysetPagination
 from domuwa.core.schemas import APISchemaModel
 
 CreateModelT = TypeVar("CreateModelT", bound=APISchemaModel)
@@ -22,12 +35,34 @@ DbModelT = TypeVar("DbModelT", bound=SQLModel)
 class CommonServices(ABC, Generic[CreateModelT, UpdateModelT, DbModelT]):
     db_model_type: type[DbModelT]
     logger: logging.Logger
+    # loaders for relationships serialized by the model's read schema
+    read_options: Sequence[ORMOption] = ()
+    pagination = KeysetPagination("id", types=(int,))
+    # the services keep no state per instance, so each class is instantiated once and
+    # shared by the whole process
+    _instances: ClassVar[dict[type, "CommonServices"]] = {}
+
+    def __new__(cls) -> Self:
+        instance = CommonServices._instances.get(cls)
+        if instance is None:
+            instance = CommonServices._instances[cls] = super().__new__(cls)
+        return instance  # type: ignore
 
-    async def create(self, model: CreateModelT, session: Session) -> DbModelT:
+    async def create(self, model: CreateModelT, session: AsyncSession) -> DbModelT:
         return await self.save(model, session)
 
-    async def get_by_id(self, model_id: int, session: Session) -> DbModelT:
-        model = session.get(self.db_model_type, model_id)
+    async def get_by_id(
+        self,
+        model_id: int,
+        session: AsyncSession,
+        options: Sequence[ORMOption] = (),
+    ) -> DbModelT:
+        model = await session.get(
+            self.db_model_type,
+            model_id,
+            options=options,
+            populate_existing=bool(options),
+        )
         if model is None:
             err_msg = f"{self.db_model_type.__name__}(id={model_id}) not found"
             self.logger.warning(err_msg)
@@ -36,19 +71,23 @@ class CommonServices(ABC, Generic[CreateModelT, UpdateModelT, DbModelT]):
 
     async def get_all(
         self,
-        session: Session,
+        session: AsyncSession,
         offset: int = 0,
         limit: int = 25,
+        *,
+        after: str | None = None,
+        options: Sequence[ORMOption] = (),
     ) -> Sequence[DbModelT]:
-        return session.exec(
-            select(self.db_model_type).offset(offset).limit(limit)
-        ).all()
+        stmt = select(self.db_model_type).options(*options)
+        stmt = self.pagination.paginate(stmt, self.db_model_type, offset, limit, after)
+        result = await session.exec(stmt)
+        return result.all()
 
     async def update(
         self,
         model: DbModelT,
         model_update: UpdateModelT,
-        session: Session,
+        session: AsyncSession,
     ) -> DbModelT:
         update_data = model_update.model_dump(exclude_unset=True)
         model.sqlmodel_update(update_data)
@@ -57,31 +96,47 @@ class CommonServices(ABC, Generic[CreateModelT, UpdateModelT, DbModelT]):
     async def save(
         self,
         model: CreateModelT | DbModelT,
-        session: Session,
+        session: AsyncSession,
     ) -> DbModelT:
         if not isinstance(model, self.db_model_type):
             model = self.db_model_type.model_validate(model)
         try:
             session.add(model)
-            session.commit()
+            await session.commit()
         except (IntegrityError, PendingRollbackError) as exc:
             err_msg = str(exc)
             self.logger.error(err_msg)
             raise InvalidModelInputError(err_msg) from exc
-        session.refresh(model)
+        await session.refresh(model)
         self.logger.debug("saved %s(%s) to db", model.__class__.__name__, model)
         return model  # type: ignore
 
-    async def delete(self, model: DbModelT, session: Session) -> None:
-        session.delete(model)
-        session.commit()
+    async def delete(self, model: DbModelT, session: AsyncSession) -> None:
+        await self.apply_delete(model, session)
+        await session.commit()
         self.logger.debug("removed %s(id=%d)", model.__class__.__name__, model.id)  # type: ignore
 
+    async def apply_create(self, model: DbModelT, session: AsyncSession) -> None:
+        session.add(model)
+
+    async def apply_delete(self, model: DbModelT, session: AsyncSession) -> None:
+        await session.delete(model)
+
+    async def apply_update(
+        self,
+        model: DbModelT,
+        update_data: dict,
+        session: AsyncSession,
+    ) -> DbModelT:
+        model.sqlmodel_update(update_data)
+        session.add(model)
+        return model
+
     async def find_related_model(
         self,
         model_id: int,
         model_services: "CommonServices",
-        session: Session,
+        session: AsyncSession,
     ) -> SQLModel:
         try:
             return await model_services.get_by_id(model_id, session)
@@ -92,13 +147,294 @@ class CommonServices(ABC, Generic[CreateModelT, UpdateModelT, DbModelT]):
             self.logger.warning(err_msg)
             raise RelationModelNotFoundError(err_msg) from exc
 
+    def get_related_services(self) -> dict[str, "CommonServices"]:
+        # foreign key field -> services of the related model, checked by the bulk
+        # methods
+        return {}
+
+    async def get_existing_ids(
+        self,
+        model_ids: Collection[int],
+        session: AsyncSession,
+    ) -> set[int]:
+        result = await session.exec(
+            select(self.db_model_type.id).where(  # type: ignore
+                col(self.db_model_type.id).in_(model_ids)  # type: ignore
+            )
+        )
+        return set(result.all())
+
+    async def get_many(
+        self,
+        model_ids: Collection[int],
+        session: AsyncSession,
+        options: Sequence[ORMOption] = (),
+    ) -> dict[int, DbModelT]:
+        result = await session.exec(
+            select(self.db_model_type)
+            .options(*options)
+            .where(col(self.db_model_type.id).in_(model_ids))  # type: ignore
+        )
+        return {model.id: model for model in result.all()}  # type: ignore
+
+    async def find_related_models(
+        self,
+        models_data: Mapping[int, Mapping[str, object]],
+        session: AsyncSession,
+    ) -> dict[int, RelationModelNotFoundError]:
+        # validates the related ids of many models with one query per related model
+        errors: dict[int, RelationModelNotFoundError] = {}
+        for field, model_services in self.get_related_services().items():
+            related_ids = {
+                model_data[field]
+                for model_data in models_data.values()
+                if model_data.get(field) is not None
+            }
+            if not related_ids:
+                continue
+            existing_ids = await model_services.get_existing_ids(
+                related_ids,  # type: ignore
+                session,
+            )
+            for index, model_data in models_data.items():
+                related_id = model_data.get(field)
+                if index in errors or related_id is None or related_id in existing_ids:
+                    continue
+                err_msg = f"{model_services.db_model_type.__name__}(id={related_id}) not found"
+                self.logger.warning(err_msg)
+                errors[index] = RelationModelNotFoundError(err_msg)
+        return errors
+
+    async def create_many(
+        self,
+        models: Sequence[CreateModelT],
+        session: AsyncSession,
+    ) -> list[DbModelT | Exception]:
+        models_data = dict(enumerate(model.model_dump() for model in models))
+        results: dict[int, DbModelT | Exception] = dict(
+            await self.find_related_models(models_data, session)
+        )
+
+        async def create(index: int) -> DbModelT:
+            model = self.db_model_type.model_validate(models_data[index])
+            await self.apply_create(model, session)
+            return model
+
+        indexes = [index for index in models_data if index not in results]
+        results |= await self.write_many(indexes, create, session)
+        return [results[index] for index in range(len(models))]
+
+    async def update_many(
+        self,
+        model_updates: Sequence[tuple[int, UpdateModelT]],
+        session: AsyncSession,
+        options: Sequence[ORMOption] = (),
+    ) -> list[DbModelT | Exception]:
+        models = await self.get_many(
+            {model_id for model_id, _ in model_updates}, session, options
+        )
+        results: dict[int, DbModelT | Exception] = {}
+        models_data: dict[int, dict] = {}
+        for index, (model_id, model_update) in enumerate(model_updates):
+            model = models.get(model_id)
+            if model is None:
+                err_msg = f"{self.db_model_type.__name__}(id={model_id}) not found"
+                self.logger.warning(err_msg)
+                results[index] = ModelNotFoundError(err_msg)
+                continue
+            models_data[index] = model.model_dump() | model_update.model_dump(
+                exclude_unset=True
+            )
+        results |= await self.find_related_models(models_data, session)
+
+        async def update(index: int) -> DbModelT:
+            model_id, model_update = model_updates[index]
+            # reloads the model if a failed write expired it
+            model = await session.get(self.db_model_type, model_id, options=options)
+            return await self.apply_update(
+                model,  # type: ignore
+                model_update.model_dump(exclude_unset=True),
+                session,
+            )
+
+        indexes = [index for index in models_data if index not in results]
+        results |= await self.write_many(indexes, update, session)
+        return [results[index] for index in range(len(model_updates))]
+
+    async def delete_many(
+        self,
+        model_ids: Sequence[int],
+        session: AsyncSession,
+    ) -> list[DbModelT | Exception]:
+        models = await self.get_many(set(model_ids), session)
+        results: dict[int, DbModelT | Exception] = {}
+        for index, model_id in enumerate(model_ids):
+            if model_id not in models:
+                err_msg = f"{self.db_model_type.__name__}(id={model_id}) not found"
+                self.logger.warning(err_msg)
+                results[index] = ModelNotFoundError(err_msg)
+
+        async def delete(index: int) -> DbModelT:
+            model = await session.get(self.db_model_type, model_ids[index])
+            await self.apply_delete(model, session)  # type: ignore
+            return model  # type: ignore
+
+        indexes = [index for index in range(len(model_ids)) if index not in results]
+        results |= await self.write_many(indexes, delete, session)
+        return [results[index] for index in range(len(model_ids))]
+
+    async def write_many(
+        self,
+        indexes: Sequence[int],
+        write: Callable[[int], Awaitable[DbModelT]],
+        session: AsyncSession,
+    ) -> dict[int, DbModelT | Exception]:
+        # all the writes go to the db in a single flush and transaction; only when
+        # the db rejects it, they are retried one transaction each to find the
+        # offending ones
+        if not indexes:
+            return {}
+        try:
+            models = {index: await write(index) for index in indexes}
+            await session.commit()
+        except IntegrityError as exc:
+            await session.rollback()
+            self.logger.warning("retrying %d writes one by one: %s", len(indexes), exc)
+        else:
+            self.logger.debug(
+                "wrote %d %s to db", len(models), self.db_model_type.__name__
+            )
+            return models  # type: ignore
+
+        results: dict[int, DbModelT | Exception] = {}
+        for index in indexes:
+            try:
+                model = await write(index)
+                await session.commit()
+                # keeps it loaded when a later write is rolled back, a deleted one
+                # already left the session with the commit
+                if model in session:
+                    session.expunge(model)
+                results[index] = model
+            except IntegrityError as exc:
+                await session.rollback()
+                err_msg = str(exc.orig)
+                self.logger.warning(err_msg)
+                results[index] = InvalidModelInputError(err_msg)
+        return results
+
 
 class CommonServicesForEnumModels(CommonServices[CreateModelT, UpdateModelT, DbModelT]):
     choices: type[Enum]
     choice_attr: str = "name"
     model_create_type: type[CreateModelT]
+    # detached copies of the whole table, shared by all instances of the services
+    _cache: ClassVar[dict[int, SQLModel] | None] = None
+
+    async def load_cache(self, session: AsyncSession) -> dict[int, SQLModel]:
+        result = await session.exec(select(self.db_model_type))
+        cache: dict[int, SQLModel] = {}
+        for model in result.all():
+            cached_model = self.db_model_type(**model.model_dump())
+            make_transient_to_detached(cached_model)
+            cache[model.id] = cached_model  # type: ignore
+        type(self)._cache = cache
+        self.logger.debug("cached %d %s", len(cache), self.db_model_type.__name__)
+        return cache
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        cls._cache = None
+
+    async def get_cache(self, session: AsyncSession) -> dict[int, SQLModel]:
+        if self._cache is None:
+            return await self.load_cache(session)
+        return self._cache
+
+    @override
+    async def get_by_id(
+        self,
+        model_id: int,
+        session: AsyncSession,
+        options: Sequence[ORMOption] = (),
+    ) -> DbModelT:
+        if options:
+            return await super().get_by_id(model_id, session, options)
+
+        cache = await self.get_cache(session)
+        cached_model = cache.get(model_id)
+        if cached_model is None:
+            err_msg = f"{self.db_model_type.__name__}(id={model_id}) not found"
+            self.logger.warning(err_msg)
+            raise ModelNotFoundError(err_msg)
+        return await session.merge(cached_model, load=False)  # type: ignore
 
-    async def populate(self, session: Session):
+    @override
+    async def get_all(
+        self,
+        session: AsyncSession,
+        offset: int = 0,
+        limit: int = 25,
+        *,
+        after: str | None = None,
+        options: Sequence[ORMOption] = (),
+    ) -> Sequence[DbModelT]:
+        if options:
+            return await super().get_all(
+                session, offset, limit, after=after, options=options
+            )
+
+        cache = await self.get_cache(session)
+        model_ids = sorted(cache)
+        if after is not None:
+            (last_id,) = self.pagination.decode_cursor(after)
+            model_ids = [model_id for model_id in model_ids if model_id > last_id]
+            offset = 0
+        return [
+            await session.merge(cache[model_id], load=False)  # type: ignore
+            for model_id in model_ids[offset : offset + limit]
+        ]
+
+    @override
+    async def save(
+        self,
+        model: CreateModelT | DbModelT,
+        session: AsyncSession,
+    ) -> DbModelT:
+        try:
+            return await super().save(model, session)
+        finally:
+            self.invalidate_cache()
+
+    @override
+    async def delete(self, model: DbModelT, session: AsyncSession) -> None:
+        try:
+            await super().delete(model, session)
+        finally:
+            self.invalidate_cache()
+
+    @override
+    async def write_many(
+        self,
+        indexes: Sequence[int],
+        write: Callable[[int], Awaitable[DbModelT]],
+        session: AsyncSession,
+    ) -> dict[int, DbModelT | Exception]:
+        try:
+            return await super().write_many(indexes, write, session)
+        finally:
+            self.invalidate_cache()
+
+    @override
+    async def get_existing_ids(
+        self,
+        model_ids: Collection[int],
+        session: AsyncSession,
+    ) -> set[int]:
+        cache = await self.get_cache(session)
+        return {model_id for model_id in model_ids if model_id in cache}
+
+    async def populate(self, session: AsyncSession):
         self.logger.info("populating %s", self.db_model_type.__name__.lower())
         already_populated = {
             getattr(model, self.choice_attr) for model in await self.get_all(session)
@@ -107,3 +443,102 @@ class CommonServicesForEnumModels(CommonServices[CreateModelT, UpdateModelT, DbM
             if choice not in already_populated:
                 model = self.model_create_type(**{self.choice_attr: choice})
                 await self.create(model, session)
+        await self.load_cache(session)
+
+
+class CommonServicesForVersionedModels(
+    CommonServices[CreateModelT, UpdateModelT, DbModelT]
+):
+    # max number of versions returned by stream_history
+    max_history_depth = 100
+    # set by the routes to whoever makes the update, which alone is not a new version
+    editor_fields: ClassVar[frozenset[str]] = frozenset({"author_id"})
+
+    @override
+    async def update(
+        self,
+        model: DbModelT,
+        model_update: UpdateModelT,
+        session: AsyncSession,
+    ) -> DbModelT:
+        # a single update goes through apply_update just like the bulk ones
+        updated_model = await self.apply_update(
+            model, model_update.model_dump(exclude_unset=True), session
+        )
+        try:
+            await session.commit()
+        except (IntegrityError, PendingRollbackError) as exc:
+            err_msg = str(exc)
+            self.logger.error(err_msg)
+            raise InvalidModelInputError(err_msg) from exc
+        await session.refresh(updated_model)
+        self.logger.debug(
+            "updated %s(id=%d)",
+            self.db_model_type.__name__,
+            updated_model.id,  # type: ignore
+        )
+        return updated_model
+
+    @override
+    async def apply_update(
+        self,
+        model: DbModelT,
+        update_data: dict,
+        session: AsyncSession,
+    ) -> DbModelT:
+        # toggling excluded changes the model in place, any other change makes a new
+        # version of it, which keeps the toggled flag, and no change keeps the model
+        update_data = dict(update_data)
+        excluded = update_data.pop("excluded", None)
+        if excluded is not None and model.excluded != excluded:  # type: ignore
+            model.excluded = excluded  # type: ignore
+            session.add(model)
+
+        changed_fields = {
+            key for key, value in update_data.items() if getattr(model, key) != value
+        }
+        if not changed_fields - self.editor_fields:
+            return model
+
+        model_data = model.model_dump(exclude={"id", "is_latest"}) | update_data
+        updated_model = self.db_model_type(**model_data)
+        updated_model.prev_version_id = model.id  # type: ignore
+        model.is_latest = False  # type: ignore
+        session.add(updated_model)
+        session.add(model)
+        return updated_model
+
+    async def stream_history(
+        self,
+        model_id: int,
+        session: AsyncSession,
+        max_depth: int | None = None,
+        options: Sequence[ORMOption] = (),
+    ) -> AsyncIterator[DbModelT]:
+        # walks prev_version_id from the given model in a single recursive query,
+        # the newest version first, nothing is yielded for a model that does not exist
+        max_depth = min(max_depth or self.max_history_depth, self.max_history_depth)
+        table = self.db_model_type.__table__  # type: ignore
+
+        history = (
+            select(table.c.id.label("id"), literal(0).label("depth"))
+            .where(table.c.id == model_id)
+            .cte("history", recursive=True)
+        )
+        history = history.union_all(
+            select(table.c.prev_version_id, history.c.depth + 1).where(
+                table.c.id == history.c.id,
+                table.c.prev_version_id.is_not(None),
+                history.c.depth + 1 < max_depth,
+            )
+        )
+
+        stmt = (
+            select(self.db_model_type)
+            .join(history, history.c.id == table.c.id)
+            .options(*options)
+            .order_by(history.c.depth)
+        )
+        result = await session.stream_scalars(stmt)
+        async for model in result:
+            yield model
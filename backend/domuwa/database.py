@@ -1,28 +1,193 @@
-from sqlalchemy import Engine
-from sqlmodel import SQLModel, Session, create_engine
+import itertools
+import logging
+from collections.abc import Mapping
+
+from sqlalchemy import Connection, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import HTTPConnection
 
 from domuwa.answers.models import *  # noqa: F403, F406
 from domuwa.config import settings
 from domuwa.game_categories.models import *  # noqa: F403, F811
 from domuwa.game_rooms.models import *  # noqa: F403, F811
 from domuwa.game_types.models import *  # noqa: F403, F811
+from domuwa.metrics.pool import MeteredPool
+from domuwa.metrics.requests import count_query
 from domuwa.players.models import *  # noqa: F403, F811
 from domuwa.qna_categories.models import *  # noqa: F403, F811
 from domuwa.questions.models import *  # noqa: F403, F811
 from domuwa.rankings.models import *  # noqa: F403, F811
 from domuwa.users.models import *  # noqa: F401, F403, F811
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.drivername}+{ASYNC_DRIVERS[url.drivername]}")
+    return url.render_as_string(hide_password=False)
+
+
+def get_connect_args(database_url: str) -> dict:
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
+
+SQLITE_PRAGMAS: dict[str, str | int] = {
+    "journal_mode": settings.SQLITE_JOURNAL_MODE,
+    "synchronous": settings.SQLITE_SYNCHRONOUS,
+    "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    "cache_size": settings.SQLITE_CACHE_SIZE,
+    "mmap_size": settings.SQLITE_MMAP_SIZE,
+    "temp_store": settings.SQLITE_TEMP_STORE,
+}
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: Mapping[str, str | int]) -> None:
+    def on_connect(
+        dbapi_connection: DBAPIConnection,
+        _connection_record: ConnectionPoolEntry,
+    ) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine.sync_engine, "connect", on_connect)
+
+
+def get_pool_args(database_url: str) -> dict:
+    # in-memory SQLite databases live in a single connection
+    if make_url(database_url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": MeteredPool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+    }
+
+
+def create_db_engine(database_url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        get_async_database_url(database_url),
+        connect_args=get_connect_args(database_url),
+        **get_pool_args(database_url),
+    )
+    if make_url(database_url).get_backend_name() == "sqlite":
+        set_sqlite_pragmas(engine, SQLITE_PRAGMAS)
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    return engine
+
+
+engine = create_db_engine(settings.DATABASE_URL)
+read_engines = [create_db_engine(url) for url in settings.DATABASE_READ_URLS]
+# the read sessions take turns over the replicas
+_read_engines = itertools.cycle(read_engines or [engine])
+
+
+# (table, column, definition, backfill) of the columns added to existing tables,
+# `create_all` only creates the tables that are missing
+ADDED_COLUMNS: tuple[tuple[str, str, str, str | None], ...] = (
+    (
+        "question",
+        "is_latest",
+        "BOOLEAN NOT NULL DEFAULT true",
+        "UPDATE question SET is_latest = false WHERE id IN "
+        "(SELECT prev_version_id FROM question WHERE prev_version_id IS NOT NULL)",
+    ),
+    (
+        "answer",
+        "is_latest",
+        "BOOLEAN NOT NULL DEFAULT true",
+        "UPDATE answer SET is_latest = false WHERE id IN "
+        "(SELECT prev_version_id FROM answer WHERE prev_version_id IS NOT NULL)",
+    ),
+    ("game_room", "finished", "BOOLEAN NOT NULL DEFAULT false", None),
+    ("game_room", "version", "INTEGER NOT NULL DEFAULT 0", None),
 )
+# indexes that were replaced by ones of another name, or another definition
+DROPPED_INDEXES: tuple[str, ...] = (
+    # partial indexes over the cards that were not deleted, which also covered the
+    # old versions
+    "ix_question_live_excluded_id",
+    "ix_question_live_game_type_id_id",
+    "ix_answer_live_excluded_id",
+    "ix_answer_live_game_type_id_id",
+)
+
+
+def upgrade_tables(conn: Connection) -> None:
+    inspector = inspect(conn)
+    for table_name, column_name, definition, backfill in ADDED_COLUMNS:
+        column_names = {column["name"] for column in inspector.get_columns(table_name)}
+        if column_name in column_names:
+            continue
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}"
+        )
+        if backfill is not None:
+            conn.exec_driver_sql(backfill)
+        logger.info("added the column %s.%s", table_name, column_name)
+
+    for index_name in DROPPED_INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index_name}")
+
+    # the indexes added to existing tables are missing as well
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 
 # noinspection PyShadowingNames
-def create_db_and_tables(engine: Engine = engine):
-    SQLModel.metadata.create_all(engine)
+async def create_db_and_tables(engine: AsyncEngine = engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(upgrade_tables)
+
+
+# safe requests only read, so they are served by the replicas
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
 
-def get_db_session():
-    with Session(engine) as db_sess:
+async def get_db_session(connection: HTTPConnection):
+    # the one session of a request, FastAPI caches the dependency, so the route, auth
+    # and any other dependency of the request share it
+    if connection.scope["type"] != "http":
+        # a websocket lasts the whole game, so it only holds a connection to write
+        async with AsyncSession(engine, expire_on_commit=False) as db_sess:
+            yield db_sess
+        return
+
+    bind = next(_read_engines) if connection.scope["method"] in READ_METHODS else engine
+    # every transaction of the request goes through the same connection
+    async with (
+        bind.connect() as conn,
+        AsyncSession(conn, expire_on_commit=False) as db_sess,
+    ):
         yield db_sess
+
+
+def get_session_engine(session: AsyncSession) -> AsyncEngine:
+    # a response streamed after the request's session and connection are closed
+    # reads through its own session of the same engine
+    bind = session.bind
+    if isinstance(bind, AsyncConnection):
+        return bind.engine
+    return bind  # type: ignore
@@ -2,7 +2,7 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
@@ -35,7 +35,7 @@ class GameCategoryRouter(
     async def create(
         self,
         model: GameCategoryCreate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().create(model, session, user)
@@ -45,7 +45,7 @@ class GameCategoryRouter(
         self,
         model_id: int,
         model_update: GameCategoryUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().update(model_id, model_update, session, user)
@@ -54,7 +54,7 @@ class GameCategoryRouter(
     async def delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().delete(model_id, session, user)
@@ -0,0 +1,212 @@
+import asyncio
+import contextlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Coroutine
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[str], Awaitable[None]]
+ReconnectListener = Callable[[], Coroutine[None, None, None]]
+
+# messages a subscriber can fall behind by, before the delivery waits for it
+SUBSCRIBER_QUEUE_SIZE = 1024
+
+
+class SubscriberQueue:
+    # every subscriber is called from its own task, so a slow websocket only holds up
+    # the room it is in
+    def __init__(self, channel: str, subscriber: Subscriber) -> None:
+        self.channel = channel
+        self.subscriber = subscriber
+        self.queue: asyncio.Queue[str] = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.task = asyncio.create_task(self._run())
+
+    async def put(self, message: str) -> None:
+        # a dropped command would leave the replica of the room behind for good, so a
+        # subscriber that fell too far behind holds up the delivery instead
+        if self.queue.full():
+            logger.warning("subscriber of %s is behind, waiting for it", self.channel)
+        await self.queue.put(message)
+
+    def close(self) -> None:
+        self.task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            message = await self.queue.get()
+            try:
+                await self.subscriber(message)
+            except Exception:
+                logger.exception("subscriber of %s failed", self.channel)
+
+
+class Broadcast(ABC):
+    # whether messages published here can reach other processes
+    shared: bool
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, dict[Subscriber, SubscriberQueue]] = {}
+        self._reconnect_listeners: list[ReconnectListener] = []
+        self._listener_tasks: set[asyncio.Task] = set()
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        pass
+
+    async def subscribe(self, channel: str, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.setdefault(channel, {})
+        if subscriber not in subscribers:
+            subscribers[subscriber] = SubscriberQueue(channel, subscriber)
+
+    async def unsubscribe(self, channel: str, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(channel, {})
+        subscriber_queue = subscribers.pop(subscriber, None)
+        if subscriber_queue is not None:
+            subscriber_queue.close()
+        if not subscribers:
+            self._subscribers.pop(channel, None)
+
+    async def deliver(self, channel: str, message: str) -> None:
+        for subscriber_queue in list(self._subscribers.get(channel, {}).values()):
+            await subscriber_queue.put(message)
+
+    def add_reconnect_listener(self, listener: ReconnectListener) -> None:
+        # called after the connection is back, the messages sent meanwhile are lost
+        self._reconnect_listeners.append(listener)
+
+    def notify_reconnected(self) -> None:
+        for listener in self._reconnect_listeners:
+            task = asyncio.create_task(listener())
+            self._listener_tasks.add(task)
+            task.add_done_callback(self._listener_tasks.discard)
+
+
+class MemoryBroadcast(Broadcast):
+    shared = False
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.deliver(channel, message)
+
+
+class SocketBroadcast(Broadcast):
+    shared = True
+    # waits between the attempts to reconnect to the broker after losing it, once
+    # they run out the next publish reconnects, or raises if the broker is still down
+    reconnect_delays: tuple[float, ...] = (0.1, 0.5, 1, 2, 5)
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__()
+        self.host = host
+        self.port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._connect_lock = asyncio.Lock()
+        self._connected = False
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host,
+                self.port,
+            )
+            self._reader_task = asyncio.create_task(self._read())
+            for channel in self._subscribers:
+                await self._send({"op": "subscribe", "channel": channel})
+            reconnected, self._connected = self._connected, True
+        logger.info("connected to game room broker at %s:%d", self.host, self.port)
+        if reconnected:
+            self.notify_reconnected()
+
+    async def disconnect(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(ConnectionError, OSError):
+                await self._writer.wait_closed()
+            self._writer = None
+            self._reader = None
+        self._connected = False
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self._send({"op": "publish", "channel": channel, "message": message})
+
+    async def subscribe(self, channel: str, subscriber: Subscriber) -> None:
+        first = channel not in self._subscribers
+        await super().subscribe(channel, subscriber)
+        if first:
+            await self._send({"op": "subscribe", "channel": channel})
+
+    async def unsubscribe(self, channel: str, subscriber: Subscriber) -> None:
+        await super().unsubscribe(channel, subscriber)
+        if channel not in self._subscribers:
+            await self._send({"op": "unsubscribe", "channel": channel})
+
+    async def _send(self, data: dict) -> None:
+        if self._writer is None:
+            await self.connect()
+        assert self._writer is not None
+        self._writer.write(json.dumps(data).encode() + b"\n")
+        await self._writer.drain()
+
+    async def _read(self) -> None:
+        assert self._reader is not None
+        try:
+            while line := await self._reader.readline():
+                try:
+                    data = json.loads(line)
+                    channel, message = data["channel"], data["message"]
+                except (ValueError, KeyError, TypeError):
+                    logger.exception("dropped a malformed message from the broker")
+                    continue
+                await self.deliver(channel, message)
+        except (ConnectionError, OSError) as exc:
+            logger.warning("lost the game room broker connection: %s", exc)
+        else:
+            logger.warning("game room broker at %s:%d went away", self.host, self.port)
+        await self._reconnect()
+
+    async def _reconnect(self) -> None:
+        # publishing into a closed connection would seem to work, while nothing is
+        # delivered anymore
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self._reader = None
+        for delay in self.reconnect_delays:
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+            except OSError as exc:
+                logger.warning("could not reconnect to the broker: %s", exc)
+            else:
+                return
+        logger.error(
+            "gave up reconnecting to the game room broker at %s:%d",
+            self.host,
+            self.port,
+        )
+
+
+def get_broadcast(url: str) -> Broadcast:
+    parsed_url = urlsplit(url)
+    if parsed_url.scheme == "memory":
+        return MemoryBroadcast()
+    if parsed_url.scheme == "tcp":
+        if parsed_url.hostname is None or parsed_url.port is None:
+            raise ValueError(f"broker address is missing in {url!r}")
+        return SocketBroadcast(parsed_url.hostname, parsed_url.port)
+    raise ValueError(f"unsupported game room broadcast url: {url!r}")
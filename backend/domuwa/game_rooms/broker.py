@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastBroker:
+    # relays newline delimited JSON messages between the workers' SocketBroadcasts,
+    # in the order they were received, to every connection subscribed to a channel
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+        self._channels: dict[str, set[asyncio.StreamWriter]] = {}
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("game room broker listening on %s:%d", self.host, self.port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server.close_clients()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def _serve(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        channels: set[str] = set()
+        try:
+            while line := await reader.readline():
+                data = json.loads(line)
+                channel = data["channel"]
+                match data["op"]:
+                    case "subscribe":
+                        channels.add(channel)
+                        self._channels.setdefault(channel, set()).add(writer)
+                    case "unsubscribe":
+                        channels.discard(channel)
+                        self._unsubscribe(channel, writer)
+                    case "publish":
+                        await self._publish(channel, data["message"])
+        except (ConnectionError, ValueError, KeyError) as exc:
+            logger.warning("dropping broker client: %s", exc)
+        finally:
+            for channel in channels:
+                self._unsubscribe(channel, writer)
+            writer.close()
+
+    async def _publish(self, channel: str, message: str) -> None:
+        line = json.dumps({"channel": channel, "message": message}).encode() + b"\n"
+        writers = list(self._channels.get(channel, ()))
+        # write to everyone before yielding, so all subscribers see the same order
+        for writer in writers:
+            writer.write(line)
+        for writer in writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                self._unsubscribe(channel, writer)
+
+    def _unsubscribe(self, channel: str, writer: asyncio.StreamWriter) -> None:
+        writers = self._channels.get(channel)
+        if writers is None:
+            return
+        writers.discard(writer)
+        if not writers:
+            del self._channels[channel]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Game room events broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    await BroadcastBroker(args.host, args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+from enum import StrEnum
+
+from domuwa.game_categories.constants import GameCategoryChoices
+from domuwa.qna_categories.constants import QnACategoryChoices
+
+
+class GameRoomEventType(StrEnum):
+    JOIN = "join"
+    LEAVE = "leave"
+    ANSWER = "answer"
+    NEXT_ROUND = "next_round"
+    FINISHED = "finished"
+    ERROR = "error"
+
+
+class GameRoomMessageKind(StrEnum):
+    COMMAND = "command"
+    SYNC_REQUEST = "sync_request"
+    SNAPSHOT = "snapshot"
+
+
+# questions and answers that can be played in a room of the given category
+GAME_CATEGORY_QNA_CATEGORIES = {
+    GameCategoryChoices.SFW: (QnACategoryChoices.SFW,),
+    GameCategoryChoices.NSFW: (QnACategoryChoices.NSFW,),
+    GameCategoryChoices.MIXED: (QnACategoryChoices.SFW, QnACategoryChoices.NSFW),
+}
@@ -0,0 +1,422 @@
+import asyncio
+import contextlib
+import logging
+from collections import Counter
+from uuid import uuid4
+
+from fastapi import WebSocket
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa import database as db
+from domuwa.config import settings
+from domuwa.core.exceptions import GameRoomError, StaleRoundError
+from domuwa.game_rooms.broadcast import Broadcast, Subscriber, get_broadcast
+from domuwa.game_rooms.constants import GameRoomEventType, GameRoomMessageKind
+from domuwa.game_rooms.models import GameRoom
+from domuwa.game_rooms.schemas import GameRoomEvent, GameRoomMessage, GameRoomSnapshot
+from domuwa.game_rooms.services import GameRoomServices
+
+logger = logging.getLogger(__name__)
+
+
+class GameRoomState:
+    # every worker with players in the room keeps a replica of this state and applies
+    # the same commands in the order the broadcast delivers them
+    def __init__(self, game_room_id: int, rounds: int, cur_round: int) -> None:
+        self.game_room_id = game_room_id
+        self.rounds = rounds
+        self.cur_round = cur_round
+        self.finished = False
+        # bumped by every snapshot written to the db, rejecting conflicting ones
+        self.version = 0
+        self.question_id: int | None = None
+        self.players: set[int] = set()
+        self.scores: dict[int, float] = {}
+        # player id -> answer id, only for the round in progress
+        self.answers: dict[int, int] = {}
+        # websockets of the players connected to this worker
+        self.connections: dict[int, WebSocket] = {}
+        self.lock = asyncio.Lock()
+        self.ready = asyncio.Event()
+        self.sync_id: str | None = None
+        self.buffering = False
+        self.buffer: list[GameRoomMessage] = []
+        self.subscriber: Subscriber | None = None
+
+    def apply(
+        self,
+        player_id: int,
+        event: GameRoomEvent,
+    ) -> tuple[list[GameRoomEvent], GameRoomSnapshot | None]:
+        match event.type:
+            case GameRoomEventType.JOIN:
+                self.players.add(player_id)
+                self.scores.setdefault(player_id, 0.0)
+                return [
+                    GameRoomEvent(
+                        type=GameRoomEventType.JOIN,
+                        player_id=player_id,
+                        cur_round=self.cur_round,
+                        scores=self.scores,
+                    )
+                ], None
+            case GameRoomEventType.LEAVE:
+                self.players.discard(player_id)
+                self.answers.pop(player_id, None)
+                if not self.players:
+                    # nobody is left to play the round, so it ends here
+                    return [], self.round_snapshot()
+                return [
+                    GameRoomEvent(type=GameRoomEventType.LEAVE, player_id=player_id)
+                ], None
+            case GameRoomEventType.ANSWER:
+                return self.answer(player_id, event.answer_id, event.question_id), None
+            case GameRoomEventType.NEXT_ROUND:
+                return self.next_round(event.question_id), self.round_snapshot()
+        raise GameRoomError(f"unsupported event type: {event.type}")
+
+    def answer(
+        self,
+        player_id: int,
+        answer_id: int | None,
+        question_id: int | None,
+    ) -> list[GameRoomEvent]:
+        if answer_id is None:
+            raise GameRoomError("answer_id is required")
+        if self.finished or self.question_id is None:
+            raise GameRoomError("there is no round in progress")
+        # the round can move on between checking the answer and applying it
+        if question_id != self.question_id:
+            raise GameRoomError(f"Answer(id={answer_id}) is not for this round")
+
+        self.answers[player_id] = answer_id
+        return [GameRoomEvent(type=GameRoomEventType.ANSWER, player_id=player_id)]
+
+    def next_round(self, question_id: int | None) -> list[GameRoomEvent]:
+        if self.finished:
+            raise GameRoomError("game is already finished")
+        last_round = self.cur_round >= self.rounds
+        if not last_round and question_id is None:
+            raise GameRoomError("question_id is required")
+
+        self.finish_round()
+        if last_round:
+            self.finished = True
+            event_type = GameRoomEventType.FINISHED
+        else:
+            self.cur_round += 1
+            self.question_id = question_id
+            event_type = GameRoomEventType.NEXT_ROUND
+        return [
+            GameRoomEvent(
+                type=event_type,
+                question_id=self.question_id,
+                cur_round=self.cur_round,
+                scores=self.scores,
+            )
+        ]
+
+    def finish_round(self) -> None:
+        # players who picked the most popular answer of the round get a point
+        if self.answers:
+            votes = Counter(self.answers.values())
+            top_votes = max(votes.values())
+            for player_id, answer_id in self.answers.items():
+                if votes[answer_id] == top_votes:
+                    self.scores[player_id] = self.scores.get(player_id, 0.0) + 1
+        self.answers.clear()
+        self.question_id = None
+
+    def round_snapshot(self) -> GameRoomSnapshot:
+        self.version += 1
+        return self.snapshot()
+
+    def snapshot(self) -> GameRoomSnapshot:
+        return GameRoomSnapshot(
+            version=self.version,
+            cur_round=self.cur_round,
+            finished=self.finished,
+            question_id=self.question_id,
+            players=sorted(self.players),
+            scores=dict(self.scores),
+            answers=dict(self.answers),
+        )
+
+    def load_snapshot(self, snapshot: GameRoomSnapshot) -> None:
+        self.version = snapshot.version
+        self.cur_round = snapshot.cur_round
+        self.finished = snapshot.finished
+        self.question_id = snapshot.question_id
+        self.players = set(snapshot.players)
+        self.scores = dict(snapshot.scores)
+        self.answers = dict(snapshot.answers)
+
+
+class GameRoomRegistry:
+    sync_timeout: float = 0.5
+    command_timeout: float = 5.0
+
+    def __init__(self, broadcast: Broadcast) -> None:
+        self.broadcast = broadcast
+        self.rooms: dict[int, GameRoomState] = {}
+        self.services = GameRoomServices()
+        self._pending: dict[str, asyncio.Future[GameRoomSnapshot | None]] = {}
+        self.broadcast.add_reconnect_listener(self.resync_rooms)
+
+    @staticmethod
+    def channel(game_room_id: int) -> str:
+        return f"game_room:{game_room_id}"
+
+    async def join(
+        self,
+        game_room: GameRoom,
+        player_id: int,
+        websocket: WebSocket,
+        session: AsyncSession,
+    ) -> GameRoomState:
+        assert game_room.id is not None
+        state = self.rooms.get(game_room.id)
+        if state is None:
+            state = GameRoomState(game_room.id, game_room.rounds, game_room.cur_round)
+            state.finished = game_room.finished
+            state.version = game_room.version
+            self.rooms[game_room.id] = state
+            await self._open(state, session)
+        await state.ready.wait()
+
+        state.connections[player_id] = websocket
+        await self.dispatch(
+            state,
+            player_id,
+            GameRoomEvent(type=GameRoomEventType.JOIN),
+            session,
+        )
+        logger.debug("Player(id=%d) joined GameRoom(id=%d)", player_id, game_room.id)
+        return state
+
+    async def leave(
+        self,
+        state: GameRoomState,
+        player_id: int,
+        session: AsyncSession,
+    ) -> None:
+        state.connections.pop(player_id, None)
+        try:
+            await self.dispatch(
+                state,
+                player_id,
+                GameRoomEvent(type=GameRoomEventType.LEAVE),
+                session,
+            )
+        finally:
+            if not state.connections and self.rooms.get(state.game_room_id) is state:
+                del self.rooms[state.game_room_id]
+                assert state.subscriber is not None
+                await self.broadcast.unsubscribe(
+                    self.channel(state.game_room_id),
+                    state.subscriber,
+                )
+        logger.debug(
+            "Player(id=%d) left GameRoom(id=%d)", player_id, state.game_room_id
+        )
+
+    async def handle(
+        self,
+        state: GameRoomState,
+        player_id: int,
+        event: GameRoomEvent,
+        session: AsyncSession,
+    ) -> None:
+        if event.type == GameRoomEventType.ANSWER:
+            event = await self._check_answer(state, event, session)
+        elif event.type != GameRoomEventType.NEXT_ROUND:
+            raise GameRoomError(f"unsupported event type: {event.type}")
+        elif not state.finished and state.cur_round < state.rounds:
+            # the questions only come from the room's deck, so they are never played
+            # twice, nor excluded or of another game type
+            question_ids = await self.services.draw_questions(
+                state.game_room_id, 1, session
+            )
+            if not question_ids:
+                raise GameRoomError("there are no questions left to play")
+            event = event.model_copy(update={"question_id": question_ids[0]})
+        else:
+            event = event.model_copy(update={"question_id": None})
+        await self.dispatch(state, player_id, event, session)
+
+    async def _check_answer(
+        self,
+        state: GameRoomState,
+        event: GameRoomEvent,
+        session: AsyncSession,
+    ) -> GameRoomEvent:
+        from domuwa.answers.models import Answer
+
+        if event.answer_id is None:
+            raise GameRoomError("answer_id is required")
+        if state.finished or state.question_id is None:
+            raise GameRoomError("there is no round in progress")
+        result = await session.exec(
+            select(Answer.question_id).where(
+                Answer.id == event.answer_id,
+                Answer.deleted == False,  # noqa: E712
+            )
+        )
+        question_id = result.first()
+        if question_id is None or question_id != state.question_id:
+            raise GameRoomError(f"Answer(id={event.answer_id}) is not for this round")
+        return event.model_copy(update={"question_id": question_id})
+
+    async def dispatch(
+        self,
+        state: GameRoomState,
+        player_id: int,
+        event: GameRoomEvent,
+        session: AsyncSession,
+    ) -> None:
+        message = GameRoomMessage(
+            kind=GameRoomMessageKind.COMMAND,
+            id=uuid4().hex,
+            player_id=player_id,
+            event=event,
+        )
+        future: asyncio.Future[GameRoomSnapshot | None]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message.id] = future
+        try:
+            await self._publish(state, message)
+            snapshot = await asyncio.wait_for(future, self.command_timeout)
+        except TimeoutError as exc:
+            raise GameRoomError(f"{event.type} was not delivered in time") from exc
+        finally:
+            self._pending.pop(message.id, None)
+
+        # only the worker the command came from writes the round boundary to the db
+        if snapshot is not None:
+            async with state.lock:
+                try:
+                    await self.services.save_round(
+                        state.game_room_id, snapshot, session
+                    )
+                except StaleRoundError as exc:
+                    # another worker already saved a later state of the room
+                    logger.warning("skipped a snapshot: %s", exc)
+
+    async def send(self, state: GameRoomState, event: GameRoomEvent) -> None:
+        message = event.model_dump(mode="json", by_alias=True, exclude_none=True)
+        for player_id, websocket in list(state.connections.items()):
+            try:
+                await websocket.send_json(message)
+            except (RuntimeError, OSError):
+                logger.warning(
+                    "could not send %s to Player(id=%d)", event.type, player_id
+                )
+
+    async def _open(self, state: GameRoomState, session: AsyncSession) -> None:
+        async def subscriber(data: str) -> None:
+            await self._receive(state, GameRoomMessage.model_validate_json(data))
+
+        state.subscriber = subscriber
+        await self.broadcast.subscribe(self.channel(state.game_room_id), subscriber)
+        await self._sync(state)
+        if not state.ready.is_set():
+            state.scores = await self.services.get_scores(state.game_room_id, session)
+            await self._replay(state)
+
+    async def resync_rooms(self) -> None:
+        # the commands published while the broadcast was down never got here, so the
+        # replicas start over from the other workers' state, or from the db
+        async with AsyncSession(db.engine, expire_on_commit=False) as session:
+            for state in list(self.rooms.values()):
+                logger.warning("resyncing GameRoom(id=%d)", state.game_room_id)
+                state.ready.clear()
+                state.buffering = False
+                state.buffer.clear()
+                await self._sync(state)
+                if not state.ready.is_set():
+                    await self._load(state, session)
+                    await self._replay(state)
+
+    async def _sync(self, state: GameRoomState) -> None:
+        if self.broadcast.shared:
+            # ask workers already hosting the room for its current state
+            state.sync_id = uuid4().hex
+            await self._publish(
+                state,
+                GameRoomMessage(
+                    kind=GameRoomMessageKind.SYNC_REQUEST, id=state.sync_id
+                ),
+            )
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(state.ready.wait(), self.sync_timeout)
+        else:
+            state.buffering = True
+
+    async def _load(self, state: GameRoomState, session: AsyncSession) -> None:
+        # the db only has the state of the last saved round, and the players are the
+        # ones connected here, as no other worker answered
+        game_room = await self.services.get_by_id(state.game_room_id, session)
+        state.cur_round = game_room.cur_round
+        state.finished = game_room.finished
+        state.version = game_room.version
+        state.question_id = None
+        state.players = set(state.connections)
+        state.answers.clear()
+        state.scores = await self.services.get_scores(state.game_room_id, session)
+
+    async def _receive(self, state: GameRoomState, message: GameRoomMessage) -> None:
+        match message.kind:
+            case GameRoomMessageKind.SYNC_REQUEST:
+                if message.id == state.sync_id:
+                    # commands before our own request are already in the snapshot
+                    state.buffering = True
+                elif state.ready.is_set():
+                    await self._publish(
+                        state,
+                        GameRoomMessage(
+                            kind=GameRoomMessageKind.SNAPSHOT,
+                            id=message.id,
+                            snapshot=state.snapshot(),
+                        ),
+                    )
+            case GameRoomMessageKind.SNAPSHOT:
+                if message.id == state.sync_id and not state.ready.is_set():
+                    assert message.snapshot is not None
+                    state.load_snapshot(message.snapshot)
+                    await self._replay(state)
+            case GameRoomMessageKind.COMMAND:
+                if state.ready.is_set():
+                    await self._apply(state, message)
+                elif state.buffering:
+                    state.buffer.append(message)
+
+    async def _replay(self, state: GameRoomState) -> None:
+        while state.buffer:
+            await self._apply(state, state.buffer.pop(0))
+        state.ready.set()
+
+    async def _apply(self, state: GameRoomState, message: GameRoomMessage) -> None:
+        assert message.player_id is not None
+        assert message.event is not None
+        future = self._pending.get(message.id)
+        try:
+            events, snapshot = state.apply(message.player_id, message.event)
+        except GameRoomError as exc:
+            if future is not None and not future.done():
+                future.set_exception(exc)
+            return
+
+        for event in events:
+            await self.send(state, event)
+        if future is not None and not future.done():
+            future.set_result(snapshot)
+
+    async def _publish(self, state: GameRoomState, message: GameRoomMessage) -> None:
+        await self.broadcast.publish(
+            self.channel(state.game_room_id),
+            message.model_dump_json(by_alias=True, exclude_none=True),
+        )
+
+
+game_room_registry = GameRoomRegistry(get_broadcast(settings.GAME_ROOM_BROADCAST_URL))
@@ -33,7 +33,10 @@ class GameRoom(SQLModel, table=True):
     websocket: Optional[str] = Field(None, index=True)
     created_at: datetime = Field(default_factory=datetime.now)
     rounds: int
-    cur_round: int
+    cur_round: int = 0
+    finished: bool = False
+    # version of the last saved snapshot of the room
+    version: int = 0
 
     game_type_id: Optional[int] = Field(None, foreign_key="game_type.id")
     game_type: Optional["GameType"] = Relationship(back_populates="game_rooms")
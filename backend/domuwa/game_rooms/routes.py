@@ -1,88 +1,181 @@
-from fastapi import APIRouter
+import logging
+from typing import Annotated
 
-router = APIRouter(prefix="/game_room", tags=["Game Room"])
+from fastapi import (
+    APIRouter,
+    Depends,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing_extensions import override
 
+from domuwa import auth
+from domuwa.auth import User
+from domuwa.core.exceptions import (
+    GameRoomError,
+    ModelNotFoundError,
+    RelationModelNotFoundError,
+    StaleRoundError,
+    StaleRoundHttpException,
+)
+from domuwa.core.routes import CommonRouterWithAuth
+from domuwa.database import get_db_session
+from domuwa.game_rooms.constants import GameRoomEventType
+from domuwa.game_rooms.engine import game_room_registry
+from domuwa.game_rooms.models import GameRoom
+from domuwa.game_rooms.schemas import (
+    GameRoomCreate,
+    GameRoomEvent,
+    GameRoomRead,
+    GameRoomSnapshot,
+    GameRoomUpdate,
+)
+from domuwa.game_rooms.services import GameRoomServices
+from domuwa.rankings.leaderboard import leaderboards
+from domuwa.rankings.schemas import LeaderboardEntry
 
-# @router.post("/", status_code=status.HTTP_201_CREATED, response_model=None)
-# def create_game_room(
-#     request: Request,
-#     name: str,
-#     category: str,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> schemas.GameRoomSchema:
-#     game = schemas.GameRoomCreateSchema(game_name=name, game_category=category)
-#     db_game_room = services.create_game_room(game, db_sess)
-#     return create_game_room_view(db_game_room)
-#
-#
-# @router.get("/{game_room_id}", response_model=None)
-# def get_game_room_by_id(
-#     request: Request,
-#     game_room_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> schemas.GameRoomSchema:
-#     game_room = db.get_obj_of_type_by_id(
-#         game_room_id,
-#         DbGameRoom,
-#         "GameRoom",
-#         db_sess,
-#     )
-#     return create_game_room_view(game_room)
-#
-#
-# @router.get("/", response_model=None)
-# def get_all_game_rooms(
-#     request: Request,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> list[schemas.GameRoomSchema]:
-#     game_rooms = db.get_all_objs_of_type(DbGameRoom, db_sess)
-#     return [create_game_room_view(game) for game in game_rooms]
-#
-#
-# @router.put("/add_player", response_model=None)
-# def add_player(
-#     request: Request,
-#     game_room_id: int,
-#     player_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> schemas.GameRoomSchema:
-#     game_room = services.add_player(game_room_id, player_id, db_sess)
-#     return create_game_room_view(game_room)
-#
-#
-# @router.put("/remove_player", response_model=None)
-# def remove_player(
-#     request: Request,
-#     game_room_id: int,
-#     player_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> schemas.GameRoomSchema:
-#     game_room = services.remove_player(game_room_id, player_id, db_sess)
-#     return create_game_room_view(game_room)
-#
-#
-# @router.put("/remove_player", response_model=None)
-# def remove_players(
-#     request: Request,
-#     game_room_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> schemas.GameRoomSchema:
-#     game_room = services.remove_all_players(game_room_id, db_sess)
-#     return create_game_room_view(game_room)
-#
-#
-# @router.delete(
-#     "/",
-#     status_code=status.HTTP_204_NO_CONTENT,
-#     response_class=Response,
-#     response_model=None,
-# )
-# def delete_game_room(
-#     game_room_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> None:
-#     services.delete_game_room(game_room_id, db_sess)
-#
-#
-# def create_game_room_view(game: DbGameRoom) -> schemas.GameRoomSchema:
-#     return schemas.GameRoomSchema.model_validate(game)
+
+class GameRoomRouter(
+    CommonRouterWithAuth[GameRoomServices, GameRoomCreate, GameRoomUpdate, GameRoom]
+):
+    prefix = "/game-rooms"
+    tags = ["Game Room"]
+    router = APIRouter(prefix=prefix, tags=tags)  # type: ignore
+    response_model = GameRoomRead
+    services = GameRoomServices()
+    logger = logging.getLogger(__name__)
+    db_model_type_name = GameRoom.__name__
+    list_load_options = GameRoomServices.read_options
+    detail_load_options = GameRoomServices.read_options
+
+    @override
+    def _init_api_routes(self):
+        super()._init_api_routes()
+        self.router.add_api_route(
+            f"/{self._lookup}/leaderboard",
+            self.get_leaderboard,
+            methods=["GET"],
+            response_model=list[LeaderboardEntry],
+        )
+        self.router.add_api_route(
+            f"/{self._lookup}/rounds",
+            self.save_round,
+            methods=["POST"],
+            response_model=self.response_model,
+        )
+        self.router.add_api_websocket_route(f"/{self._lookup}/ws", self.play)
+
+    @override
+    async def create(
+        self,
+        model: GameRoomCreate,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+    ):
+        return await super().create(model, session, user)
+
+    @override
+    async def update(
+        self,
+        model_id: int,
+        model_update: GameRoomUpdate,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+    ):
+        return await super().update(model_id, model_update, session, user)
+
+    @override
+    async def delete(
+        self,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_admin_user)],
+    ):
+        return await super().delete(model_id, session, user)
+
+    async def get_leaderboard(
+        self,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+        page: Annotated[int, Query(ge=1)] = 1,
+        page_size: Annotated[int, Query(ge=1, le=100)] = 25,
+    ):
+        del user
+        await self.get_instance(model_id, session)
+        leaderboard = await leaderboards.get_game_room(model_id, session)
+        return [
+            LeaderboardEntry(rank=rank, player_id=player_id, points=points)
+            for rank, player_id, points in leaderboard.top(
+                page_size, (page - 1) * page_size
+            )
+        ]
+
+    async def save_round(
+        self,
+        model_id: int,
+        snapshot: GameRoomSnapshot,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_admin_user)],
+    ):
+        # rounds played outside of the websocket, the snapshot is written only when
+        # its version is newer than the saved one
+        del user
+        game_room = await self.get_instance(model_id, session)
+        try:
+            await self.services.save_round(model_id, snapshot, session)
+        except StaleRoundError as exc:
+            self.logger.warning("%s", exc)
+            raise StaleRoundHttpException(str(exc)) from exc
+        await session.refresh(game_room)
+        return await self._load_detail(game_room, session)
+
+    async def play(
+        self,
+        websocket: WebSocket,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_websocket_user)],
+    ):
+        try:
+            game_room = await self.services.get_by_id(model_id, session)
+        except ModelNotFoundError as exc:
+            err_msg = f"{self.db_model_type_name}(id={model_id}) not found"
+            self.logger.warning(err_msg)
+            raise WebSocketException(status.WS_1008_POLICY_VIOLATION, err_msg) from exc
+
+        await websocket.accept()
+        assert user.id is not None
+        state = await game_room_registry.join(game_room, user.id, websocket, session)
+        try:
+            while True:
+                data = await websocket.receive_json()
+                try:
+                    event = GameRoomEvent.model_validate(data)
+                    await game_room_registry.handle(state, user.id, event, session)
+                except ValidationError as exc:
+                    await self._send_error(websocket, str(exc))
+                except GameRoomError as exc:
+                    await self._send_error(websocket, str(exc))
+                except RelationModelNotFoundError as exc:
+                    await self._send_error(websocket, exc.message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await game_room_registry.leave(state, user.id, session)
+
+    async def _send_error(self, websocket: WebSocket, detail: str) -> None:
+        self.logger.warning("%s", detail)
+        event = GameRoomEvent(type=GameRoomEventType.ERROR, detail=detail)
+        await websocket.send_json(
+            event.model_dump(mode="json", by_alias=True, exclude_none=True)
+        )
+
+
+def get_game_rooms_router():
+    return GameRoomRouter().router
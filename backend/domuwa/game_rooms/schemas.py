@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+from sqlmodel import Field
+
+from domuwa.core.schemas import APISchemaModel, APISchemaResponseModel
+from domuwa.game_rooms.constants import GameRoomEventType, GameRoomMessageKind
+
+if TYPE_CHECKING:
+    from domuwa.game_categories.schemas import GameCategoryRead
+    from domuwa.game_types.schemas import GameTypeRead
+
+
+class GameRoomBase(APISchemaModel):
+    rounds: int = Field(gt=0)
+    game_type_id: int
+    game_category_id: int
+
+
+class GameRoomCreate(GameRoomBase):
+    pass
+
+
+class GameRoomUpdate(APISchemaModel):
+    rounds: Optional[int] = Field(None, gt=0)
+
+
+class GameRoomRead(APISchemaResponseModel):
+    created_at: datetime
+    rounds: int
+    cur_round: int
+    finished: bool
+    version: int
+    game_type: "GameTypeRead"
+    game_category: "GameCategoryRead"
+
+
+class GameRoomEvent(APISchemaModel):
+    type: GameRoomEventType
+    player_id: Optional[int] = None
+    question_id: Optional[int] = None
+    answer_id: Optional[int] = None
+    cur_round: Optional[int] = None
+    scores: Optional[dict[int, float]] = None
+    detail: Optional[str] = None
+
+
+class GameRoomSnapshot(APISchemaModel):
+    version: int = 0
+    cur_round: int
+    finished: bool = False
+    question_id: Optional[int] = None
+    players: list[int] = []
+    scores: dict[int, float] = {}
+    answers: dict[int, int] = {}
+
+
+class GameRoomMessage(APISchemaModel):
+    kind: GameRoomMessageKind
+    id: str
+    player_id: Optional[int] = None
+    event: Optional[GameRoomEvent] = None
+    snapshot: Optional[GameRoomSnapshot] = None
@@ -1,83 +1,313 @@
-# def create_game_room(
-#     game: schemas.GameRoomCreateSchema,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> models.GameRoom:
-#     db_game_room = models.GameRoom(
-#         game_name=game.game_name,
-#         game_category=game.game_category,
-#         players=[],
-#     )
-#     return db.save_obj(db_game_room, db_sess)
-#
-#
-# def add_player(
-#     game_room_id: int,
-#     player_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> models.GameRoom:
-#     player = db.get_obj_of_type_by_id(player_id, models.Player, "Player", db_sess)
-#     game_room = db.get_obj_of_type_by_id(
-#         game_room_id,
-#         models.GameRoom,
-#         "GameRoom",
-#         db_sess,
-#     )
-#     player.game_room = game_room
-#     player.game_room_id = game_room_id
-#     if player not in game_room.players:
-#         db.save_obj(player, db_sess)
-#         game_room.players.append(player)
-#     return db.save_obj(game_room, db_sess)
-#
-#
-# def remove_player(
-#     game_room_id: int,
-#     player_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> models.GameRoom:
-#     player = db.get_obj_of_type_by_id(player_id, models.Player, "Player", db_sess)
-#     player.game_room = None
-#     player.game_room_id = None
-#     db.save_obj(player, db_sess)
-#     game = db.get_obj_of_type_by_id(
-#         game_room_id,
-#         models.GameRoom,
-#         "GameRoom",
-#         db_sess,
-#     )
-#     game.players.remove(player)
-#     return db.save_obj(game, db_sess)
-#
-#
-# def remove_all_players(
-#     game_room_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> models.GameRoom:
-#     game = db.get_obj_of_type_by_id(
-#         game_room_id,
-#         models.GameRoom,
-#         "GameRoom",
-#         db_sess,
-#     )
-#     players = (
-#         db_sess.query(models.Player)
-#         .filter(models.Player.game_room_id == game_room_id)
-#         .all()
-#     )
-#     for player in players:
-#         players_services.reset_player_game_room(player.id, db_sess)
-#     return db.save_obj(game, db_sess)
-#
-#
-# def delete_game_room(
-#     game_room_id: int,
-#     db_sess: Session = Depends(db.get_db_session),
-# ) -> None:
-#     db.delete_obj(game_room_id, models.GameRoom, "GameRoom", db_sess)
-#     players = (
-#         db_sess.query(models.Player)
-#         .filter(models.Player.game_room_id == game_room_id)
-#         .all()
-#     )
-#     for player in players:
-#         players_services.reset_player_game_room(player.id, db_sess)
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+
+from sqlalchemy import case, exists, insert, literal, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlmodel import col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing_extensions import override
+
+from domuwa.core.exceptions import StaleRoundError
+from domuwa.core.services import CommonServices
+from domuwa.game_rooms.constants import GAME_CATEGORY_QNA_CATEGORIES
+from domuwa.game_rooms.models import GameRoom, GameRoomQuestionsLink
+from domuwa.game_rooms.schemas import GameRoomCreate, GameRoomSnapshot, GameRoomUpdate
+from domuwa.players.models import Player
+from domuwa.rankings.leaderboard import leaderboards
+from domuwa.rankings.models import PlayerScore, Ranking
+
+
+class GameRoomServices(CommonServices[GameRoomCreate, GameRoomUpdate, GameRoom]):
+    db_model_type = GameRoom
+    logger = logging.getLogger(__name__)
+    # samples taken when questions are drawn by another round in the meantime
+    draw_attempts = 3
+    read_options = (
+        joinedload(GameRoom.game_type),  # type: ignore
+        joinedload(GameRoom.game_category),  # type: ignore
+    )
+
+    @override
+    async def save(
+        self,
+        model: GameRoomCreate | GameRoom,
+        session: AsyncSession,
+    ) -> GameRoom:
+        from domuwa.game_categories.services import GameCategoryServices
+        from domuwa.game_types.services import GameTypeServices
+
+        assert model.game_type_id is not None
+        await self.find_related_model(model.game_type_id, GameTypeServices(), session)
+        assert model.game_category_id is not None
+        await self.find_related_model(
+            model.game_category_id, GameCategoryServices(), session
+        )
+        return await super().save(model, session)
+
+    @override
+    async def apply_delete(self, model: GameRoom, session: AsyncSession) -> None:
+        await self._set_players_game_room(model.id, (), session)  # type: ignore
+        ranking = await self.get_ranking(model.id, session)  # type: ignore
+        if ranking is not None:
+            await session.exec(
+                delete(PlayerScore).where(col(PlayerScore.ranking_id) == ranking.id)  # type: ignore
+            )
+            await session.delete(ranking)
+        await super().apply_delete(model, session)
+
+    @override
+    async def delete(self, model: GameRoom, session: AsyncSession) -> None:
+        try:
+            await super().delete(model, session)
+        finally:
+            leaderboards.invalidate([model.id])  # type: ignore
+
+    @override
+    async def write_many(
+        self,
+        indexes: Sequence[int],
+        write: Callable[[int], Awaitable[GameRoom]],
+        session: AsyncSession,
+    ) -> dict[int, GameRoom | Exception]:
+        results = await super().write_many(indexes, write, session)
+        # deleted rooms take their scores with them
+        leaderboards.invalidate(
+            model.id  # type: ignore
+            for model in results.values()
+            if isinstance(model, GameRoom)
+        )
+        return results
+
+    @override
+    def get_related_services(self) -> dict[str, CommonServices]:
+        from domuwa.game_categories.services import GameCategoryServices
+        from domuwa.game_types.services import GameTypeServices
+
+        return {
+            "game_type_id": GameTypeServices(),
+            "game_category_id": GameCategoryServices(),
+        }
+
+    async def draw_questions(
+        self,
+        game_room_id: int,
+        count: int,
+        session: AsyncSession,
+    ) -> list[int]:
+        from domuwa.game_categories.services import GameCategoryServices
+        from domuwa.qna_categories.services import QnACategoryServices
+        from domuwa.questions.deck import question_deck
+
+        game_room = await self.get_by_id(game_room_id, session)
+        game_type_id = game_room.game_type_id
+        game_category_id = game_room.game_category_id
+        assert game_type_id is not None
+        assert game_category_id is not None
+        game_category = await GameCategoryServices().get_by_id(
+            game_category_id, session
+        )
+        qna_category_names = GAME_CATEGORY_QNA_CATEGORIES[game_category.name]
+        qna_category_ids: list[int] = [
+            qna_category.id  # type: ignore
+            for qna_category in await QnACategoryServices().get_all(session)
+            if qna_category.name in qna_category_names
+        ]
+        # a drawn question is linked to the room right away, so rounds started at the
+        # same time, on this or another worker, never draw the same one; the loop
+        # reads no model attributes, which a rollback expires
+        drawn_ids: list[int] = []
+        for _ in range(self.draw_attempts):
+            sampled_ids = await question_deck.sample(
+                game_room_id,
+                game_type_id,
+                qna_category_ids,
+                count - len(drawn_ids),
+                session,
+            )
+            if not sampled_ids:
+                break
+            for question_id in sampled_ids:
+                try:
+                    linked = await self._link_question(
+                        game_room_id, question_id, session
+                    )
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    linked = False
+                if linked:
+                    drawn_ids.append(question_id)
+            if len(drawn_ids) == count:
+                break
+        return drawn_ids
+
+    async def get_ranking(
+        self,
+        game_room_id: int,
+        session: AsyncSession,
+    ) -> Ranking | None:
+        result = await session.exec(
+            select(Ranking).where(Ranking.game_room_id == game_room_id)
+        )
+        return result.first()
+
+    async def get_scores(
+        self,
+        game_room_id: int,
+        session: AsyncSession,
+    ) -> dict[int, float]:
+        result = await session.exec(
+            select(PlayerScore)
+            .join(Ranking, col(PlayerScore.ranking_id) == Ranking.id)
+            .where(Ranking.game_room_id == game_room_id)
+        )
+        return {score.player_id: score.points for score in result.all()}  # type: ignore
+
+    async def save_round(
+        self,
+        game_room_id: int,
+        snapshot: GameRoomSnapshot,
+        session: AsyncSession,
+    ) -> None:
+        # a round is written with the same few statements whatever the number of
+        # players, only a snapshot newer than the saved one is written, and a
+        # finished game is counted for the players only once
+        from domuwa.players.services import PlayerServices
+
+        try:
+            counted = await self._advance_round(game_room_id, snapshot, session)
+            await self._set_players_game_room(game_room_id, snapshot.players, session)
+            if snapshot.question_id is not None:
+                await self._link_question(game_room_id, snapshot.question_id, session)
+            old_scores = await self._write_scores(game_room_id, snapshot, session)
+            if counted:
+                game_room = await self.get_by_id(game_room_id, session)
+                await PlayerServices().record_game(
+                    game_room.game_type_id, snapshot.scores, session
+                )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        leaderboards.record_scores(game_room_id, old_scores, snapshot.scores)
+        self.logger.debug(
+            "saved round %d of %s(id=%d)",
+            snapshot.cur_round,
+            self.db_model_type.__name__,
+            game_room_id,
+        )
+
+    async def _advance_round(
+        self,
+        game_room_id: int,
+        snapshot: GameRoomSnapshot,
+        session: AsyncSession,
+    ) -> bool:
+        # a snapshot of the same version, from another worker, is rejected as well
+        where = (
+            col(GameRoom.id) == game_room_id,
+            col(GameRoom.version) < snapshot.version,
+        )
+        values = {
+            "version": snapshot.version,
+            "cur_round": snapshot.cur_round,
+            "finished": snapshot.finished,
+        }
+        if snapshot.finished:
+            result = await session.exec(  # type: ignore
+                update(GameRoom)
+                .where(*where, col(GameRoom.finished) == False)  # noqa: E712
+                .values(values)
+            )
+            if result.rowcount:
+                return True
+
+        result = await session.exec(update(GameRoom).where(*where).values(values))  # type: ignore
+        if not result.rowcount:
+            game_room = await self.get_by_id(game_room_id, session)
+            raise StaleRoundError(
+                f"version {snapshot.version} of {self.db_model_type.__name__}"
+                f"(id={game_room_id}) is not newer than the saved version "
+                f"{game_room.version}"
+            )
+        return False
+
+    async def _link_question(
+        self,
+        game_room_id: int,
+        question_id: int,
+        session: AsyncSession,
+    ) -> bool:
+        link_exists = exists().where(
+            col(GameRoomQuestionsLink.game_room_id) == game_room_id,
+            col(GameRoomQuestionsLink.question_id) == question_id,
+        )
+        result = await session.exec(
+            insert(GameRoomQuestionsLink).from_select(  # type: ignore
+                ["game_room_id", "question_id"],
+                select(literal(game_room_id), literal(question_id)).where(~link_exists),
+            )
+        )
+        return result.rowcount > 0
+
+    async def _write_scores(
+        self,
+        game_room_id: int,
+        snapshot: GameRoomSnapshot,
+        session: AsyncSession,
+    ) -> dict[int, float]:
+        ranking = await self.get_ranking(game_room_id, session)
+        old_scores: dict[int, float] = {}
+        score_ids: dict[int, int] = {}
+        if ranking is None:
+            ranking = Ranking(game_room_id=game_room_id)
+            session.add(ranking)
+            await session.flush()
+        else:
+            result = await session.exec(
+                select(PlayerScore.id, PlayerScore.player_id, PlayerScore.points).where(
+                    PlayerScore.ranking_id == ranking.id
+                )
+            )
+            for score_id, player_id, points in result.all():
+                score_ids[player_id] = score_id  # type: ignore
+                old_scores[player_id] = points  # type: ignore
+
+        updated_scores = []
+        new_scores = []
+        for player_id, points in snapshot.scores.items():
+            if player_id not in score_ids:
+                new_scores.append(
+                    {"player_id": player_id, "ranking_id": ranking.id, "points": points}
+                )
+            elif old_scores[player_id] != points:
+                updated_scores.append({"id": score_ids[player_id], "points": points})
+        if updated_scores:
+            await session.exec(update(PlayerScore), params=updated_scores)  # type: ignore
+        if new_scores:
+            await session.exec(insert(PlayerScore), params=new_scores)  # type: ignore
+        return old_scores
+
+    async def _set_players_game_room(
+        self,
+        game_room_id: int,
+        player_ids: Iterable[int],
+        session: AsyncSession,
+    ) -> None:
+        player_ids = set(player_ids)
+        await session.exec(  # type: ignore
+            update(Player)
+            .where(
+                or_(
+                    col(Player.id).in_(player_ids),
+                    col(Player.game_room_id) == game_room_id,
+                )
+            )
+            .values(
+                game_room_id=case(
+                    (col(Player.id).in_(player_ids), game_room_id), else_=None
+                )
+            )
+        )
@@ -1,8 +1,8 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
@@ -17,6 +17,7 @@ from domuwa.game_types.schemas import (
 )
 from domuwa.game_types.services import GameTypeServices
 from domuwa.questions.schemas import QuestionWithAnswersRead
+from domuwa.questions.services import QuestionServices
 
 
 class GameTypeRoutes(
@@ -29,6 +30,7 @@ class GameTypeRoutes(
     services = GameTypeServices()
     logger = logging.getLogger(__name__)
     db_model_type_name = GameType.__name__
+    questions_load_options = QuestionServices.read_with_answers_options
 
     @override
     def _init_api_routes(self):
@@ -44,7 +46,7 @@ class GameTypeRoutes(
     async def create(
         self,
         model: GameTypeCreate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().create(model, session, user)
@@ -52,15 +54,28 @@ class GameTypeRoutes(
     async def get_all_questions(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
+        response: Response,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
     ):
         offset = (page - 1) * page_size
         include_deleted = user.is_staff
-        return await self.services.get_all_questions(
-            session, model_id, offset, page_size, include_deleted
+        return await self._paginate(
+            response,
+            self.services.get_all_questions(
+                session,
+                model_id,
+                offset,
+                page_size,
+                include_deleted,
+                self.questions_load_options,
+                after,
+            ),
+            page_size,
+            self.services.questions_pagination,
         )
 
     @override
@@ -68,7 +83,7 @@ class GameTypeRoutes(
         self,
         model_id: int,
         model_update: GameTypeUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().update(model_id, model_update, session, user)
@@ -77,7 +92,7 @@ class GameTypeRoutes(
     async def delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().delete(model_id, session, user)
@@ -1,14 +1,15 @@
 import logging
 from typing import Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from domuwa.core.pagination import KeysetPagination
 from domuwa.core.services import CommonServicesForEnumModels
 from domuwa.game_types.constants import GameTypeChoices
 from domuwa.game_types.models import GameType
 from domuwa.game_types.schemas import GameTypeCreate, GameTypeUpdate
-from domuwa.players.models import Player
-from domuwa.qna_categories.models import QnACategory
 from domuwa.questions.models import Question
 
 
@@ -19,28 +20,33 @@ class GameTypeServices(
     model_create_type = GameTypeCreate
     choices = GameTypeChoices
     logger = logging.getLogger(__name__)
+    questions_pagination = KeysetPagination("id", types=(int,), descending=True)
 
     @staticmethod
     async def get_all_questions(
-        session: Session,
+        session: AsyncSession,
         game_type_id: int,
         offset: int = 0,
         page_size: int = 25,
         include_deleted: bool = False,
+        options: Sequence[ORMOption] = (),
+        after: str | None = None,
     ) -> Sequence[Question]:
         stmt = (
             select(Question)
-            .join(Player, isouter=True)
-            .join(GameType, isouter=True)
-            .join(QnACategory, isouter=True)
-            .where(Question.game_type_id == game_type_id)  # type: ignore
+            .options(*options)
+            .where(
+                Question.game_type_id == game_type_id,  # type: ignore
+                Question.is_latest == True,  # noqa: E712
+            )
         )
 
         if not include_deleted:
             stmt = stmt.where(Question.deleted == False)  # noqa: E712
 
-        stmt = (
-            stmt.offset(offset).limit(page_size).order_by(Question.id.desc(), Question.excluded)  # type: ignore
+        stmt = GameTypeServices.questions_pagination.paginate(
+            stmt, Question, offset, page_size, after
         )
 
-        return session.exec(stmt).all()
+        result = await session.exec(stmt)
+        return result.all()
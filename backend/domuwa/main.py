@@ -5,24 +5,40 @@ from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING, Any, Sequence
 
 from fastapi import FastAPI, status
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response
 
 from domuwa.answers.routes import get_answers_router
 from domuwa.auth.routes import router as auth_router
+from domuwa.auth.security import password_hasher
 from domuwa.config import settings
-from domuwa.database import create_db_and_tables, get_db_session
+from domuwa.core.exceptions import (
+    ServiceOverloadedError,
+    ServiceUnavailableHttpException,
+)
+from domuwa.core.pagination import NEXT_CURSOR_HEADER
+from domuwa.database import create_db_and_tables, engine
 from domuwa.game_categories.routes import get_game_category_router
 from domuwa.game_categories.services import GameCategoryServices
+from domuwa.game_rooms.engine import game_room_registry
+from domuwa.game_rooms.routes import get_game_rooms_router
 from domuwa.game_types.routes import get_game_types_router
 from domuwa.game_types.services import GameTypeServices
+from domuwa.metrics.requests import MetricsMiddleware
+from domuwa.metrics.routes import prometheus_router
+from domuwa.metrics.routes import router as metrics_router
 from domuwa.players.routes import get_players_router
 from domuwa.qna_categories.routes import get_qna_categories_router
 from domuwa.qna_categories.services import QnACategoryServices
+from domuwa.questions.duplicates import question_duplicates
 from domuwa.questions.routes import get_questions_router
+from domuwa.rankings.leaderboard import leaderboards
+from domuwa.rankings.routes import router as leaderboard_router
 from domuwa.users.routes import get_users_router
 
 if TYPE_CHECKING:
@@ -33,9 +49,13 @@ if TYPE_CHECKING:
 async def lifespan(_: FastAPI):
     logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.INFO)
     logging.getLogger("asyncio").setLevel(logging.INFO)
-    create_db_and_tables()
+    await create_db_and_tables()
     await populate_db()
+    await load_caches()
+    await game_room_registry.broadcast.connect()
     yield
+    await game_room_registry.broadcast.disconnect()
+    password_hasher.shutdown()
 
 
 app = FastAPI(debug=settings.DEBUG, lifespan=lifespan)
@@ -49,7 +69,10 @@ app.include_router(get_answers_router(), prefix=API_PREFIX)
 app.include_router(get_questions_router(), prefix=API_PREFIX)
 app.include_router(get_game_category_router(), prefix=API_PREFIX)
 app.include_router(get_users_router(), prefix=API_PREFIX)
-# app.include_router(game_rooms_router, prefix=API_PREFIX)
+app.include_router(get_game_rooms_router(), prefix=API_PREFIX)
+app.include_router(leaderboard_router, prefix=API_PREFIX)
+app.include_router(metrics_router, prefix=API_PREFIX)
+app.include_router(prometheus_router)
 
 app.add_middleware(SessionMiddleware, secret_key=settings.SESSION_MIDDLEWARE_KEY)
 app.add_middleware(
@@ -58,7 +81,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+# added last, so it is the outermost middleware and times the others too
+app.add_middleware(MetricsMiddleware)
 
 logger = logging.getLogger(__name__)
 
@@ -80,11 +106,29 @@ async def validation_exception_handler(_: Request, exc: RequestValidationError):
     )
 
 
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_exception_handler(
+    request: Request,
+    exc: ServiceOverloadedError,
+):
+    logger.warning("%s %s rejected: %s", request.method, request.url.path, exc)
+    return await http_exception_handler(
+        request,
+        ServiceUnavailableHttpException("Server is busy, try again later"),
+    )
+
+
 async def populate_db():
-    session = next(get_db_session())
-    await QnACategoryServices().populate(session)
-    await GameCategoryServices().populate(session)
-    await GameTypeServices().populate(session)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await QnACategoryServices().populate(session)
+        await GameCategoryServices().populate(session)
+        await GameTypeServices().populate(session)
+
+
+async def load_caches():
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await question_duplicates.load(session)
+        await leaderboards.load(session)
 
 
 @app.get("/")
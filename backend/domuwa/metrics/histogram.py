@@ -0,0 +1,27 @@
+import bisect
+from collections.abc import Sequence
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        # upper bounds of the buckets, values above the last one are only counted
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self) -> list[tuple[float, int]]:
+        # (upper bound, values up to it), the last bound is infinity
+        counts = []
+        total = 0
+        for bound, count in zip(
+            (*self.buckets, float("inf")), self._bucket_counts, strict=True
+        ):
+            total += count
+            counts.append((bound, total))
+        return counts
@@ -0,0 +1,143 @@
+import math
+from collections.abc import Iterable, Mapping
+
+from domuwa.metrics.histogram import Histogram
+from domuwa.metrics.pool import MeteredPool
+from domuwa.metrics.requests import RequestMetrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_LABELS = ("method", "router", "route")
+STATUS_LABELS = (*REQUEST_LABELS, "status")
+
+
+def render_metrics(
+    request_metrics: RequestMetrics,
+    pools: Mapping[str, MeteredPool],
+) -> str:
+    lines: list[str] = []
+    _add_metric(
+        lines,
+        "domuwa_http_requests_total",
+        "counter",
+        "Requests handled by the API.",
+        STATUS_LABELS,
+        request_metrics.requests.items(),
+    )
+    _add_metric(
+        lines,
+        "domuwa_http_requests_in_flight",
+        "gauge",
+        "Requests being handled.",
+        ("method",),
+        (((method,), count) for method, count in request_metrics.in_flight.items()),
+    )
+    _add_histograms(
+        lines,
+        "domuwa_http_request_duration_seconds",
+        "Time taken to handle a request, including streaming its response.",
+        REQUEST_LABELS,
+        request_metrics.latency.items(),
+    )
+    _add_histograms(
+        lines,
+        "domuwa_http_request_db_queries",
+        "Database queries run for a request.",
+        REQUEST_LABELS,
+        request_metrics.queries.items(),
+    )
+    _add_metric(
+        lines,
+        "domuwa_auth_failures_total",
+        "counter",
+        "Requests refused as unauthenticated or without permission.",
+        STATUS_LABELS,
+        request_metrics.auth_failures.items(),
+    )
+
+    pool_labels = [((name,), pool) for name, pool in pools.items()]
+    _add_metric(
+        lines,
+        "domuwa_db_pool_size",
+        "gauge",
+        "Connections kept open by the pool.",
+        ("engine",),
+        ((labels, pool.size()) for labels, pool in pool_labels),
+    )
+    _add_metric(
+        lines,
+        "domuwa_db_pool_checked_out",
+        "gauge",
+        "Connections in use.",
+        ("engine",),
+        ((labels, pool.checkedout()) for labels, pool in pool_labels),
+    )
+    _add_metric(
+        lines,
+        "domuwa_db_pool_overflow",
+        "gauge",
+        "Connections opened over the pool size.",
+        ("engine",),
+        ((labels, pool.overflow()) for labels, pool in pool_labels),
+    )
+    _add_metric(
+        lines,
+        "domuwa_db_pool_timeouts_total",
+        "counter",
+        "Checkouts that timed out waiting for a connection.",
+        ("engine",),
+        ((labels, pool.timeouts) for labels, pool in pool_labels),
+    )
+    _add_histograms(
+        lines,
+        "domuwa_db_pool_wait_seconds",
+        "Time a checkout waited for a connection.",
+        ("engine",),
+        ((labels, pool.wait_time) for labels, pool in pool_labels),
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _add_metric(
+    lines: list[str],
+    name: str,
+    kind: str,
+    help_text: str,
+    label_names: tuple[str, ...],
+    samples: Iterable[tuple[tuple, float]],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for label_values, value in samples:
+        lines.append(f"{name}{_format_labels(label_names, label_values)} {value}")
+
+
+def _add_histograms(
+    lines: list[str],
+    name: str,
+    help_text: str,
+    label_names: tuple[str, ...],
+    histograms: Iterable[tuple[tuple, Histogram]],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for label_values, histogram in histograms:
+        for bound, count in histogram.get_cumulative_counts():
+            le = "+Inf" if math.isinf(bound) else str(bound)
+            labels = _format_labels((*label_names, "le"), (*label_values, le))
+            lines.append(f"{name}_bucket{labels} {count}")
+        labels = _format_labels(label_names, label_values)
+        lines.append(f"{name}_sum{labels} {histogram.sum}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
@@ -0,0 +1,112 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from domuwa.metrics.histogram import Histogram
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+AUTH_FAILURE_STATUS_CODES = frozenset({401, 403})
+UNMATCHED_ROUTE = "unmatched"
+
+# queries run for the request being handled, counted by an event of the engines
+_query_count: ContextVar[list[int] | None] = ContextVar("query_count", default=None)
+
+
+def count_query(*_args) -> None:
+    query_count = _query_count.get()
+    if query_count is not None:
+        query_count[0] += 1
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        # (method, router, route, status code) -> requests
+        self.requests: Counter[tuple[str, str, str, int]] = Counter()
+        self.auth_failures: Counter[tuple[str, str, str, int]] = Counter()
+        # (method, router, route) -> seconds and queries per request
+        self.latency: dict[tuple[str, str, str], Histogram] = {}
+        self.queries: dict[tuple[str, str, str], Histogram] = {}
+        # method -> requests being handled
+        self.in_flight: Counter[str] = Counter()
+
+    def observe(
+        self,
+        method: str,
+        router: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        query_count: int,
+    ) -> None:
+        labels = (method, router, route)
+        self.requests[(*labels, status_code)] += 1
+        if status_code in AUTH_FAILURE_STATUS_CODES:
+            self.auth_failures[(*labels, status_code)] += 1
+
+        latency = self.latency.get(labels)
+        if latency is None:
+            latency = self.latency[labels] = Histogram(LATENCY_BUCKETS)
+        latency.observe(duration)
+        queries = self.queries.get(labels)
+        if queries is None:
+            queries = self.queries[labels] = Histogram(QUERY_COUNT_BUCKETS)
+        queries.observe(query_count)
+
+    def clear(self) -> None:
+        self.requests.clear()
+        self.auth_failures.clear()
+        self.latency.clear()
+        self.queries.clear()
+        self.in_flight.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    # a plain ASGI middleware, so streamed responses are timed to their last chunk
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        query_count = [0]
+        token = _query_count.set(query_count)
+        self.metrics.in_flight[method] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            self.metrics.in_flight[method] -= 1
+            _query_count.reset(token)
+            # the router fills in the matched route
+            router, route = _get_route_labels(scope)
+            self.metrics.observe(
+                method, router, route, status_code, duration, query_count[0]
+            )
+
+
+def _get_route_labels(scope: Scope) -> tuple[str, str]:
+    route = scope.get("route")
+    if route is None:
+        return "", UNMATCHED_ROUTE
+    # the routes of a `BaseRouter` are bound methods of it
+    router = getattr(route.endpoint, "__self__", None)
+    return type(router).__name__ if router is not None else "", route.path
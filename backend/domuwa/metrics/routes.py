@@ -0,0 +1,72 @@
+import math
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from domuwa import auth
+from domuwa import database as db
+from domuwa.auth import User
+from domuwa.metrics.histogram import Histogram
+from domuwa.metrics.pool import MeteredPool
+from domuwa.metrics.prometheus import CONTENT_TYPE, render_metrics
+from domuwa.metrics.requests import request_metrics
+from domuwa.metrics.schemas import HistogramBucket, HistogramRead, PoolStats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+# scraped by Prometheus, so it is served outside of the API prefix
+prometheus_router = APIRouter(tags=["Metrics"])
+
+
+@prometheus_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(auth.authorize_metrics_scrape)],
+)
+async def get_metrics():
+    return PlainTextResponse(
+        render_metrics(request_metrics, _get_pools()), media_type=CONTENT_TYPE
+    )
+
+
+@router.get("/pools", response_model=list[PoolStats])
+async def get_pool_stats(user: Annotated[User, Depends(auth.get_admin_user)]):
+    del user
+    pool_stats = []
+    for name, pool in _get_pools().items():
+        pool_stats.append(
+            PoolStats(
+                engine=name,
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                timeouts=pool.timeouts,
+                wait_time_seconds=_get_histogram_read(pool.wait_time),
+            )
+        )
+    return pool_stats
+
+
+def _get_pools() -> dict[str, MeteredPool]:
+    engines = {"writer": db.engine} | {
+        f"reader-{index}": engine for index, engine in enumerate(db.read_engines)
+    }
+    return {
+        name: engine.pool
+        for name, engine in engines.items()
+        if isinstance(engine.pool, MeteredPool)
+    }
+
+
+def _get_histogram_read(histogram: Histogram) -> HistogramRead:
+    return HistogramRead(
+        buckets=[
+            HistogramBucket(
+                upper_bound=None if math.isinf(bound) else bound, count=count
+            )
+            for bound, count in histogram.get_cumulative_counts()
+        ],
+        count=histogram.count,
+        sum=histogram.sum,
+    )
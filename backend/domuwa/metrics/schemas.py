@@ -0,0 +1,23 @@
+from domuwa.core.schemas import APISchemaModel
+
+
+class HistogramBucket(APISchemaModel):
+    # null for the last bucket, which has no upper bound
+    upper_bound: float | None
+    count: int
+
+
+class HistogramRead(APISchemaModel):
+    buckets: list[HistogramBucket]
+    count: int
+    sum: float
+
+
+class PoolStats(APISchemaModel):
+    engine: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    timeouts: int
+    wait_time_seconds: HistogramRead
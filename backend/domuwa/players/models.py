@@ -28,3 +28,17 @@ class Player(SQLModel, table=True):
     player_scores: list["PlayerScore"] = Relationship(
         back_populates="player", sa_relationship_kwargs={"lazy": "selectin"}
     )
+
+
+class PlayerStats(SQLModel, table=True):
+    __tablename__ = "player_stats"
+
+    # rolled up per game type when a game room finishes, the authored cards also move
+    # with every write of the player's cards
+    player_id: int = Field(primary_key=True, foreign_key="player.id")
+    game_type_id: int = Field(primary_key=True, foreign_key="game_type.id")
+    games_played: int = 0
+    games_won: int = 0
+    points: float = 0.0
+    questions_authored: int = 0
+    answers_authored: int = 0
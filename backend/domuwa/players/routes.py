@@ -2,7 +2,7 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
@@ -13,6 +13,7 @@ from domuwa.players.models import Player
 from domuwa.players.schemas import (
     PlayerCreate,
     PlayerRead,
+    PlayerStatsRead,
     PlayerUpdate,
 )
 from domuwa.players.services import PlayerServices
@@ -28,12 +29,24 @@ class PlayerRouter(
     services = PlayerServices()
     logger = logging.getLogger(__name__)
     db_model_type_name = Player.__name__
+    list_load_options = PlayerServices.read_options
+    detail_load_options = PlayerServices.read_options
+
+    @override
+    def _init_api_routes(self):
+        super()._init_api_routes()
+        self.router.add_api_route(
+            f"/{self._lookup}/stats",
+            self.get_stats,
+            methods=["GET"],
+            response_model=PlayerStatsRead,
+        )
 
     @override
     async def create(
         self,
         model: PlayerCreate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().create(model, session, user)
@@ -43,11 +56,21 @@ class PlayerRouter(
         self,
         model_id: int,
         model_update: PlayerUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         return await super().update(model_id, model_update, session, user)
 
+    async def get_stats(
+        self,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+    ):
+        del user
+        await self.get_instance(model_id, session)
+        return await self.services.get_stats(model_id, session)
+
 
 def get_players_router():
     return PlayerRouter().router
@@ -19,3 +19,24 @@ class PlayerRead(APISchemaResponseModel, PlayerBase):
     user: UserRead
     games_played: int
     games_won: int
+
+
+class PlayerGameTypeStatsRead(APISchemaModel):
+    game_type_id: int
+    games_played: int
+    games_won: int
+    win_rate: float
+    average_points: float
+    questions_authored: int
+    answers_authored: int
+
+
+class PlayerStatsRead(APISchemaModel):
+    player_id: int
+    games_played: int
+    games_won: int
+    win_rate: float
+    average_points: float
+    questions_authored: int
+    answers_authored: int
+    game_types: list[PlayerGameTypeStatsRead]
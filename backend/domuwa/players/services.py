@@ -1,24 +1,229 @@
 import logging
-from typing import override
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, override
 
-from sqlmodel import Session
+from sqlalchemy import Integer, bindparam, exists, insert, literal, update
+from sqlalchemy.orm import joinedload
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from domuwa.core.services import CommonServices
-from domuwa.players.models import Player
-from domuwa.players.schemas import PlayerCreate, PlayerUpdate
+from domuwa.players.models import Player, PlayerStats
+from domuwa.players.schemas import (
+    PlayerCreate,
+    PlayerGameTypeStatsRead,
+    PlayerStatsRead,
+    PlayerUpdate,
+)
+
+if TYPE_CHECKING:
+    from domuwa.answers.models import Answer
+    from domuwa.questions.models import Question
 
 
 class PlayerServices(CommonServices[PlayerCreate, PlayerUpdate, Player]):
     db_model_type = Player
     logger = logging.getLogger(__name__)
+    read_options = (joinedload(Player.user),)  # type: ignore
 
     @override
     async def save(
         self,
         model: PlayerCreate | Player,
-        session: Session,
+        session: AsyncSession,
     ) -> Player:
         from domuwa.users.services import UserServices
 
         await self.find_related_model(model.id, UserServices(), session)
         return await super().save(model, session)
+
+    @override
+    def get_related_services(self) -> dict[str, CommonServices]:
+        from domuwa.users.services import UserServices
+
+        return {"id": UserServices()}
+
+    async def get_stats(self, player_id: int, session: AsyncSession) -> PlayerStatsRead:
+        result = await session.exec(
+            select(PlayerStats)
+            .where(PlayerStats.player_id == player_id)
+            .order_by(col(PlayerStats.game_type_id))
+        )
+        game_types = [
+            PlayerGameTypeStatsRead(
+                game_type_id=stats.game_type_id,
+                games_played=stats.games_played,
+                games_won=stats.games_won,
+                win_rate=_get_ratio(stats.games_won, stats.games_played),
+                average_points=_get_ratio(stats.points, stats.games_played),
+                questions_authored=stats.questions_authored,
+                answers_authored=stats.answers_authored,
+            )
+            for stats in result.all()
+        ]
+        games_played = sum(stats.games_played for stats in game_types)
+        games_won = sum(stats.games_won for stats in game_types)
+        points = sum(stats.average_points * stats.games_played for stats in game_types)
+        return PlayerStatsRead(
+            player_id=player_id,
+            games_played=games_played,
+            games_won=games_won,
+            win_rate=_get_ratio(games_won, games_played),
+            average_points=_get_ratio(points, games_played),
+            questions_authored=sum(stats.questions_authored for stats in game_types),
+            answers_authored=sum(stats.answers_authored for stats in game_types),
+            game_types=game_types,
+        )
+
+    async def record_game(
+        self,
+        game_type_id: int | None,
+        scores: dict[int, float],
+        session: AsyncSession,
+    ) -> None:
+        from domuwa.answers.models import Answer
+        from domuwa.questions.models import Question
+
+        if not scores:
+            return
+        # everybody with the most points wins, unless nobody scored
+        top_points = max(scores.values())
+        winner_ids = [
+            player_id
+            for player_id, points in scores.items()
+            if top_points > 0 and points == top_points
+        ]
+
+        await session.exec(  # type: ignore
+            update(Player)
+            .where(col(Player.id).in_(scores))
+            .values(games_played=col(Player.games_played) + 1)
+        )
+        if winner_ids:
+            await session.exec(  # type: ignore
+                update(Player)
+                .where(col(Player.id).in_(winner_ids))
+                .values(games_won=col(Player.games_won) + 1)
+            )
+        if game_type_id is None:
+            return
+
+        stats_exist = exists().where(
+            col(PlayerStats.player_id) == Player.id,
+            col(PlayerStats.game_type_id) == game_type_id,
+        )
+        await session.exec(  # type: ignore
+            insert(PlayerStats).from_select(
+                ["player_id", "game_type_id"],
+                select(Player.id, literal(game_type_id)).where(
+                    col(Player.id).in_(scores), ~stats_exist
+                ),
+            )
+        )
+
+        stats = PlayerStats.__table__.c  # type: ignore
+        await session.exec(  # type: ignore
+            update(PlayerStats.__table__)  # type: ignore
+            .where(
+                stats.player_id == bindparam("b_player_id"),
+                stats.game_type_id == game_type_id,
+            )
+            .values(
+                games_played=stats.games_played + 1,
+                games_won=stats.games_won + bindparam("b_won"),
+                points=stats.points + bindparam("b_points"),
+                questions_authored=_count_authored(Question),
+                answers_authored=_count_authored(Answer),
+            ),
+            params=[
+                {
+                    "b_player_id": player_id,
+                    "b_won": int(player_id in winner_ids),
+                    "b_points": points,
+                }
+                for player_id, points in scores.items()
+            ],
+        )
+
+    async def add_authored(
+        self,
+        model_type: type["Question"] | type["Answer"],
+        changes: Mapping[tuple[int | None, int | None], int],
+        session: AsyncSession,
+    ) -> None:
+        # moves the authored counts by the live cards a write adds or removes, in its
+        # transaction before it is committed; the cards themselves are not flushed
+        from domuwa.questions.models import Question
+
+        params = [
+            {
+                "b_player_id": author_id,
+                "b_game_type_id": game_type_id,
+                "b_change": change,
+            }
+            for (author_id, game_type_id), change in changes.items()
+            if author_id is not None and game_type_id is not None and change
+        ]
+        if not params:
+            return
+        column = "questions_authored" if model_type is Question else "answers_authored"
+        stats = PlayerStats.__table__.c  # type: ignore
+        where = (
+            stats.player_id == bindparam("b_player_id", type_=Integer),
+            stats.game_type_id == bindparam("b_game_type_id", type_=Integer),
+        )
+        with session.no_autoflush:
+            await session.exec(  # type: ignore
+                update(PlayerStats.__table__)  # type: ignore
+                .where(*where)
+                .values({column: stats[column] + bindparam("b_change")}),
+                params=params,
+            )
+            # the players who have no stats of the game type yet start from none
+            await session.exec(  # type: ignore
+                insert(PlayerStats.__table__).from_select(  # type: ignore
+                    ["player_id", "game_type_id", column],
+                    select(
+                        bindparam("b_player_id", type_=Integer),
+                        bindparam("b_game_type_id", type_=Integer),
+                        bindparam("b_change", type_=Integer),
+                    ).where(~exists().where(*where)),
+                ),
+                params=[
+                    param | {"b_change": max(param["b_change"], 0)} for param in params
+                ],
+            )
+
+
+def authored_changes(
+    added: Iterable["Question | Answer"] = (),
+    removed: Iterable["Question | Answer"] = (),
+) -> Counter[tuple[int | None, int | None]]:
+    # live cards per author and game type, which a write adds and removes, the deleted
+    # ones are not counted
+    changes: Counter[tuple[int | None, int | None]] = Counter()
+    for card in added:
+        if not card.deleted:
+            changes[card.author_id, card.game_type_id] += 1
+    for card in removed:
+        if not card.deleted:
+            changes[card.author_id, card.game_type_id] -= 1
+    return changes
+
+
+def _count_authored(model_type: type["Question"] | type["Answer"]):
+    return (
+        select(func.count())
+        .where(
+            model_type.author_id == PlayerStats.player_id,
+            model_type.game_type_id == PlayerStats.game_type_id,
+            model_type.is_latest == True,  # noqa: E712
+            model_type.deleted == False,  # noqa: E712
+        )
+        .scalar_subquery()
+    )
+
+
+def _get_ratio(value: float, count: int) -> float:
+    return value / count if count else 0.0
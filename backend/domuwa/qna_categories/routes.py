@@ -3,7 +3,7 @@ from typing import Annotated
 
 from fastapi import Depends
 from fastapi.routing import APIRouter
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
@@ -36,7 +36,7 @@ class QnACategoriesRouter(
     async def create(
         self,
         model: QnACategoryCreate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().create(model, session, user)
@@ -46,7 +46,7 @@ class QnACategoriesRouter(
         self,
         model_id: int,
         model_update: QnACategoryUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().update(model_id, model_update, session, user)
@@ -55,7 +55,7 @@ class QnACategoriesRouter(
     async def delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super().delete(model_id, session, user)
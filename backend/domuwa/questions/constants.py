@@ -1,2 +1,18 @@
+from enum import StrEnum
+
 TEXT_MIN_LEN = 1
 TEXT_MAX_LEN = 250
+# questions loaded from the db at a time while exporting
+EXPORT_BATCH_SIZE = 500
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+# failed cards reported back by an import, the rest are only counted
+IMPORT_MAX_ERRORS = 100
+
+# estimated share of common shingles above which a new question is a near-duplicate
+DUPLICATE_THRESHOLD = 0.8
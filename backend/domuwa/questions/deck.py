@@ -0,0 +1,103 @@
+import logging
+import random
+from collections.abc import Iterable
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.game_rooms.models import GameRoomQuestionsLink
+from domuwa.questions.models import Question
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionDeck:
+    def __init__(self) -> None:
+        # (game type id, qna category id) -> ids of the playable questions
+        self._question_ids: dict[tuple[int, int], list[int]] = {}
+
+    async def get_question_ids(
+        self,
+        game_type_id: int,
+        game_category_id: int,
+        session: AsyncSession,
+    ) -> list[int]:
+        key = (game_type_id, game_category_id)
+        question_ids = self._question_ids.get(key)
+        if question_ids is None:
+            question_ids = await self._load_question_ids(*key, session)
+            self._question_ids[key] = question_ids
+        return question_ids
+
+    def invalidate(
+        self, game_type_id: int | None, game_category_id: int | None
+    ) -> None:
+        self._question_ids.pop((game_type_id, game_category_id), None)  # type: ignore
+
+    def clear(self) -> None:
+        self._question_ids.clear()
+
+    async def sample(
+        self,
+        game_room_id: int,
+        game_type_id: int,
+        game_category_ids: Iterable[int],
+        count: int,
+        session: AsyncSession,
+    ) -> list[int]:
+        question_ids: list[int] = []
+        for game_category_id in game_category_ids:
+            question_ids += await self.get_question_ids(
+                game_type_id, game_category_id, session
+            )
+
+        result = await session.exec(
+            select(GameRoomQuestionsLink.question_id).where(
+                GameRoomQuestionsLink.game_room_id == game_room_id
+            )
+        )
+        played_ids = set(result.all())
+
+        if (len(played_ids) + count) * 2 <= len(question_ids):
+            # at least half of the deck can be drawn, so retrying on a played question
+            # is cheaper than copying the whole deck
+            sampled_ids: list[int] = []
+            seen_ids = set(played_ids)
+            while len(sampled_ids) < count:
+                question_id = random.choice(question_ids)
+                if question_id not in seen_ids:
+                    seen_ids.add(question_id)
+                    sampled_ids.append(question_id)
+            return sampled_ids
+
+        available_ids = [
+            question_id for question_id in question_ids if question_id not in played_ids
+        ]
+        return random.sample(available_ids, min(count, len(available_ids)))
+
+    @staticmethod
+    async def _load_question_ids(
+        game_type_id: int,
+        game_category_id: int,
+        session: AsyncSession,
+    ) -> list[int]:
+        result = await session.exec(
+            select(Question.id).where(
+                Question.game_type_id == game_type_id,
+                Question.game_category_id == game_category_id,
+                Question.deleted == False,  # noqa: E712
+                Question.excluded == False,  # noqa: E712
+                Question.is_latest == True,  # noqa: E712
+            )
+        )
+        question_ids = list(result.all())
+        logger.debug(
+            "loaded %d question ids of GameType(id=%d) and QnACategory(id=%d)",
+            len(question_ids),
+            game_type_id,
+            game_category_id,
+        )
+        return question_ids  # type: ignore
+
+
+question_deck = QuestionDeck()
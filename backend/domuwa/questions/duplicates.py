@@ -0,0 +1,206 @@
+import logging
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.questions.constants import DUPLICATE_THRESHOLD
+from domuwa.questions.models import Question
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 4
+# the signature is split into bands of rows, questions sharing any band are compared,
+# so pairs as similar as the threshold are very likely to be found
+BANDS = 12
+BAND_ROWS = 5
+SIGNATURE_SIZE = BANDS * BAND_ROWS
+# shingles in at least this share of the questions are left out of the signatures
+COMMON_SHINGLE_SHARE = 0.05
+COMMON_SHINGLE_MIN_COUNT = 100
+
+_HASH_MASK = (1 << 64) - 1
+_EMPTY_BIN = _HASH_MASK
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    # "Never have I ever..." and "never have i ever" are the same question
+    text = text.casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.replace("ł", "l"))
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def get_shingle_hashes(text: str) -> set[int]:
+    # the index lives in memory only, so the per process salted `hash` is enough
+    data = normalize_text(text).encode()
+    return {
+        hash(data[start : start + SHINGLE_SIZE]) & _HASH_MASK
+        for start in range(max(len(data) - SHINGLE_SIZE + 1, 1))
+    }
+
+
+def get_signature(shingle_hashes: Iterable[int]) -> array:
+    # one permutation hashing: every shingle goes into one of the bins, which keep
+    # the minimum, so a signature costs a single pass over the shingles
+    bins = [_EMPTY_BIN] * SIGNATURE_SIZE
+    for value in shingle_hashes:
+        index = value % SIGNATURE_SIZE
+        if value < bins[index]:
+            bins[index] = value
+
+    # short texts leave bins empty, they take the value of the next filled bin, so
+    # that the bins still collide with the probability of the texts' similarity
+    signature = array("Q", bins)
+    next_value, offset = _EMPTY_BIN, 0
+    for index in reversed(range(2 * SIGNATURE_SIZE)):
+        value = bins[index % SIGNATURE_SIZE]
+        if value != _EMPTY_BIN:
+            next_value, offset = value, 0
+            continue
+        offset += 1
+        if index < SIGNATURE_SIZE and next_value != _EMPTY_BIN:
+            signature[index] = (next_value + offset) & _HASH_MASK
+    return signature
+
+
+def get_similarity(signature: array, other_signature: array) -> float:
+    matches = sum(a == b for a, b in zip(signature, other_signature, strict=True))
+    return matches / SIGNATURE_SIZE
+
+
+class DuplicateIndex:
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD) -> None:
+        self.threshold = threshold
+        # question id -> (game type id, signature) of the latest, not deleted questions
+        self._signatures: dict[int, tuple[int | None, array]] = {}
+        # band -> hash of the band's rows -> ids of the questions
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in range(BANDS)]
+        # shingles shared by many questions, like the "never have i ever" every card
+        # of the game starts with, would put most questions in the same buckets
+        self._common_hashes: frozenset[int] = frozenset()
+        self._loaded = False
+
+    async def find_duplicate(
+        self,
+        text: str,
+        game_type_id: int | None,
+        session: AsyncSession,
+    ) -> int | None:
+        if not self._loaded:
+            await self.load(session)
+
+        signature = self._get_signature(get_shingle_hashes(text))
+        best_id, best_similarity = None, self.threshold
+        for question_id in self._get_candidate_ids(signature):
+            candidate_game_type_id, candidate_signature = self._signatures[question_id]
+            if candidate_game_type_id != game_type_id:
+                continue
+            similarity = get_similarity(signature, candidate_signature)
+            if similarity >= best_similarity:
+                best_id, best_similarity = question_id, similarity
+        return best_id
+
+    async def new_batch(self, session: AsyncSession) -> "DuplicateIndex":
+        # the questions of a bulk write only get into the index once written, so they
+        # are also checked against the ones before them in an index of their own,
+        # which leaves out the same common shingles
+        if not self._loaded:
+            await self.load(session)
+        batch = DuplicateIndex(self.threshold)
+        batch._common_hashes = self._common_hashes
+        batch._loaded = True
+        return batch
+
+    def add(self, question_id: int, game_type_id: int | None, text: str) -> None:
+        # until it is loaded the index is read from the db, which has the question
+        if not self._loaded:
+            return
+        self.remove(question_id)
+        self._insert(question_id, game_type_id, get_shingle_hashes(text))
+
+    def remove(self, question_id: int) -> None:
+        entry = self._signatures.pop(question_id, None)
+        if entry is None:
+            return
+        for band, key in enumerate(_get_band_keys(entry[1])):
+            question_ids = self._buckets[band][key]
+            question_ids.remove(question_id)
+            if not question_ids:
+                del self._buckets[band][key]
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        self._buckets = [{} for _ in range(BANDS)]
+        self._common_hashes = frozenset()
+        self._loaded = False
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.exec(
+            select(Question.id, Question.game_type_id, Question.text).where(
+                Question.is_latest == True,  # noqa: E712
+                Question.deleted == False,  # noqa: E712
+            )
+        )
+        questions = [
+            (question_id, game_type_id, get_shingle_hashes(text))
+            for question_id, game_type_id, text in result.all()
+        ]
+        hash_counts = Counter(
+            shingle_hash
+            for *_, shingle_hashes in questions
+            for shingle_hash in shingle_hashes
+        )
+        min_count = max(len(questions) * COMMON_SHINGLE_SHARE, COMMON_SHINGLE_MIN_COUNT)
+
+        self.clear()
+        self._common_hashes = frozenset(
+            shingle_hash
+            for shingle_hash, count in hash_counts.items()
+            if count >= min_count
+        )
+        self._loaded = True
+        for question_id, game_type_id, shingle_hashes in questions:
+            self._insert(question_id, game_type_id, shingle_hashes)  # type: ignore
+        logger.debug(
+            "indexed %d questions for duplicates, ignoring %d common shingles",
+            len(self._signatures),
+            len(self._common_hashes),
+        )
+
+    def _get_signature(self, shingle_hashes: set[int]) -> array:
+        # a text made of common shingles only is compared by all of them
+        return get_signature(shingle_hashes - self._common_hashes or shingle_hashes)
+
+    def _insert(
+        self,
+        question_id: int,
+        game_type_id: int | None,
+        shingle_hashes: set[int],
+    ) -> None:
+        signature = self._get_signature(shingle_hashes)
+        self._signatures[question_id] = (game_type_id, signature)
+        for band, key in enumerate(_get_band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(question_id)
+
+    def _get_candidate_ids(self, signature: array) -> set[int]:
+        candidate_ids: set[int] = set()
+        for band, key in enumerate(_get_band_keys(signature)):
+            candidate_ids.update(self._buckets[band].get(key, ()))
+        return candidate_ids
+
+
+def _get_band_keys(signature: array) -> list[int]:
+    return [
+        hash(tuple(signature[band * BAND_ROWS : (band + 1) * BAND_ROWS]))
+        for band in range(BANDS)
+    ]
+
+
+question_duplicates = DuplicateIndex()
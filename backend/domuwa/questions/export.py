@@ -0,0 +1,79 @@
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator
+
+from domuwa.questions.constants import ExportFormat
+from domuwa.questions.models import Question
+from domuwa.questions.schemas import QuestionWithAnswersRead
+
+CSV_FIELDS = (
+    "question_id",
+    "game_type",
+    "game_category",
+    "question_text",
+    "question_excluded",
+    "question_deleted",
+    "answer_id",
+    "answer_text",
+    "answer_excluded",
+    "answer_deleted",
+)
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+async def to_ndjson(questions: AsyncIterable[Question]) -> AsyncIterator[str]:
+    async for question in questions:
+        question_read = QuestionWithAnswersRead.model_validate(
+            question, from_attributes=True
+        )
+        yield question_read.model_dump_json(by_alias=True) + "\n"
+
+
+async def to_csv(questions: AsyncIterable[Question]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_FIELDS)
+    writer.writeheader()
+    yield _flush(buffer)
+    async for question in questions:
+        question_row = {
+            "question_id": question.id,
+            "game_type": question.game_type.name,  # type: ignore
+            "game_category": question.game_category.name,  # type: ignore
+            "question_text": question.text,
+            "question_excluded": question.excluded,
+            "question_deleted": question.deleted,
+        }
+        # one row per answer, or a single one for a question without answers
+        if not question.answers:
+            writer.writerow(question_row)
+        for answer in question.answers:
+            writer.writerow(
+                question_row
+                | {
+                    "answer_id": answer.id,
+                    "answer_text": answer.text,
+                    "answer_excluded": answer.excluded,
+                    "answer_deleted": answer.deleted,
+                }
+            )
+        yield _flush(buffer)
+
+
+def _flush(buffer: io.StringIO) -> str:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def export_questions(
+    questions: AsyncIterable[Question],
+    export_format: ExportFormat,
+) -> AsyncIterator[str]:
+    if export_format == ExportFormat.CSV:
+        return to_csv(questions)
+    return to_ndjson(questions)
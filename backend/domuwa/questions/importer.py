@@ -0,0 +1,395 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import re
+from collections import Counter
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from pathlib import Path
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.answers.models import Answer
+from domuwa.answers.schemas import AnswerCreate
+from domuwa.config import settings
+from domuwa.game_types.services import GameTypeServices
+from domuwa.players.services import PlayerServices
+from domuwa.qna_categories.services import QnACategoryServices
+from domuwa.questions.constants import IMPORT_MAX_ERRORS, ExportFormat
+from domuwa.questions.deck import question_deck
+from domuwa.questions.duplicates import question_duplicates
+from domuwa.questions.models import Question
+from domuwa.questions.schemas import (
+    QuestionCreate,
+    QuestionImportError,
+    QuestionImportReport,
+)
+
+logger = logging.getLogger(__name__)
+
+# line the card starts at -> the card, in the format of the NDJSON export
+Card = tuple[int, dict]
+ProgressCallback = Callable[[QuestionImportReport], Awaitable[None]]
+
+
+# the bytes that are not UTF-8, as iter_lines escapes them
+_INVALID_BYTES_RE = re.compile("[\udc80-\udcff]")
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    # invalid bytes are escaped rather than failing the whole import, the parsers
+    # report them as the error of their card
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode(errors="surrogateescape")
+    if buffer:
+        yield buffer.decode(errors="surrogateescape")
+
+
+def _find_invalid_bytes(text: str) -> str | None:
+    match = _INVALID_BYTES_RE.search(text)
+    if match is None:
+        return None
+    byte = ord(match.group()) - 0xDC00
+    return f"invalid UTF-8: byte 0x{byte:02x} at position {match.start()}"
+
+
+async def parse_ndjson(lines: AsyncIterable[str]) -> AsyncIterator[Card]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        if (error := _find_invalid_bytes(line)) is not None:
+            yield line_number, {"error": error}
+            continue
+        try:
+            card = json.loads(line)
+        except json.JSONDecodeError as exc:
+            card = {"error": f"invalid JSON: {exc}"}
+        if not isinstance(card, dict):
+            card = {"error": "expected a JSON object"}
+        yield line_number, card
+
+
+async def parse_csv(lines: AsyncIterable[str]) -> AsyncIterator[Card]:
+    # rows of one question are next to each other, the way the CSV export writes
+    # them, and are grouped by question_id, or by the question if it has no id
+    header: list[str] | None = None
+    record: list[str] = []
+    line_number = record_start = 0
+    card_key: object = None
+    card: Card | None = None
+    async for line in lines:
+        line_number += 1
+        record.append(line)
+        # a quoted field can span many lines
+        if sum(part.count('"') for part in record) % 2:
+            continue
+        text = "\n".join(record)
+        record_start, record = line_number - len(record) + 1, []
+        if not text.strip():
+            continue
+        if (error := _find_invalid_bytes(text)) is not None:
+            if card is not None:
+                yield card
+            card_key, card = None, None
+            yield record_start, {"error": error}
+            continue
+        row = next(csv.reader([text]))
+        if header is None:
+            header = row
+            continue
+
+        data = dict(zip(header, row, strict=False))
+        key = data.get("question_id") or (
+            data.get("game_type"),
+            data.get("game_category"),
+            data.get("question_text"),
+        )
+        if card is None or key != card_key:
+            if card is not None:
+                yield card
+            card_key = key
+            card = (
+                record_start,
+                {
+                    "text": data.get("question_text"),
+                    "gameType": data.get("game_type"),
+                    "gameCategory": data.get("game_category"),
+                    "excluded": data.get("question_excluded"),
+                    "deleted": data.get("question_deleted"),
+                    "answers": [],
+                },
+            )
+        if data.get("answer_text"):
+            card[1]["answers"].append(
+                {
+                    "text": data["answer_text"],
+                    "excluded": data.get("answer_excluded"),
+                    "deleted": data.get("answer_deleted"),
+                }
+            )
+    if card is not None:
+        yield card
+
+
+class QuestionImporter:
+    def __init__(
+        self,
+        session: AsyncSession,
+        author_id: int | None = None,
+        chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+        on_progress: ProgressCallback | None = None,
+    ) -> None:
+        self.session = session
+        self.author_id = author_id
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.report = QuestionImportReport()
+        self._game_type_ids: dict[str, int] = {}
+        self._game_category_ids: dict[str, int] = {}
+
+    async def run(self, cards: AsyncIterable[Card]) -> QuestionImportReport:
+        game_types = await GameTypeServices().get_cache(self.session)
+        self._game_type_ids = {
+            model.name: model_id  # type: ignore
+            for model_id, model in game_types.items()
+        }
+        game_categories = await QnACategoryServices().get_cache(self.session)
+        self._game_category_ids = {
+            model.name: model_id  # type: ignore
+            for model_id, model in game_categories.items()
+        }
+
+        chunk: list[tuple[int, dict, list[dict]]] = []
+        try:
+            async for line, card in cards:
+                try:
+                    chunk.append((line, *self._validate(card)))
+                except (ValueError, ValidationError) as exc:
+                    self._add_error(line, str(exc))
+                if len(chunk) >= self.chunk_size:
+                    await self._write(chunk)
+                    chunk = []
+            if chunk:
+                await self._write(chunk)
+        finally:
+            question_deck.clear()
+        logger.info(
+            "imported %d questions and %d answers, %d cards failed",
+            self.report.questions,
+            self.report.answers,
+            self.report.failed,
+        )
+        return self.report
+
+    def _validate(self, card: dict) -> tuple[dict, list[dict]]:
+        if "error" in card:
+            raise ValueError(card["error"])
+        game_type_id = self._find_id(
+            "game type",
+            self._game_type_ids,
+            card.get("gameType", card.get("game_type")),
+        )
+        game_category_id = self._find_id(
+            "game category",
+            self._game_category_ids,
+            card.get("gameCategory", card.get("game_category")),
+        )
+
+        question = QuestionCreate(
+            text=card.get("text"),  # type: ignore
+            author_id=self.author_id,
+            game_type_id=game_type_id,
+            game_category_id=game_category_id,
+        )
+        question_data = question.model_dump() | _parse_flags(card)
+
+        answers_data = []
+        for answer_card in card.get("answers") or ():
+            if isinstance(answer_card, str):
+                answer_card = {"text": answer_card}
+            answer = AnswerCreate(
+                text=answer_card.get("text"),
+                author_id=self.author_id,
+                game_type_id=game_type_id,
+                game_category_id=game_category_id,
+            )
+            answers_data.append(
+                answer.model_dump(exclude={"question_id"}) | _parse_flags(answer_card)
+            )
+        return question_data, answers_data
+
+    @staticmethod
+    def _find_id(kind: str, ids: dict[str, int], value: object) -> int:
+        # the NDJSON export nests the whole game type and category
+        name = value.get("name") if isinstance(value, dict) else value
+        if name not in ids:
+            raise ValueError(f"unknown {kind}: {name!r}")
+        return ids[name]  # type: ignore
+
+    async def _write(self, chunk: list[tuple[int, dict, list[dict]]]) -> None:
+        chunk = await self._remove_duplicates(chunk)
+        if chunk:
+            await self._insert(chunk)
+
+        self.report.chunks += 1
+        if self.on_progress is not None:
+            await self.on_progress(self.report)
+
+    async def _remove_duplicates(
+        self,
+        chunk: list[tuple[int, dict, list[dict]]],
+    ) -> list[tuple[int, dict, list[dict]]]:
+        # earlier chunks are in the index already, the cards of this one are checked
+        # against the ones before them
+        batch = await question_duplicates.new_batch(self.session)
+        unique_chunk = []
+        for line, question_data, answers_data in chunk:
+            text, game_type_id = question_data["text"], question_data["game_type_id"]
+            if question_data["deleted"]:
+                unique_chunk.append((line, question_data, answers_data))
+                continue
+            duplicate_id = await question_duplicates.find_duplicate(
+                text, game_type_id, self.session
+            )
+            duplicate_line = await batch.find_duplicate(
+                text, game_type_id, self.session
+            )
+            if duplicate_id is not None:
+                self._add_error(
+                    line,
+                    f"it is a near-duplicate of {Question.__name__}(id={duplicate_id})",
+                )
+            elif duplicate_line is not None:
+                self._add_error(
+                    line, f"it is a near-duplicate of the card on line {duplicate_line}"
+                )
+            else:
+                batch.add(line, game_type_id, text)
+                unique_chunk.append((line, question_data, answers_data))
+        return unique_chunk
+
+    async def _insert(self, chunk: list[tuple[int, dict, list[dict]]]) -> None:
+        # the questions need their ids back for the answers, which then go in a
+        # single executemany
+        try:
+            result = await self.session.exec(
+                insert(Question).returning(  # type: ignore
+                    Question.id,  # type: ignore
+                    sort_by_parameter_order=True,
+                ),
+                params=[question_data for _, question_data, _ in chunk],
+            )
+            question_ids = result.scalars().all()  # type: ignore
+            answers_data = [
+                answer_data | {"question_id": question_id}
+                for question_id, (_, _, card_answers) in zip(
+                    question_ids, chunk, strict=True
+                )
+                for answer_data in card_answers
+            ]
+            if answers_data:
+                await self.session.exec(insert(Answer), params=answers_data)  # type: ignore
+            for model_type, cards in (
+                (Question, [question_data for _, question_data, _ in chunk]),
+                (Answer, answers_data),
+            ):
+                changes = Counter(
+                    (card["author_id"], card["game_type_id"])
+                    for card in cards
+                    if not card["deleted"]
+                )
+                await PlayerServices().add_authored(model_type, changes, self.session)
+            await self.session.commit()
+        except IntegrityError as exc:
+            await self.session.rollback()
+            logger.warning(
+                "could not import the chunk from line %d: %s", chunk[0][0], exc
+            )
+            for line, _, _ in chunk:
+                self._add_error(line, str(exc.orig))
+        else:
+            for question_id, (_, question_data, _) in zip(question_ids, chunk):
+                if not question_data["deleted"]:
+                    question_duplicates.add(
+                        question_id,
+                        question_data["game_type_id"],
+                        question_data["text"],
+                    )
+            self.report.questions += len(chunk)
+            self.report.answers += len(answers_data)
+
+    def _add_error(self, line: int, detail: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < IMPORT_MAX_ERRORS:
+            self.report.errors.append(QuestionImportError(line=line, detail=detail))
+
+
+def _parse_flags(card: dict) -> dict[str, bool]:
+    flags = {}
+    for flag in ("excluded", "deleted"):
+        value = card.get(flag)
+        if isinstance(value, str):
+            value = value.lower() in ("true", "1", "yes")
+        flags[flag] = bool(value)
+    return flags
+
+
+def parse_cards(
+    chunks: AsyncIterable[bytes],
+    import_format: ExportFormat,
+) -> AsyncIterator[Card]:
+    lines = iter_lines(chunks)
+    if import_format == ExportFormat.CSV:
+        return parse_csv(lines)
+    return parse_ndjson(lines)
+
+
+async def main() -> None:
+    from domuwa.database import engine
+
+    parser = argparse.ArgumentParser(description="Import a pack of questions")
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        help="defaults to the file extension",
+    )
+    parser.add_argument("--author-id", type=int)
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    import_format = args.format or ExportFormat(args.path.suffix.lstrip("."))
+
+    async def read_file() -> AsyncIterator[bytes]:
+        with args.path.open("rb") as file:
+            while chunk := file.read(64 * 1024):
+                yield chunk
+
+    async def print_progress(report: QuestionImportReport) -> None:
+        print(
+            f"{report.questions} questions, {report.answers} answers imported, "
+            f"{report.failed} failed"
+        )
+
+    logging.basicConfig(level=logging.INFO)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        importer = QuestionImporter(
+            session, args.author_id, args.chunk_size, print_progress
+        )
+        report = await importer.run(parse_cards(read_file(), import_format))
+    for error in report.errors:
+        print(f"line {error.line}: {error.detail}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
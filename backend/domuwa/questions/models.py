@@ -1,7 +1,9 @@
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
+from domuwa.core.search import FullTextSearch
 from domuwa.game_rooms.models import GameRoomQuestionsLink
 from domuwa.questions.constants import TEXT_MAX_LEN, TEXT_MIN_LEN
 
@@ -15,13 +17,40 @@ if TYPE_CHECKING:
 
 class Question(SQLModel, table=True):
     __tablename__ = "question"
+    __table_args__ = (
+        Index(
+            "ix_question_game_type_id_deleted_excluded_id",
+            "game_type_id",
+            "deleted",
+            "excluded",
+            "id",
+        ),
+        # partial indexes over the latest versions that were not deleted, used by the
+        # list queries
+        Index(
+            "ix_question_latest_excluded_id",
+            "excluded",
+            "id",
+            sqlite_where=text("is_latest = 1 AND deleted = 0"),
+            postgresql_where=text("is_latest = true AND deleted = false"),
+        ),
+        Index(
+            "ix_question_latest_game_type_id_id",
+            "game_type_id",
+            "id",
+            sqlite_where=text("is_latest = 1 AND deleted = 0"),
+            postgresql_where=text("is_latest = true AND deleted = false"),
+        ),
+    )
 
     id: int | None = Field(None, primary_key=True)
     text: str = Field(min_length=TEXT_MIN_LEN, max_length=TEXT_MAX_LEN)
-    excluded: bool = Field(False, index=True)
-    deleted: bool = Field(False, index=True)
+    excluded: bool = False
+    deleted: bool = False
+    # false once the row was replaced by a newer version
+    is_latest: bool = True
 
-    author_id: Optional[int] = Field(None, foreign_key="player.id")
+    author_id: Optional[int] = Field(None, foreign_key="player.id", index=True)
     author: Optional["Player"] = Relationship(back_populates="questions")
 
     game_type_id: Optional[int] = Field(None, foreign_key="game_type.id")
@@ -30,7 +59,11 @@ class Question(SQLModel, table=True):
     game_category_id: Optional[int] = Field(None, foreign_key="qna_category.id")
     game_category: Optional["QnACategory"] = Relationship(back_populates="questions")
 
-    prev_version_id: Optional[int] = Field(None, foreign_key="question.id")
+    prev_version_id: Optional[int] = Field(
+        None,
+        foreign_key="question.id",
+        index=True,
+    )
     prev_version: Optional["Question"] = Relationship(
         back_populates="next_versions",
         sa_relationship_kwargs={"remote_side": "Question.id"},
@@ -43,3 +76,6 @@ class Question(SQLModel, table=True):
         back_populates="questions",
         link_model=GameRoomQuestionsLink,
     )
+
+
+question_search = FullTextSearch(Question)
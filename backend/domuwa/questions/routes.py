@@ -1,17 +1,32 @@
 import logging
+from collections.abc import Sequence
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
 from domuwa.auth import User
+from domuwa.config import settings
 from domuwa.core.routes import CommonRouterWithAuth
-from domuwa.database import get_db_session
-from domuwa.questions.models import Question
+from domuwa.database import get_db_session, get_session_engine
+from domuwa.questions.constants import ExportFormat
+from domuwa.questions.export import MEDIA_TYPES, export_questions
+from domuwa.questions.importer import QuestionImporter, parse_cards
+from domuwa.questions.models import Question, question_search
 from domuwa.questions.schemas import (
     QuestionCreate,
+    QuestionImportReport,
     QuestionRead,
     QuestionUpdate,
     QuestionWithAnswersRead,
@@ -29,6 +44,8 @@ class QuestionRouter(
     services = QuestionServices()
     logger = logging.getLogger(__name__)
     db_model_type_name = Question.__name__
+    list_load_options = QuestionServices.read_options
+    detail_load_options = QuestionServices.read_with_answers_options
 
     def __init__(self) -> None:
         super().__init__()
@@ -48,7 +65,7 @@ class QuestionRouter(
     async def get_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         model = await super().get_by_id(model_id, session, user)
@@ -59,23 +76,146 @@ class QuestionRouter(
 
         return model
 
+    @override
+    def _init_api_routes(self):
+        # before the single model routes, so their paths are not taken for a model id
+        self.router.add_api_route(
+            "/search",
+            self.search,
+            methods=["GET"],
+            response_model=list[self.response_model],  # type: ignore
+        )
+        self.router.add_api_route(
+            "/export",
+            self.export,
+            methods=["GET"],
+            response_class=StreamingResponse,
+        )
+        self.router.add_api_route(
+            "/import",
+            self.import_questions,
+            methods=["POST"],
+            response_model=QuestionImportReport,
+        )
+        super()._init_api_routes()
+        self._add_get_history_route()
+
+    async def search(
+        self,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+        response: Response,
+        query: Annotated[str, Query(alias="q", min_length=1)],
+        page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
+    ):
+        # best matches first, `after` takes the cursor of the previous page
+        return await self._search(
+            response,
+            self.services.search(
+                query,
+                session,
+                page_size,
+                user.is_staff,
+                after=after,
+                options=self.list_load_options,
+            ),
+            page_size,
+            question_search,
+        )
+
+    async def import_questions(
+        self,
+        request: Request,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_admin_user)],
+        import_format: Annotated[
+            ExportFormat, Query(alias="format")
+        ] = ExportFormat.NDJSON,
+        # a chunk is a single transaction, bounded like the bulk routes
+        chunk_size: Annotated[
+            int, Query(ge=1, le=settings.BULK_MAX_SIZE)
+        ] = settings.IMPORT_CHUNK_SIZE,
+    ):
+        # the body is parsed while it is received, a chunk of cards at a time
+        importer = QuestionImporter(session, user.id, chunk_size)
+        return await importer.run(parse_cards(request.stream(), import_format))
+
+    async def export(
+        self,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_admin_user)],
+        export_format: Annotated[
+            ExportFormat, Query(alias="format")
+        ] = ExportFormat.NDJSON,
+        game_type_id: Annotated[int | None, Query()] = None,
+        include_deleted: Annotated[bool, Query()] = False,
+    ):
+        del user
+
+        engine = get_session_engine(session)
+
+        async def stream():
+            async with AsyncSession(engine, expire_on_commit=False) as db_sess:
+                questions = self.services.stream_with_answers(
+                    db_sess, game_type_id, include_deleted
+                )
+                async for chunk in export_questions(questions, export_format):
+                    yield chunk
+
+        return StreamingResponse(
+            stream(),
+            media_type=MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="questions.{export_format}"'
+                ),
+            },
+        )
+
+    async def get_history(
+        self,
+        model_id: int,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        user: Annotated[User, Depends(auth.get_current_active_user)],
+        max_depth: Annotated[
+            int, Query(ge=1, le=QuestionServices.max_history_depth)
+        ] = QuestionServices.max_history_depth,
+    ):
+        return await self._get_history(
+            model_id, session, max_depth, include_deleted=user.is_staff
+        )
+
     @override
     async def get_all(
         self,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
+        response: Response,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1)] = 25,
+        after: Annotated[str | None, Query()] = None,
     ):
         offset = (page - 1) * page_size
         include_deleted = user.is_staff
-        return await self.services.get_all(session, offset, page_size, include_deleted)
+        return await self._paginate(
+            response,
+            self.services.get_all(
+                session,
+                offset,
+                page_size,
+                include_deleted,
+                after=after,
+                options=self.list_load_options,
+            ),
+            page_size,
+        )
 
     @override
     async def create(
         self,
         model: QuestionCreate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         model.author_id = user.id
@@ -86,12 +226,34 @@ class QuestionRouter(
         self,
         model_id: int,
         model_update: QuestionUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         model_update.author_id = user.id
         return await super().update(model_id, model_update, session, user)
 
+    @override
+    async def bulk_create(
+        self,
+        models: Sequence[QuestionCreate],
+        session: AsyncSession,
+        user: User,
+    ):
+        for model in models:
+            model.author_id = user.id
+        return await super().bulk_create(models, session, user)
+
+    @override
+    async def bulk_update(
+        self,
+        model_updates: Sequence[tuple[int, QuestionUpdate]],
+        session: AsyncSession,
+        user: User,
+    ):
+        for _, model_update in model_updates:
+            model_update.author_id = user.id
+        return await super().bulk_update(model_updates, session, user)
+
 
 def get_questions_router():
     return QuestionRouter().router
@@ -45,3 +45,17 @@ class QuestionRead(APISchemaResponseModel):
 
 class QuestionWithAnswersRead(QuestionRead):
     answers: list[AnswerRead]
+
+
+class QuestionImportError(APISchemaModel):
+    line: int
+    detail: str
+
+
+class QuestionImportReport(APISchemaModel):
+    questions: int = 0
+    answers: int = 0
+    failed: int = 0
+    chunks: int = 0
+    # only the first IMPORT_MAX_ERRORS of the failed cards
+    errors: list[QuestionImportError] = []
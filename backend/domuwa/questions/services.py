@@ -1,84 +1,174 @@
 import logging
-from typing import Sequence
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
-from domuwa.core.services import CommonServices
-from domuwa.questions.models import Question
+from domuwa.answers.models import Answer
+from domuwa.answers.services import AnswerServices
+from domuwa.core.exceptions import InvalidModelInputError
+from domuwa.core.pagination import KeysetPagination
+from domuwa.core.services import CommonServices, CommonServicesForVersionedModels
+from domuwa.players.models import Player
+from domuwa.players.services import PlayerServices, authored_changes
+from domuwa.questions.constants import EXPORT_BATCH_SIZE
+from domuwa.questions.deck import question_deck
+from domuwa.questions.duplicates import question_duplicates
+from domuwa.questions.models import Question, question_search
 from domuwa.questions.schemas import QuestionCreate, QuestionUpdate
 
 
-class QuestionServices(CommonServices[QuestionCreate, QuestionUpdate, Question]):
+class QuestionServices(
+    CommonServicesForVersionedModels[QuestionCreate, QuestionUpdate, Question]
+):
     db_model_type = Question
     logger = logging.getLogger(__name__)
+    pagination = KeysetPagination("excluded", "id", types=(bool, int))
+    read_options = (
+        joinedload(Question.author).joinedload(Player.user),  # type: ignore
+        joinedload(Question.game_type),  # type: ignore
+        joinedload(Question.game_category),  # type: ignore
+    )
+    read_with_answers_options = (
+        *read_options,
+        selectinload(Question.answers).options(*AnswerServices.read_options),  # type: ignore
+    )
 
     @override
     async def get_all(
         self,
-        session: Session,
+        session: AsyncSession,
         offset: int = 0,
         limit: int = 25,
         include_deleted: bool = False,
+        *,
+        after: str | None = None,
+        options: Sequence[ORMOption] = (),
     ) -> Sequence[Question]:
-        stmt = select(self.db_model_type).where(Question.next_versions)
+        stmt = (
+            select(self.db_model_type)
+            .options(*options)
+            .where(Question.is_latest == True)  # noqa: E712
+        )
 
         if not include_deleted:
             stmt = stmt.where(Question.deleted == False)  # noqa: E712
 
         # TODO: add grouping by excluded
-        stmt = stmt.offset(offset).limit(limit).order_by(Question.excluded)  # type: ignore
-        return session.exec(stmt).all()
+        stmt = self.pagination.paginate(stmt, Question, offset, limit, after)
+        result = await session.exec(stmt)
+        return result.all()
+
+    async def stream_with_answers(
+        self,
+        session: AsyncSession,
+        game_type_id: int | None = None,
+        include_deleted: bool = False,
+    ) -> AsyncIterator[Question]:
+        # latest versions of the questions, loaded from a server side cursor a batch
+        # at a time, so memory use does not grow with the number of questions
+        answers_loader = selectinload(
+            Question.answers.and_(Answer.deleted == False)  # type: ignore # noqa: E712
+            if not include_deleted
+            else Question.answers  # type: ignore
+        )
+        stmt = (
+            select(Question)
+            .options(
+                *self.read_options,
+                answers_loader.options(*AnswerServices.read_options),
+            )
+            .where(Question.is_latest == True)  # noqa: E712
+            .order_by(col(Question.id))
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if game_type_id is not None:
+            stmt = stmt.where(Question.game_type_id == game_type_id)
+        if not include_deleted:
+            stmt = stmt.where(Question.deleted == False)  # noqa: E712
+
+        result = await session.stream_scalars(stmt)
+        async for question in result:
+            yield question
+
+    async def search(
+        self,
+        query: str,
+        session: AsyncSession,
+        limit: int = 25,
+        include_deleted: bool = False,
+        *,
+        after: str | None = None,
+        options: Sequence[ORMOption] = (),
+    ) -> Sequence[tuple[Question, float]]:
+        where = [Question.is_latest == True]  # noqa: E712
+        if not include_deleted:
+            where.append(Question.deleted == False)  # noqa: E712
+        return await question_search.search(
+            query, session, limit, after, where=where, options=options
+        )
 
     @override
     async def update(
         self,
         model: Question,
         model_update: QuestionUpdate,
-        session: Session,
+        session: AsyncSession,
     ) -> Question:
         await self.validate_related_models_exist(model, session)
-
-        if model_update.excluded is not None and model.excluded != model_update.excluded:
-            model.excluded = model_update.excluded
-            session.add(model)
-            session.commit()
-            session.refresh(model)
-            return model
-
-        session.autoflush = False
-
-        update_data = model_update.model_dump(exclude_unset=True)
-        model_data = model.model_dump(exclude={"id"}) | update_data
-        updated_model = Question(**model_data)
-
-        updated_model.prev_version = model
-        model.next_versions.append(updated_model)
-
-        answers = model.answers
-        if answers:
-            updated_model.answers = answers
-
-        session.add(updated_model)
-        session.add(model)
-        session.commit()
-        session.refresh(updated_model)
-        session.autoflush = True
+        # a new version takes over the answers
+        await session.refresh(model, ["answers"])
+        updated_model = await super().update(model, model_update, session)
+        question_deck.invalidate(model.game_type_id, model.game_category_id)
+        if updated_model is not model:
+            question_deck.invalidate(
+                updated_model.game_type_id, updated_model.game_category_id
+            )
+            question_duplicates.remove(model.id)  # type: ignore
+            if not updated_model.deleted:
+                question_duplicates.add(
+                    updated_model.id,  # type: ignore
+                    updated_model.game_type_id,
+                    updated_model.text,
+                )
         return updated_model
 
     @override
     async def save(
         self,
         model: QuestionCreate | Question,
-        session: Session,
+        session: AsyncSession,
     ) -> Question:
         await self.validate_related_models_exist(model, session)
-        return await super().save(model, session)
+        duplicate_id = await question_duplicates.find_duplicate(
+            model.text, model.game_type_id, session
+        )
+        if duplicate_id is not None:
+            err_msg = (
+                f"it is a near-duplicate of {Question.__name__}(id={duplicate_id})"
+            )
+            self.logger.warning(err_msg)
+            raise InvalidModelInputError(err_msg)
+
+        if not isinstance(model, Question):
+            model = Question.model_validate(model)
+        await self.apply_create(model, session)
+        question = await super().save(model, session)
+        question_deck.invalidate(question.game_type_id, question.game_category_id)
+        question_duplicates.add(
+            question.id,  # type: ignore
+            question.game_type_id,
+            question.text,
+        )
+        return question
 
     async def validate_related_models_exist(
         self,
         model: QuestionCreate | QuestionUpdate | Question,
-        session: Session,
+        session: AsyncSession,
     ) -> None:
         from domuwa.game_types.services import GameTypeServices
         from domuwa.qna_categories.services import QnACategoryServices
@@ -91,7 +181,26 @@ class QuestionServices(CommonServices[QuestionCreate, QuestionUpdate, Question])
         await self.find_related_model(model.game_type_id, GameTypeServices(), session)
 
     @override
-    async def delete(self, model: Question, session: Session):
+    async def delete(self, model: Question, session: AsyncSession):
+        await self.apply_delete(model, session)
+        await session.commit()
+        question_deck.invalidate(model.game_type_id, model.game_category_id)
+        question_duplicates.remove(model.id)  # type: ignore
+        self.logger.debug("marked %s(id=%d) as deleted", Question.__name__, model.id)
+
+    @override
+    async def apply_create(self, model: Question, session: AsyncSession) -> None:
+        await super().apply_create(model, session)
+        await PlayerServices().add_authored(
+            Question, authored_changes([model]), session
+        )
+
+    @override
+    async def apply_delete(self, model: Question, session: AsyncSession) -> None:
+        if model.is_latest:
+            await PlayerServices().add_authored(
+                Question, authored_changes(removed=[model]), session
+            )
         model.deleted = True
 
         # TODO: rethink if answers should also be deleted - they could be shared
@@ -100,5 +209,103 @@ class QuestionServices(CommonServices[QuestionCreate, QuestionUpdate, Question])
         #     session.add(answer)
 
         session.add(model)
-        session.commit()
-        self.logger.debug("marked %s(id=%d) as deleted", Question.__name__, model.id)
+
+    @override
+    async def apply_update(
+        self,
+        model: Question,
+        update_data: dict,
+        session: AsyncSession,
+    ) -> Question:
+        updated_model = await super().apply_update(model, update_data, session)
+        if updated_model is not model:
+            updated_model.answers = list(model.answers)
+            await PlayerServices().add_authored(
+                Question, authored_changes([updated_model], [model]), session
+            )
+        return updated_model
+
+    @override
+    async def update_many(
+        self,
+        model_updates: Sequence[tuple[int, QuestionUpdate]],
+        session: AsyncSession,
+        options: Sequence[ORMOption] = (),
+    ) -> list[Question | Exception]:
+        return await super().update_many(
+            model_updates,
+            session,
+            (selectinload(Question.answers), *options),  # type: ignore
+        )
+
+    @override
+    async def create_many(
+        self,
+        models: Sequence[QuestionCreate],
+        session: AsyncSession,
+    ) -> list[Question | Exception]:
+        # near-duplicates are checked per item, also against the items before them
+        batch = await question_duplicates.new_batch(session)
+        results: dict[int, Question | Exception] = {}
+        indexes: list[int] = []
+        for index, model in enumerate(models):
+            duplicate_id = await question_duplicates.find_duplicate(
+                model.text, model.game_type_id, session
+            )
+            batch_index = await batch.find_duplicate(
+                model.text, model.game_type_id, session
+            )
+            if duplicate_id is not None:
+                err_msg = (
+                    f"it is a near-duplicate of {Question.__name__}(id={duplicate_id})"
+                )
+            elif batch_index is not None:
+                err_msg = f"it is a near-duplicate of item {batch_index}"
+            else:
+                batch.add(index, model.game_type_id, model.text)
+                indexes.append(index)
+                continue
+            self.logger.warning(err_msg)
+            results[index] = InvalidModelInputError(err_msg)
+
+        created = await super().create_many([models[i] for i in indexes], session)
+        results |= dict(zip(indexes, created, strict=True))
+        return [results[index] for index in range(len(models))]
+
+    @override
+    async def write_many(
+        self,
+        indexes: Sequence[int],
+        write: Callable[[int], Awaitable[Question]],
+        session: AsyncSession,
+    ) -> dict[int, Question | Exception]:
+        try:
+            results = await super().write_many(indexes, write, session)
+        finally:
+            # bulk writes can touch any deck, so they are all reloaded
+            question_deck.clear()
+
+        for question in results.values():
+            if not isinstance(question, Question):
+                continue
+            if question.prev_version_id is not None:
+                question_duplicates.remove(question.prev_version_id)
+            if question.is_latest and not question.deleted:
+                question_duplicates.add(
+                    question.id,  # type: ignore
+                    question.game_type_id,
+                    question.text,
+                )
+            else:
+                question_duplicates.remove(question.id)  # type: ignore
+        return results
+
+    @override
+    def get_related_services(self) -> dict[str, CommonServices]:
+        from domuwa.game_types.services import GameTypeServices
+        from domuwa.qna_categories.services import QnACategoryServices
+
+        return {
+            "game_type_id": GameTypeServices(),
+            "game_category_id": QnACategoryServices(),
+        }
@@ -0,0 +1,127 @@
+import bisect
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa.config import settings
+from domuwa.rankings.models import PlayerScore, Ranking
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    def __init__(self, totals: Mapping[int, float] | None = None) -> None:
+        # player id -> points
+        self._totals: dict[int, float] = dict(totals or {})
+        # (-points, player id) of every player, so the best players come first
+        self._keys = sorted(
+            (-points, player_id) for player_id, points in self._totals.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def add(self, player_id: int, points: float) -> None:
+        self.set(player_id, self._totals.get(player_id, 0.0) + points)
+
+    def set(self, player_id: int, points: float) -> None:
+        old_points = self._totals.get(player_id)
+        if old_points == points:
+            return
+        if old_points is not None:
+            del self._keys[bisect.bisect_left(self._keys, (-old_points, player_id))]
+        self._totals[player_id] = points
+        bisect.insort(self._keys, (-points, player_id))
+
+    def top(self, count: int, offset: int = 0) -> list[tuple[int, int, float]]:
+        # (rank, player id, points), players with the same points share a rank
+        entries = []
+        for neg_points, player_id in self._keys[offset : offset + count]:
+            entries.append((self._rank_of(neg_points), player_id, -neg_points))
+        return entries
+
+    def get_rank(self, player_id: int) -> tuple[int, float] | None:
+        points = self._totals.get(player_id)
+        if points is None:
+            return None
+        return self._rank_of(-points), points
+
+    def _rank_of(self, neg_points: float) -> int:
+        return bisect.bisect_left(self._keys, (neg_points,)) + 1
+
+
+class LeaderboardRegistry:
+    def __init__(self, max_age: float, max_game_rooms: int) -> None:
+        # scores written by other workers only show up once the global leaderboard
+        # is reloaded, after `max_age` seconds
+        self.max_age = max_age
+        self.max_game_rooms = max_game_rooms
+        self._global: Leaderboard | None = None
+        self._loaded_at = 0.0
+        self._game_rooms: OrderedDict[int, Leaderboard] = OrderedDict()
+
+    async def get_global(self, session: AsyncSession) -> Leaderboard:
+        if self._global is None or time.monotonic() - self._loaded_at > self.max_age:
+            await self.load(session)
+        return self._global  # type: ignore
+
+    async def get_game_room(
+        self, game_room_id: int, session: AsyncSession
+    ) -> Leaderboard:
+        leaderboard = self._game_rooms.get(game_room_id)
+        if leaderboard is None:
+            result = await session.exec(
+                select(PlayerScore.player_id, PlayerScore.points)
+                .join(Ranking, col(PlayerScore.ranking_id) == Ranking.id)
+                .where(Ranking.game_room_id == game_room_id)
+            )
+            leaderboard = Leaderboard(dict(result.all()))  # type: ignore
+            self._game_rooms[game_room_id] = leaderboard
+            while len(self._game_rooms) > self.max_game_rooms:
+                self._game_rooms.popitem(last=False)
+        self._game_rooms.move_to_end(game_room_id)
+        return leaderboard
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.exec(
+            select(PlayerScore.player_id, func.sum(PlayerScore.points))
+            .where(col(PlayerScore.player_id).is_not(None))
+            .group_by(col(PlayerScore.player_id))
+        )
+        self._global = Leaderboard(dict(result.all()))  # type: ignore
+        self._loaded_at = time.monotonic()
+        logger.debug("loaded the leaderboard of %d players", len(self._global))
+
+    def record_scores(
+        self,
+        game_room_id: int,
+        old_scores: Mapping[int, float],
+        new_scores: Mapping[int, float],
+    ) -> None:
+        # the global totals only move by the difference to what was saved before
+        if self._global is not None:
+            for player_id, points in new_scores.items():
+                self._global.add(player_id, points - old_scores.get(player_id, 0.0))
+
+        leaderboard = self._game_rooms.get(game_room_id)
+        if leaderboard is not None:
+            for player_id, points in new_scores.items():
+                leaderboard.set(player_id, points)
+
+    def invalidate(self, game_room_ids: Iterable[int] = ()) -> None:
+        self._global = None
+        for game_room_id in game_room_ids:
+            self._game_rooms.pop(game_room_id, None)
+
+    def clear(self) -> None:
+        self._global = None
+        self._game_rooms.clear()
+
+
+leaderboards = LeaderboardRegistry(
+    settings.LEADERBOARD_MAX_AGE_SECONDS, settings.LEADERBOARD_MAX_GAME_ROOMS
+)
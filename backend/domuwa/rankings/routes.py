@@ -0,0 +1,50 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa import auth
+from domuwa.auth import User
+from domuwa.core.exceptions import ModelNotFoundHttpException
+from domuwa.database import get_db_session
+from domuwa.rankings.leaderboard import leaderboards
+from domuwa.rankings.schemas import LeaderboardEntry
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+
+@router.get("/", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    user: Annotated[User, Depends(auth.get_current_active_user)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100)] = 25,
+):
+    del user
+    leaderboard = await leaderboards.get_global(session)
+    return [
+        LeaderboardEntry(rank=rank, player_id=player_id, points=points)
+        for rank, player_id, points in leaderboard.top(
+            page_size, (page - 1) * page_size
+        )
+    ]
+
+
+@router.get("/players/{player_id}", response_model=LeaderboardEntry)
+async def get_player_rank(
+    player_id: int,
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    user: Annotated[User, Depends(auth.get_current_active_user)],
+):
+    del user
+    leaderboard = await leaderboards.get_global(session)
+    player_rank = leaderboard.get_rank(player_id)
+    if player_rank is None:
+        err_msg = f"Player(id={player_id}) has no scores"
+        logger.warning(err_msg)
+        raise ModelNotFoundHttpException(err_msg)
+
+    rank, points = player_rank
+    return LeaderboardEntry(rank=rank, player_id=player_id, points=points)
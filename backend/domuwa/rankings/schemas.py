@@ -0,0 +1,8 @@
+from domuwa.core.schemas import APISchemaModel
+
+
+class LeaderboardEntry(APISchemaModel):
+    # players with the same points share a rank
+    rank: int
+    player_id: int
+    points: float
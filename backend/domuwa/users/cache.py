@@ -0,0 +1,57 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from domuwa.config import settings
+from domuwa.users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._users: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> User | None:
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._users[username]
+                return None
+            self._users.move_to_end(username)
+            return user
+
+    def set(self, user: User) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        # detached copy without relationships, so it can be merged into any session
+        cached_user = User(**user.model_dump())
+        make_transient_to_detached(cached_user)
+        with self._lock:
+            self._users[user.username] = (time.monotonic() + self.ttl, cached_user)
+            self._users.move_to_end(user.username)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, *usernames: str) -> None:
+        with self._lock:
+            for username in usernames:
+                self._users.pop(username, None)
+        logger.debug("invalidated cached %s(username=%s)", User.__name__, usernames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
@@ -2,7 +2,7 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa import auth
@@ -24,7 +24,9 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
 
     @override
     async def create(
-        self, model: UserCreate, session: Annotated[Session, Depends(get_db_session)]
+        self,
+        model: UserCreate,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         return await super().create(model, session)
 
@@ -32,7 +34,7 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
     def get_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         del model_id
         del session
@@ -41,7 +43,7 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
     async def get_active_by_id(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         _: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         self.logger.debug("got %s(id=%d) to get", User.__name__, model_id)
@@ -61,7 +63,7 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
         self,
         model_id: int,
         model_update: UserUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         del model_id
         del model_update
@@ -72,7 +74,7 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
         self,
         model_id: int,
         model_update: UserUpdate,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         current_user: Annotated[User, Depends(auth.get_current_active_user)],
     ):
         self.logger.debug(
@@ -95,7 +97,7 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
     async def delete(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
     ):
         del model_id
         del session
@@ -104,7 +106,7 @@ class UserRouter(CommonRouter[UserServices, UserCreate, UserUpdate, User]):
     async def delete_as_admin(
         self,
         model_id: int,
-        session: Annotated[Session, Depends(get_db_session)],
+        session: Annotated[AsyncSession, Depends(get_db_session)],
         _: Annotated[User, Depends(auth.get_admin_user)],
     ):
         return await super()._delete(model_id, session)
@@ -1,14 +1,16 @@
 import logging
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
-from domuwa.auth.security import get_password_hash
+from domuwa.auth.security import password_hasher
 from domuwa.core.exceptions import InvalidModelInputError
 from domuwa.core.services import CommonServices
 from domuwa.players.schemas import PlayerCreate
 from domuwa.players.services import PlayerServices
+from domuwa.users.cache import user_cache
 from domuwa.users.models import User
 from domuwa.users.schemas import UserCreate, UserUpdate
 
@@ -17,13 +19,14 @@ class UserServices(CommonServices[UserCreate, UserUpdate, User]):
     db_model_type = User
     logger = logging.getLogger(__name__)
 
-    async def get_by_username(self, username: str, session: Session):
-        return session.exec(
+    async def get_by_username(self, username: str, session: AsyncSession):
+        result = await session.exec(
             select(self.db_model_type).where(self.db_model_type.username == username)
-        ).first()  # type: ignore
+        )
+        return result.first()  # type: ignore
 
     @override
-    async def create(self, model: UserCreate, session: Session) -> User:
+    async def create(self, model: UserCreate, session: AsyncSession) -> User:
         user = await self.get_by_username(model.username, session)
         if user is not None:
             err_msg = f"{self.db_model_type.__name__}(username={model.username}) already exists"
@@ -32,7 +35,7 @@ class UserServices(CommonServices[UserCreate, UserUpdate, User]):
 
         user = self.db_model_type.model_validate(
             model,
-            update={"hashed_password": get_password_hash(model.password)},
+            update={"hashed_password": await password_hasher.hash(model.password)},
         )
         user = await self.save(user, session)
         assert user.id is not None
@@ -41,22 +44,27 @@ class UserServices(CommonServices[UserCreate, UserUpdate, User]):
 
     @override
     async def update(
-        self, model: User, model_update: UserUpdate, session: Session
+        self, model: User, model_update: UserUpdate, session: AsyncSession
     ) -> User:
+        username = model.username
         update_data = model_update.model_dump(exclude_unset=True)
         extra_data: dict[str, Any] = {}
         if "password" in update_data:
             password = update_data["password"]
-            hashed_password = get_password_hash(password)
+            hashed_password = await password_hasher.hash(password)
             extra_data["hashed_password"] = hashed_password
         model.sqlmodel_update(update_data, update=extra_data)
-        return await self.save(model, session)
+        try:
+            return await self.save(model, session)
+        finally:
+            user_cache.invalidate(username, model.username)
 
     @override
-    async def delete(self, model: User, session: Session):
+    async def delete(self, model: User, session: AsyncSession):
         model.is_active = False
         session.add(model)
-        session.commit()
+        await session.commit()
+        user_cache.invalidate(model.username)
         self.logger.debug(
             "marked %s(id=%d) as inactive", self.db_model_type.__name__, model.id
         )
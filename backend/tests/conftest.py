@@ -1,15 +1,23 @@
+import itertools
 import logging
 import warnings
+from pathlib import Path
 
 import pytest
 from factory.alchemy import SQLAlchemyModelFactory
 from httpx import ASGITransport, AsyncClient
-from sqlmodel import SQLModel, Session, create_engine
-from sqlmodel.pool import StaticPool
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from domuwa import database as db
-from domuwa.database import create_db_and_tables
+from domuwa.core.services import CommonServicesForEnumModels
+from domuwa.database import create_db_and_tables, create_db_engine
 from domuwa.main import app
+from domuwa.metrics.requests import request_metrics
+from domuwa.questions.deck import question_deck
+from domuwa.questions.duplicates import question_duplicates
+from domuwa.rankings.leaderboard import leaderboards
+from domuwa.users.cache import user_cache
 from domuwa.users.schemas import UserCreate
 from domuwa.users.services import UserServices
 from tests.utils import UserData, get_authorization_headers, get_default_user_data
@@ -22,38 +30,59 @@ logging.getLogger("passlib").setLevel(logging.ERROR)
 
 warnings.filterwarnings(action="ignore", category=DeprecationWarning)
 
-# SQLALCHEMY_DATABASE_URL = "sqlite:///test_database.db"
-SQLALCHEMY_DATABASE_URL = "sqlite://"
-
 user_services = UserServices()
 
 
-@pytest.fixture(name="db_session")
-def db_session_fixture():
-    from tests import factories  # noqa: F401
+@pytest.fixture(name="database_url")
+def database_url_fixture(tmp_path: Path):
+    # a file is needed, as the sync factories and async services use separate engines
+    return f"sqlite:///{tmp_path / 'test_database.db'}"
+
 
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    SQLModel.metadata.drop_all(engine)
-    create_db_and_tables(engine)
+@pytest.fixture(name="factories_session")
+def factories_session_fixture(database_url: str):
+    from tests import factories  # noqa: F401
 
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
     db_sess = Session(engine)
 
     for factory in SQLAlchemyModelFactory.__subclasses__():
         factory._meta.sqlalchemy_session = db_sess  # type: ignore
-        factory._meta.sqlalchemy_session_persistence = "commit"
+        factory._meta.sqlalchemy_session_persistence = "commit"  # type: ignore
 
     yield db_sess
 
     db_sess.rollback()
     db_sess.close()
+    engine.dispose()
+
+
+@pytest.fixture(name="db_session")
+async def db_session_fixture(database_url: str, factories_session: Session):
+    del factories_session
+
+    engine = create_db_engine(database_url)
+    await create_db_and_tables(engine)
+    # each test has its own database, so lookup tables cached by a previous one are stale
+    for services_type in CommonServicesForEnumModels.__subclasses__():
+        services_type.invalidate_cache()
+    user_cache.clear()
+    question_deck.clear()
+    question_duplicates.clear()
+    leaderboards.clear()
+    request_metrics.clear()
+
+    db_sess = AsyncSession(engine, expire_on_commit=False)
+
+    yield db_sess
+
+    await db_sess.rollback()
+    await db_sess.close()
+    await engine.dispose()
 
 
 @pytest.fixture(name="api_client")
-async def api_client_fixture(db_session: Session):
+async def api_client_fixture(db_session: AsyncSession):
     def override_get_db_session():
         return db_session
 
@@ -69,30 +98,45 @@ async def api_client_fixture(db_session: Session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(name="app_sessions")
+def _app_sessions_fixture(
+    api_client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # the app opens its own sessions on the test database, as it does when served,
+    # instead of sharing the one of the test
+    del api_client
+    test_engine = db_session.bind
+    app.dependency_overrides.pop(db.get_db_session)
+    monkeypatch.setattr(db, "engine", test_engine)
+    monkeypatch.setattr(db, "_read_engines", itertools.cycle([test_engine]))
+
+
 @pytest.fixture(name="user_data")
-async def user_data_fixture(db_session: Session):
+async def user_data_fixture(db_session: AsyncSession):
     user_data = get_default_user_data()
     await user_services.create(UserCreate(**user_data), db_session)
     return user_data
 
 
 @pytest.fixture(name="inactive_user_data")
-async def inactive_user_data_fixture(db_session: Session):
+async def inactive_user_data_fixture(db_session: AsyncSession):
     user_data = get_default_user_data()
     inactive_user = await user_services.create(UserCreate(**user_data), db_session)
     inactive_user.is_active = False
     db_session.add(inactive_user)
-    db_session.commit()
+    await db_session.commit()
     return user_data
 
 
 @pytest.fixture(name="admin_user_data")
-async def admin_user_data_fixture(db_session: Session):
+async def admin_user_data_fixture(db_session: AsyncSession):
     user_data = get_default_user_data()
     admin_user = await user_services.create(UserCreate(**user_data), db_session)
     admin_user.is_staff = True
     db_session.add(admin_user)
-    db_session.commit()
+    await db_session.commit()
     return user_data
 
 
@@ -3,6 +3,7 @@ from factory.alchemy import SQLAlchemyModelFactory
 
 from domuwa.answers.models import Answer
 from domuwa.game_categories.models import GameCategory, GameCategoryChoices
+from domuwa.game_rooms.models import GameRoom
 from domuwa.game_types.models import GameType, GameTypeChoices
 from domuwa.players.models import Player
 from domuwa.qna_categories.constants import QnACategoryChoices
@@ -74,3 +75,13 @@ class GameCategoryFactory(SQLAlchemyModelFactory):
     class Meta:
         model = GameCategory
         sqlalchemy_get_or_create = ("name",)
+
+
+class GameRoomFactory(SQLAlchemyModelFactory):
+    rounds = 3
+    cur_round = 0
+    game_type_id: int
+    game_category_id: int
+
+    class Meta:
+        model = GameRoom
@@ -5,7 +5,8 @@ import pytest
 from fastapi import status
 from httpx import AsyncClient
 from pydantic.alias_generators import to_snake
-from sqlmodel import SQLModel, Session
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from domuwa.core.exceptions import ModelNotFoundError
 from domuwa.core.services import CommonServices
@@ -39,7 +40,9 @@ class CommonTestCase(ABC, Generic[DbModelT]):
     ) -> None:
         pass
 
-    async def assert_valid_delete(self, model_id: int, db_session: Session) -> None:
+    async def assert_valid_delete(
+        self, model_id: int, db_session: AsyncSession
+    ) -> None:
         with pytest.raises(ModelNotFoundError):
             await self.services.get_by_id(model_id, db_session)
 
@@ -55,7 +58,7 @@ class CommonTestCase(ABC, Generic[DbModelT]):
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -131,7 +134,7 @@ class CommonTestCase(ABC, Generic[DbModelT]):
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -2,11 +2,12 @@ from typing import TYPE_CHECKING, Any
 
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa.answers.models import Answer
 from domuwa.answers.services import AnswerServices
+from domuwa.core.pagination import NEXT_CURSOR_HEADER, KeysetPagination
 from tests.factories import (
     AnswerFactory,
     GameTypeFactory,
@@ -16,6 +17,7 @@ from tests.factories import (
     UserFactory,
 )
 from tests.routers import CommonTestCase
+from tests.utils import explain_query_plan, record_queries
 
 if TYPE_CHECKING:
     from domuwa.game_types.models import GameType
@@ -56,7 +58,9 @@ class TestAnswer(CommonTestCase[Answer]):
         assert response_data["game_category"]["id"] == model.game_category.id  # type: ignore
 
     @override
-    async def assert_valid_delete(self, model_id: int, db_session: Session) -> None:
+    async def assert_valid_delete(
+        self, model_id: int, db_session: AsyncSession
+    ) -> None:
         answer = await self.services.get_by_id(model_id, db_session)
         assert answer is not None
         assert answer.deleted
@@ -123,7 +127,7 @@ class TestAnswer(CommonTestCase[Answer]):
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
     ):
         answer = self.build_model_with_question()
 
@@ -146,9 +150,11 @@ class TestAnswer(CommonTestCase[Answer]):
 
         db_answer = await self.services.get_by_id(response_data["id"], db_session)
         assert db_answer is not None
+        await db_session.refresh(db_answer, ["question"])
 
         question = db_answer.question
         assert question is not None
+        await db_session.refresh(question, ["answers"])
 
         answer_response_data = answer.model_dump(exclude={"id", "author_id"})
         answer_from_db_question_data = question.answers[0].model_dump(
@@ -156,6 +162,119 @@ class TestAnswer(CommonTestCase[Answer]):
         )
         assert answer_response_data == answer_from_db_question_data, question.answers
 
+    async def test_get_all_with_cursor(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        answers = [self.create_model()]
+        excluded_answer = AnswerFactory.create(
+            author_id=answers[0].author_id,
+            game_type_id=answers[0].game_type_id,
+            game_category_id=answers[0].game_category_id,
+            excluded=True,
+        )
+        answers += [self.create_model() for _ in range(4)]
+        expected_ids = [answer.id for answer in answers] + [excluded_answer.id]
+
+        received_ids = []
+        params: dict[str, int | str] = {"page_size": 2}
+        for _ in range(3):
+            response = await api_client.get(
+                self.path, params=params, headers=authorization_headers
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            received_ids += [answer["id"] for answer in response.json()]
+            params["after"] = response.headers[NEXT_CURSOR_HEADER]
+
+        assert received_ids == expected_ids, received_ids
+
+        response = await api_client.get(
+            self.path, params=params, headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == [], response.json()
+        assert NEXT_CURSOR_HEADER not in response.headers, response.headers
+
+    async def test_get_all_with_invalid_cursor(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        # a cursor has to hold a value of the type of each sort key
+        for cursor in (
+            "not a cursor",
+            KeysetPagination.encode_values([False]),
+            KeysetPagination.encode_values(["x", {}]),
+            KeysetPagination.encode_values([1, 1]),
+        ):
+            response = await api_client.get(
+                self.path,
+                params={"after": cursor},
+                headers=authorization_headers,
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+
+        response = await api_client.get(
+            self.path,
+            params={"after": KeysetPagination.encode_values([False, 1])},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+    async def test_get_all_query_plan(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        self.create_model()
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(self.path, headers=authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        statement, parameters = next(
+            query for query in queries if query[0].startswith("SELECT answer.id")
+        )
+        query_plan = await explain_query_plan(
+            db_session.bind,  # type: ignore
+            statement,
+            parameters,
+        )
+        assert "ix_answer_latest_excluded_id" in query_plan, query_plan
+        assert "TEMP B-TREE" not in query_plan, query_plan
+
+    async def test_search(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        answer = self.create_model()
+        match = AnswerFactory.create(
+            text="Your best friend's grandmother",
+            author_id=answer.author_id,
+            game_type_id=answer.game_type_id,
+            game_category_id=answer.game_category_id,
+        )
+        AnswerFactory.create(
+            text="Your grandmother's cat",
+            author_id=answer.author_id,
+            game_type_id=answer.game_type_id,
+            game_category_id=answer.game_category_id,
+            deleted=True,
+        )
+
+        response = await api_client.get(
+            f"{self.path}search",
+            params={"q": "GRANDMOTHER"},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["id"] for data in response_data] == [match.id], response_data
+        self.assert_valid_response_values(response_data[0], match)
+
     async def test_get_all_deleted_answers(
         self,
         api_client: AsyncClient,
@@ -201,6 +320,44 @@ class TestAnswer(CommonTestCase[Answer]):
         response_data = response.json()
         assert len(response_data) == expected_count, response_data
 
+    async def test_get_history(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        answer_ids = [self.create_model().id]
+        for new_text in ("first edit", "second edit"):
+            response = await api_client.patch(
+                f"{self.path}{answer_ids[-1]}",
+                json={"text": new_text},
+                headers=authorization_headers,
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            answer_ids.append(response.json()["id"])
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(
+                f"{self.path}{answer_ids[-1]}/history",
+                headers=authorization_headers,
+            )
+        statements = [statement for statement, _ in queries]
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["id"] for data in response_data] == answer_ids[::-1]
+        answer_statements = [
+            statement for statement in statements if "FROM answer" in statement
+        ]
+        assert len(answer_statements) == 1, answer_statements
+
+        response = await api_client.get(
+            f"{self.path}{answer_ids[-1]}/history",
+            params={"max_depth": 2},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert [data["id"] for data in response.json()] == answer_ids[:0:-1]
+
     # noinspection DuplicatedCode
     @override
     async def test_update(
@@ -245,11 +402,52 @@ class TestAnswer(CommonTestCase[Answer]):
         ), response_data
         assert response_data["game_category"]["name"] == answer.game_category.name  # type: ignore
 
+    async def test_update_excluded(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        answer = self.create_model()
+
+        response = await api_client.patch(
+            f"{self.path}{answer.id}",
+            json={"excluded": True},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["id"] == answer.id, response_data
+        assert response_data["excluded"], response_data
+
+        # the toggle is committed
+        db_answer = await db_session.get(Answer, answer.id, populate_existing=True)
+        assert db_answer is not None
+        assert db_answer.excluded
+
+    async def test_update_excluded_with_text(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        answer = self.create_model()
+
+        response = await api_client.patch(
+            f"{self.path}{answer.id}",
+            json={"excluded": True, "text": "new text"},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["id"] != answer.id, response_data
+        assert response_data["text"] == "new text", response_data
+        assert response_data["excluded"], response_data
+
     async def test_delete_answer_with_question(
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
     ):
         answer = self.create_model_with_question()
         answer_id = answer.id
@@ -269,6 +467,7 @@ class TestAnswer(CommonTestCase[Answer]):
 
         db_answer = await self.services.get_by_id(answer_id, db_session)
         assert db_answer is not None
+        await db_session.refresh(db_answer, ["question"])
 
         question = db_answer.question
         assert question is not None
@@ -1,8 +1,11 @@
+import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from domuwa.auth.security import password_hasher
 from domuwa.users.services import UserServices
-from tests.utils import UserData
+from tests.utils import UserData, record_queries
 
 
 class TestAuth:
@@ -20,6 +23,22 @@ class TestAuth:
         assert "accessToken" in response_data, response_data
         assert "tokenType" in response_data, response_data
 
+    async def test_login_for_access_token_password_hasher_busy(
+        self,
+        api_client: AsyncClient,
+        user_data: UserData,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(password_hasher, "max_workers", 0)
+        monkeypatch.setattr(password_hasher, "max_queue_size", 0)
+
+        response = await api_client.post(f"{self.path}token", data=user_data)  # type: ignore
+        response_data = response.json()
+        assert (
+            response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        ), response_data
+        assert "Retry-After" in response.headers, response.headers
+
     async def test_login_for_access_token_non_existing_user(
         self,
         api_client: AsyncClient,
@@ -38,6 +57,24 @@ class TestAuth:
         assert response.status_code == status.HTTP_200_OK, response_data
         assert "username" in response_data, response_data
 
+    async def test_get_current_user_cached(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        response = await api_client.get(f"{self.path}me", headers=authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.json()
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(
+                f"{self.path}me",
+                headers=authorization_headers,
+            )
+        statements = [statement for statement, _ in queries]
+        assert response.status_code == status.HTTP_200_OK, response.json()
+        assert statements == [], statements
+
     async def test_get_current_user_not_logged_in(self, api_client: AsyncClient):
         response = await api_client.get(f"{self.path}me")
         response_data = response.json()
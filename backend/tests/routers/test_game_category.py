@@ -1,6 +1,6 @@
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa.game_categories.constants import GameCategoryChoices
@@ -44,7 +44,7 @@ class TestGameCategory(CommonTestCase[GameCategory]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -206,7 +206,7 @@ class TestGameCategory(CommonTestCase[GameCategory]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -0,0 +1,909 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing_extensions import override
+
+from domuwa.auth.security import get_password_hash
+from domuwa.core.exceptions import StaleRoundError
+from domuwa.game_rooms import broadcast as broadcast_module
+from domuwa.game_rooms.broadcast import MemoryBroadcast, SocketBroadcast
+from domuwa.game_rooms.broker import BroadcastBroker
+from domuwa.game_rooms.engine import GameRoomRegistry
+from domuwa.game_rooms.models import GameRoom, GameRoomQuestionsLink
+from domuwa.game_rooms.schemas import GameRoomEvent, GameRoomSnapshot
+from domuwa.game_rooms.services import GameRoomServices
+from domuwa.game_types.constants import GameTypeChoices
+from domuwa.main import app
+from domuwa.players.models import Player
+from domuwa.rankings.models import PlayerScore
+from tests.factories import (
+    AnswerFactory,
+    GameCategoryFactory,
+    GameRoomFactory,
+    GameTypeFactory,
+    PlayerFactory,
+    QnACategoryFactory,
+    QuestionFactory,
+    UserFactory,
+)
+from tests.routers import CommonTestCase
+from tests.utils import (
+    UserData,
+    WebSocketClosedError,
+    WebSocketTestSession,
+    get_authorization_headers,
+    record_queries,
+)
+
+if TYPE_CHECKING:
+    from domuwa.answers.models import Answer
+    from domuwa.game_categories.models import GameCategory
+    from domuwa.game_types.models import GameType
+    from domuwa.qna_categories.models import QnACategory
+    from domuwa.questions.models import Question
+
+
+async def wait_for_subscription(broker: BroadcastBroker, channel: str) -> None:
+    for _ in range(100):
+        if channel in broker._channels:
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError(f"nobody subscribed to {channel}")
+
+
+class TestGameRoom(CommonTestCase[GameRoom]):
+    path = "/api/game-rooms/"
+    services = GameRoomServices()
+
+    @override
+    def assert_valid_response(self, response_data: dict) -> None:
+        response_data = self.response_keys_to_snake_case(response_data)
+        assert "id" in response_data, response_data
+        assert "rounds" in response_data, response_data
+        assert "cur_round" in response_data, response_data
+        assert "finished" in response_data, response_data
+        assert "game_type" in response_data, response_data
+        assert "game_category" in response_data, response_data
+
+    @override
+    def assert_valid_response_values(
+        self,
+        response_data: dict,
+        model: GameRoom,
+    ) -> None:
+        response_data = self.response_keys_to_snake_case(response_data)
+        assert response_data["id"] == model.id, response_data
+        assert response_data["rounds"] == model.rounds, response_data
+        assert response_data["cur_round"] == model.cur_round, response_data
+        assert response_data["finished"] == model.finished, response_data
+        assert response_data["game_type"]["id"] == model.game_type_id, response_data
+        assert (
+            response_data["game_category"]["id"] == model.game_category_id
+        ), response_data
+
+    @override
+    def build_model(self) -> GameRoom:
+        game_type: GameType = GameTypeFactory.create()
+        game_category: GameCategory = GameCategoryFactory.create()
+        return GameRoomFactory.build(
+            game_type_id=game_type.id,
+            game_category_id=game_category.id,
+        )
+
+    @override
+    def create_model(self) -> GameRoom:
+        game_type: GameType = GameTypeFactory.create()
+        game_category: GameCategory = GameCategoryFactory.create()
+        return GameRoomFactory.create(
+            game_type_id=game_type.id,
+            game_category_id=game_category.id,
+        )
+
+    @override
+    async def test_create(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+        *args,
+        **kwargs,
+    ):
+        model = self.build_model()
+
+        response = await api_client.post(
+            self.path,
+            json=model.model_dump(
+                include={"rounds", "game_type_id", "game_category_id"}
+            ),
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED, response.text
+        response_data = response.json()
+        self.assert_valid_response(response_data)
+        assert response_data["curRound"] == 0, response_data
+
+    async def test_create_non_existing_game_type(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        game_category: GameCategory = GameCategoryFactory.create()
+
+        response = await api_client.post(
+            self.path,
+            json={"rounds": 3, "gameTypeId": -1, "gameCategoryId": game_category.id},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+
+    @override
+    async def test_update(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        *args,
+        **kwargs,
+    ):
+        model = self.create_model()
+
+        response = await api_client.patch(
+            f"{self.path}{model.id}",
+            json={"rounds": 5},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json()["rounds"] == 5, response.json()
+
+    @override
+    async def test_delete(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+        *args,
+        **kwargs,
+    ):
+        model = self.create_model()
+
+        response = await api_client.delete(
+            f"{self.path}{model.id}",
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    async def test_delete_as_admin(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        await super().test_delete(api_client, admin_authorization_headers, db_session)
+
+    async def test_get_leaderboard(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        game_rooms = [self.create_model(), self.create_model()]
+        player_ids = [
+            PlayerFactory.create(id=UserFactory.create().id).id for _ in range(3)
+        ]
+        await self.services.save_round(
+            game_rooms[0].id,  # type: ignore
+            GameRoomSnapshot(
+                version=1, cur_round=1, scores={player_ids[0]: 2, player_ids[1]: 1}
+            ),
+            db_session,
+        )
+        await self.services.save_round(
+            game_rooms[1].id,  # type: ignore
+            GameRoomSnapshot(
+                version=1, cur_round=1, scores={player_ids[1]: 3, player_ids[2]: 2}
+            ),
+            db_session,
+        )
+
+        response = await api_client.get(
+            "/api/leaderboard/", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == [
+            {"rank": 1, "playerId": player_ids[1], "points": 4.0},
+            {"rank": 2, "playerId": player_ids[0], "points": 2.0},
+            {"rank": 2, "playerId": player_ids[2], "points": 2.0},
+        ], response.json()
+
+        # the leaderboard follows the saved rounds without summing the scores again
+        await self.services.save_round(
+            game_rooms[0].id,  # type: ignore
+            GameRoomSnapshot(
+                version=2, cur_round=2, scores={player_ids[0]: 5, player_ids[1]: 1}
+            ),
+            db_session,
+        )
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(
+                "/api/leaderboard/",
+                params={"page_size": 2},
+                headers=authorization_headers,
+            )
+        statements = [statement for statement, _ in queries]
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == [
+            {"rank": 1, "playerId": player_ids[0], "points": 5.0},
+            {"rank": 2, "playerId": player_ids[1], "points": 4.0},
+        ], response.json()
+        assert not any("player_score" in statement for statement in statements)
+
+        response = await api_client.get(
+            f"/api/leaderboard/players/{player_ids[2]}", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == {"rank": 3, "playerId": player_ids[2], "points": 2.0}
+
+        response = await api_client.get(
+            f"{self.path}{game_rooms[0].id}/leaderboard", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == [
+            {"rank": 1, "playerId": player_ids[0], "points": 5.0},
+            {"rank": 2, "playerId": player_ids[1], "points": 1.0},
+        ], response.json()
+
+    async def test_get_leaderboard_not_found(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        response = await api_client.get(
+            "/api/leaderboard/players/1", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+        response = await api_client.get(
+            f"{self.path}1/leaderboard", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+    async def test_save_round(self, db_session: AsyncSession):
+        game_room = self.create_model()
+        game_room_id: int = game_room.id  # type: ignore
+        question: Question = QuestionFactory.create(
+            game_type_id=game_room.game_type_id,
+            author_id=PlayerFactory.create(id=UserFactory.create().id).id,
+        )
+        player_ids = [
+            PlayerFactory.create(id=UserFactory.create().id).id for _ in range(10)
+        ]
+        scores = {player_id: 0.0 for player_id in player_ids}
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            await self.services.save_round(
+                game_room_id,
+                GameRoomSnapshot(
+                    version=1,
+                    cur_round=1,
+                    question_id=question.id,
+                    players=player_ids,
+                    scores=scores,
+                ),
+                db_session,
+            )
+        # the writes do not grow with the number of players
+        assert len(queries) <= 6, queries
+
+        scores.update({player_ids[0]: 2.0, player_ids[1]: 2.0, player_ids[2]: 1.0})
+        finished = GameRoomSnapshot(
+            version=2,
+            cur_round=3,
+            finished=True,
+            players=player_ids,
+            scores=scores,
+        )
+        await self.services.save_round(game_room_id, finished, db_session)
+        # the last player leaving saves the finished game again
+        await self.services.save_round(
+            game_room_id,
+            finished.model_copy(update={"version": 3, "players": []}),
+            db_session,
+        )
+        # an older snapshot, or another one of the same version, is rejected
+        for version in (2, 3):
+            with pytest.raises(StaleRoundError):
+                await self.services.save_round(
+                    game_room_id,
+                    GameRoomSnapshot(version=version, cur_round=3, finished=True),
+                    db_session,
+                )
+
+        db_game_room = await self.services.get_by_id(game_room_id, db_session)
+        await db_session.refresh(db_game_room)
+        assert db_game_room.version == 3
+        assert db_game_room.cur_round == 3
+        assert db_game_room.finished
+        players = await db_session.exec(
+            select(
+                Player.id, Player.games_played, Player.games_won, Player.game_room_id
+            )
+            .where(col(Player.id).in_(player_ids))
+            .order_by(col(Player.id))
+        )
+        assert players.all() == [
+            (player_id, 1, int(index < 2), None)
+            for index, player_id in enumerate(player_ids)
+        ]
+        assert await self.services.get_scores(game_room_id, db_session) == scores
+        result = await db_session.exec(
+            select(GameRoomQuestionsLink.question_id).where(
+                GameRoomQuestionsLink.game_room_id == game_room_id
+            )
+        )
+        assert result.all() == [question.id]
+
+    async def test_save_round_route(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        game_room = self.create_model()
+        player_id = PlayerFactory.create(id=UserFactory.create().id).id
+        snapshot = {"version": 1, "curRound": 1, "scores": {str(player_id): 1}}
+
+        response = await api_client.post(
+            f"{self.path}{game_room.id}/rounds",
+            json=snapshot,
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["version"] == 1, response_data
+        assert response_data["curRound"] == 1, response_data
+
+        response = await api_client.post(
+            f"{self.path}{game_room.id}/rounds",
+            json=snapshot | {"scores": {str(player_id): 2}},
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+        response = await api_client.post(
+            f"{self.path}9999/rounds",
+            json=snapshot,
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+    async def test_save_round_route_as_non_admin(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        game_room = self.create_model()
+        response = await api_client.post(
+            f"{self.path}{game_room.id}/rounds",
+            json={"version": 1, "curRound": 1},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    async def test_play(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        game_room = self.create_model()
+        game_room_id = game_room.id
+        qna_category: QnACategory = QnACategoryFactory.create()
+        author: Player = PlayerFactory.create(id=UserFactory.create().id)
+        questions: list[Question] = QuestionFactory.create_batch(
+            2,
+            game_type_id=game_room.game_type_id,
+            game_category_id=qna_category.id,
+            author_id=author.id,
+        )
+        answers: dict[int, list[Answer]] = {
+            question.id: AnswerFactory.create_batch(  # type: ignore
+                2,
+                game_type_id=game_room.game_type_id,
+                game_category_id=qna_category.id,
+                author_id=author.id,
+                question_id=question.id,
+            )
+            for question in questions
+        }
+        other_headers = await self.create_player_headers(api_client, "other_player")
+
+        path = f"{self.path}{game_room_id}/ws"
+        async with (
+            WebSocketTestSession(
+                app, path, self.token_query(authorization_headers)
+            ) as ws1,
+            WebSocketTestSession(app, path, self.token_query(other_headers)) as ws2,
+        ):
+            player_id = (await ws1.receive_json())["playerId"]
+            other_player_id = (await ws1.receive_json())["playerId"]
+            assert (await ws2.receive_json())["type"] == "join"
+
+            await ws1.send_json({"type": "next_round"})
+            question_ids = set()
+            for ws in (ws1, ws2):
+                event = await ws.receive_json()
+                assert event["type"] == "next_round", event
+                assert event["curRound"] == 1, event
+                question_ids.add(event["questionId"])
+            (question_id,) = question_ids
+            (other_question_id,) = set(answers) - question_ids
+
+            # the handler reads the next message only after the round is saved
+            await ws1.send_json({"type": "join"})
+            assert (await ws1.receive_json())["type"] == "error"
+
+            # only the answers to the question of the round count
+            for answer_id in (answers[other_question_id][0].id, 9999):
+                await ws1.send_json({"type": "answer", "answerId": answer_id})
+                assert (await ws1.receive_json())["type"] == "error"
+
+            answer_id = answers[question_id][0].id
+            with record_queries(db_session.bind) as queries:  # type: ignore
+                await ws1.send_json({"type": "answer", "answerId": answer_id})
+                await ws2.send_json({"type": "answer", "answerId": answer_id})
+                for ws in (ws1, ws2):
+                    assert (await ws.receive_json())["type"] == "answer"
+                    assert (await ws.receive_json())["type"] == "answer"
+            statements = [statement for statement, _ in queries]
+            # the answers are checked, but nothing is written until the round ends
+            assert all(
+                statement.startswith("SELECT") for statement in statements
+            ), statements
+
+            # the question always comes from the deck of the room
+            await ws2.send_json({"type": "next_round", "questionId": question_id})
+            for ws in (ws1, ws2):
+                event = await ws.receive_json()
+                assert event["type"] == "next_round", event
+                assert event["curRound"] == 2, event
+                assert event["questionId"] == other_question_id, event
+                assert event["scores"] == {
+                    str(player_id): 1.0,
+                    str(other_player_id): 1.0,
+                }, event
+            await ws2.send_json({"type": "join"})
+            assert (await ws2.receive_json())["type"] == "error"
+
+            db_game_room = await self.services.get_by_id(game_room_id, db_session)  # type: ignore
+            await db_session.refresh(db_game_room)
+            assert db_game_room.cur_round == 2
+            result = await db_session.exec(
+                select(Player.id).where(Player.game_room_id == game_room_id)
+            )
+            assert set(result.all()) == {player_id, other_player_id}
+
+        player_ids = await db_session.exec(
+            select(Player.id).where(Player.game_room_id == game_room_id)
+        )
+        assert player_ids.all() == []
+        scores = await db_session.exec(
+            select(PlayerScore.player_id, PlayerScore.points)
+        )
+        assert sorted(scores.all()) == sorted(
+            [(player_id, 1.0), (other_player_id, 1.0)]
+        )
+        linked_question_ids = await db_session.exec(
+            select(GameRoomQuestionsLink.question_id).where(
+                GameRoomQuestionsLink.game_room_id == game_room_id
+            )
+        )
+        assert set(linked_question_ids.all()) == set(answers)
+
+    async def test_play_across_workers(self, db_session: AsyncSession):
+        game_room = self.create_model()
+        qna_category: QnACategory = QnACategoryFactory.create()
+        players: list[Player] = [
+            PlayerFactory.create(id=UserFactory.create().id) for _ in range(2)
+        ]
+        questions: list[Question] = QuestionFactory.create_batch(
+            2,
+            game_type_id=game_room.game_type_id,
+            game_category_id=qna_category.id,
+            author_id=players[0].id,
+        )
+        answers: dict[int, Answer] = {
+            question.id: AnswerFactory.create(  # type: ignore
+                game_type_id=game_room.game_type_id,
+                game_category_id=qna_category.id,
+                author_id=players[0].id,
+                question_id=question.id,
+            )
+            for question in questions
+        }
+
+        broker = BroadcastBroker()
+        await broker.start()
+        registries = [
+            GameRoomRegistry(SocketBroadcast(broker.host, broker.port))
+            for _ in range(2)
+        ]
+        websockets = [FakeWebSocket() for _ in range(2)]
+        try:
+            states = []
+            for registry, player, websocket in zip(registries, players, websockets):
+                states.append(
+                    await registry.join(game_room, player.id, websocket, db_session)  # type: ignore
+                )
+            # the second worker got the first player from the first worker's state
+            assert states[1].players == {player.id for player in players}
+            assert (await websockets[0].receive_json())["type"] == "join"
+            assert (await websockets[0].receive_json())["type"] == "join"
+            assert (await websockets[1].receive_json())["type"] == "join"
+
+            await registries[0].handle(
+                states[0],
+                players[0].id,
+                GameRoomEvent(type="next_round"),  # type: ignore
+                db_session,
+            )
+            # the players answer once their worker started the round
+            for websocket in websockets:
+                assert (await websocket.receive_json())["type"] == "next_round"
+            answer = answers[states[1].question_id]  # type: ignore
+            for registry, state, player in zip(registries, states, players):
+                await registry.handle(
+                    state,
+                    player.id,
+                    GameRoomEvent(type="answer", answer_id=answer.id),  # type: ignore
+                    db_session,
+                )
+            await registries[1].handle(
+                states[1],
+                players[1].id,
+                GameRoomEvent(type="next_round"),  # type: ignore
+                db_session,
+            )
+
+            for websocket in websockets:
+                events = [await websocket.receive_json() for _ in range(3)]
+                assert [event["type"] for event in events] == [
+                    "answer",
+                    "answer",
+                    "next_round",
+                ], events
+                assert events[-1]["scores"] == {
+                    str(player.id): 1.0 for player in players
+                }, events
+
+            for registry, state, player in zip(registries, states, players):
+                await registry.leave(state, player.id, db_session)  # type: ignore
+        finally:
+            for registry in registries:
+                await registry.broadcast.disconnect()
+            await broker.close()
+
+        result = await db_session.exec(
+            select(PlayerScore.player_id, PlayerScore.points)
+        )
+        assert sorted(result.all()) == [(player.id, 1.0) for player in players]
+
+    @pytest.mark.usefixtures("app_sessions")
+    async def test_resync_rooms(self, db_session: AsyncSession):
+        game_room = self.create_model()
+        game_room_id: int = game_room.id  # type: ignore
+        player_id: int = PlayerFactory.create(id=UserFactory.create().id).id
+        registry = GameRoomRegistry(MemoryBroadcast())
+        state = await registry.join(game_room, player_id, FakeWebSocket(), db_session)  # type: ignore
+        state.answers[player_id] = 1
+
+        # a round saved by another worker, whose commands never got here
+        await self.services.save_round(
+            game_room_id,
+            GameRoomSnapshot(
+                version=1, cur_round=1, players=[player_id], scores={player_id: 2.0}
+            ),
+            db_session,
+        )
+        await registry.resync_rooms()
+        assert state.ready.is_set()
+        assert state.version == 1
+        assert state.cur_round == 1
+        assert state.players == {player_id}
+        assert state.scores == {player_id: 2.0}
+        assert state.answers == {}
+
+        await registry.leave(state, player_id, db_session)
+
+    async def test_broadcast_slow_subscriber(self):
+        broadcast = MemoryBroadcast()
+        slow_started = asyncio.Event()
+        received: asyncio.Queue[str] = asyncio.Queue()
+
+        async def slow_subscriber(message: str) -> None:
+            del message
+            slow_started.set()
+            await asyncio.Event().wait()
+
+        async def subscriber(message: str) -> None:
+            await received.put(message)
+
+        await broadcast.subscribe("slow", slow_subscriber)
+        await broadcast.subscribe("fast", subscriber)
+        try:
+            await broadcast.publish("slow", "stuck")
+            await asyncio.wait_for(slow_started.wait(), 1)
+            # the other room still gets its messages while the slow one hangs
+            await broadcast.publish("fast", "message")
+            assert await asyncio.wait_for(received.get(), 1) == "message"
+        finally:
+            await broadcast.unsubscribe("slow", slow_subscriber)
+            await broadcast.unsubscribe("fast", subscriber)
+
+    async def test_broadcast_backpressure(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(broadcast_module, "SUBSCRIBER_QUEUE_SIZE", 1)
+        broadcast = MemoryBroadcast()
+        release = asyncio.Event()
+        received: asyncio.Queue[str] = asyncio.Queue()
+
+        async def subscriber(message: str) -> None:
+            await release.wait()
+            await received.put(message)
+
+        await broadcast.subscribe("room", subscriber)
+        try:
+            messages = [str(index) for index in range(4)]
+            publishing = asyncio.gather(
+                *(broadcast.publish("room", message) for message in messages)
+            )
+            await asyncio.sleep(0.05)
+            # the queue is full, so the publishers wait rather than drop messages
+            assert not publishing.done()
+            release.set()
+            await asyncio.wait_for(publishing, 1)
+            received_messages = [
+                await asyncio.wait_for(received.get(), 1) for _ in messages
+            ]
+            assert sorted(received_messages) == messages
+        finally:
+            await broadcast.unsubscribe("room", subscriber)
+
+    async def test_broadcast_reconnects(self):
+        broker = BroadcastBroker()
+        await broker.start()
+        broadcast = SocketBroadcast(broker.host, broker.port)
+        broadcast.reconnect_delays = (0.05,) * 20
+        received: asyncio.Queue[str] = asyncio.Queue()
+        reconnected = asyncio.Event()
+
+        async def subscriber(message: str) -> None:
+            await received.put(message)
+
+        async def on_reconnect() -> None:
+            reconnected.set()
+
+        broadcast.add_reconnect_listener(on_reconnect)
+
+        try:
+            await broadcast.subscribe("room", subscriber)
+            await wait_for_subscription(broker, "room")
+            # a malformed line is dropped without losing the connection
+            await broker._publish("room", "first")
+            for writer in broker._channels["room"]:
+                writer.write(b"not json\n")
+            await broker._publish("room", "second")
+            assert await asyncio.wait_for(received.get(), 1) == "first"
+            assert await asyncio.wait_for(received.get(), 1) == "second"
+
+            await broker.close()
+            broker = BroadcastBroker(broker.host, broker.port)
+            await broker.start()
+            await wait_for_subscription(broker, "room")
+            # the subscriptions are restored on the new connection
+            await broadcast.publish("room", "third")
+            assert await asyncio.wait_for(received.get(), 1) == "third"
+            # and the listeners know the messages sent meanwhile are lost
+            await asyncio.wait_for(reconnected.wait(), 1)
+        finally:
+            await broadcast.unsubscribe("room", subscriber)
+            await broadcast.disconnect()
+            await broker.close()
+
+    async def test_draw_questions_concurrently(self, db_session: AsyncSession):
+        game_room = self.create_model()
+        game_room_id = game_room.id
+        qna_category: QnACategory = QnACategoryFactory.create()
+        author: Player = PlayerFactory.create(id=UserFactory.create().id)
+        questions: list[Question] = QuestionFactory.create_batch(
+            2,
+            game_type_id=game_room.game_type_id,
+            game_category_id=qna_category.id,
+            author_id=author.id,
+        )
+
+        async def draw() -> list[int]:
+            async with AsyncSession(db_session.bind) as session:
+                return await self.services.draw_questions(game_room_id, 1, session)  # type: ignore
+
+        # rounds started at the same time get different questions
+        drawn_ids = await asyncio.gather(draw(), draw())
+        assert sorted(drawn_ids[0] + drawn_ids[1]) == sorted(
+            question.id for question in questions if question.id is not None
+        )
+        assert await draw() == []
+
+    async def test_draw_questions_after_conflict(
+        self,
+        db_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        game_room = self.create_model()
+        game_room_id: int = game_room.id  # type: ignore
+        qna_category: QnACategory = QnACategoryFactory.create()
+        author: Player = PlayerFactory.create(id=UserFactory.create().id)
+        QuestionFactory.create_batch(
+            2,
+            game_type_id=game_room.game_type_id,
+            game_category_id=qna_category.id,
+            author_id=author.id,
+        )
+        link_question = self.services._link_question
+        conflicts = [IntegrityError("INSERT", {}, Exception("conflict"))]
+
+        async def link_question_once(*args) -> bool:
+            if conflicts:
+                raise conflicts.pop()
+            return await link_question(*args)
+
+        monkeypatch.setattr(self.services, "_link_question", link_question_once)
+        # the rollback expires the room, which the retry must not load again
+        async with AsyncSession(db_session.bind) as session:
+            drawn_ids = await self.services.draw_questions(game_room_id, 2, session)
+        assert not conflicts
+        assert len(drawn_ids) == 2, drawn_ids
+
+    async def test_play_draws_questions(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        game_room = self.create_model()
+        game_room_id = game_room.id
+        qna_category: QnACategory = QnACategoryFactory.create()
+        author: Player = PlayerFactory.create(id=UserFactory.create().id)
+        questions: list[Question] = QuestionFactory.create_batch(
+            2,
+            game_type_id=game_room.game_type_id,
+            game_category_id=qna_category.id,
+            author_id=author.id,
+        )
+        for unplayable_question_data in (
+            {"deleted": True},
+            {"excluded": True},
+            {
+                "game_type_id": GameTypeFactory.create(
+                    name=GameTypeChoices.WHOS_MOST_LIKELY
+                ).id
+            },
+        ):
+            QuestionFactory.create(
+                **{
+                    "game_type_id": game_room.game_type_id,
+                    "game_category_id": qna_category.id,
+                    "author_id": author.id,
+                    **unplayable_question_data,
+                }
+            )
+
+        async with WebSocketTestSession(
+            app,
+            f"{self.path}{game_room_id}/ws",
+            self.token_query(authorization_headers),
+        ) as ws:
+            assert (await ws.receive_json())["type"] == "join"
+
+            played_question_ids = []
+            for _ in range(2):
+                await ws.send_json({"type": "next_round"})
+                event = await ws.receive_json()
+                assert event["type"] == "next_round", event
+                played_question_ids.append(event["questionId"])
+            assert sorted(played_question_ids) == sorted(
+                question.id for question in questions if question.id is not None
+            )
+
+            await ws.send_json({"type": "next_round"})
+            event = await ws.receive_json()
+            assert event["type"] == "error", event
+
+            response = await api_client.post(
+                "/api/questions/",
+                json={
+                    "text": "freshly added question",
+                    "gameTypeId": game_room.game_type_id,
+                    "gameCategoryId": qna_category.id,
+                },
+                headers=authorization_headers,
+            )
+            assert response.status_code == status.HTTP_201_CREATED, response.text
+
+            await ws.send_json({"type": "next_round"})
+            event = await ws.receive_json()
+            assert event["type"] == "next_round", event
+            assert event["questionId"] == response.json()["id"], event
+
+    async def test_play_answer_without_round(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        game_room = self.create_model()
+
+        async with WebSocketTestSession(
+            app,
+            f"{self.path}{game_room.id}/ws",
+            self.token_query(authorization_headers),
+        ) as ws:
+            assert (await ws.receive_json())["type"] == "join"
+
+            await ws.send_json({"type": "answer", "answerId": 1})
+            event = await ws.receive_json()
+            assert event["type"] == "error", event
+
+    async def test_play_not_logged_in(self, api_client: AsyncClient):
+        game_room = self.create_model()
+
+        with pytest.raises(WebSocketClosedError) as exc_info:
+            async with WebSocketTestSession(
+                app,
+                f"{self.path}{game_room.id}/ws",
+                "token=invalid",
+            ):
+                pass
+        assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
+
+    async def test_play_non_existing_game_room(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        with pytest.raises(WebSocketClosedError) as exc_info:
+            async with WebSocketTestSession(
+                app,
+                f"{self.path}-1/ws",
+                self.token_query(authorization_headers),
+            ):
+                pass
+        assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
+
+    @staticmethod
+    def token_query(authorization_headers: dict[str, str]) -> str:
+        return f"token={authorization_headers['Authorization'].removeprefix('Bearer ')}"
+
+    @staticmethod
+    async def create_player_headers(
+        api_client: AsyncClient,
+        username: str,
+    ) -> dict[str, str]:
+        user_data = UserData(username=username, password="<PASSWORD>")
+        user = UserFactory.create(
+            username=username,
+            hashed_password=get_password_hash(user_data["password"]),
+        )
+        PlayerFactory.create(id=user.id)
+        return await get_authorization_headers(api_client, user_data)
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.messages: asyncio.Queue[dict] = asyncio.Queue()
+
+    async def send_json(self, data: dict) -> None:
+        await self.messages.put(data)
+
+    async def receive_json(self) -> dict:
+        return await asyncio.wait_for(self.messages.get(), timeout=5)
@@ -2,12 +2,14 @@ from typing import TYPE_CHECKING
 
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
+from domuwa.core.pagination import NEXT_CURSOR_HEADER
 from domuwa.game_types.models import GameType, GameTypeChoices
 from domuwa.game_types.services import GameTypeServices
 from tests.factories import (
+    AnswerFactory,
     GameTypeFactory,
     PlayerFactory,
     QnACategoryFactory,
@@ -15,6 +17,7 @@ from tests.factories import (
     UserFactory,
 )
 from tests.routers import CommonTestCase
+from tests.utils import explain_query_plan, record_queries
 
 if TYPE_CHECKING:
     from domuwa.players.models import Player
@@ -56,7 +59,7 @@ class TestGameType(CommonTestCase[GameType]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -108,6 +111,35 @@ class TestGameType(CommonTestCase[GameType]):
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
 
+    async def test_bulk_create_non_unique_name(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        game_type: GameType = GameTypeFactory.create()
+
+        response = await api_client.post(
+            f"{self.path}bulk",
+            json=[
+                {"name": GameTypeChoices.WHOS_MOST_LIKELY},
+                {"name": game_type.name},
+            ],
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["statusCode"] for data in response_data] == [
+            status.HTTP_201_CREATED,
+            status.HTTP_400_BAD_REQUEST,
+        ], response_data
+
+        response = await api_client.get(self.path, headers=admin_authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert [data["name"] for data in response.json()] == [
+            game_type.name,
+            GameTypeChoices.WHOS_MOST_LIKELY,
+        ]
+
     @override
     async def test_get_all(
         self,
@@ -131,6 +163,44 @@ class TestGameType(CommonTestCase[GameType]):
         for game_type in response_data:
             self.assert_valid_response(game_type)
 
+    async def test_get_by_id_cached(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        game_type: GameType = GameTypeFactory.create(name=GameTypeChoices.EGO)
+        response = await api_client.get(
+            f"{self.path}{game_type.id}",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(
+                f"{self.path}{game_type.id}",
+                headers=admin_authorization_headers,
+            )
+        statements = [statement for statement, _ in queries]
+        assert response.status_code == status.HTTP_200_OK, response.text
+        game_type_statements = [
+            statement for statement in statements if "FROM game_type" in statement
+        ]
+        assert game_type_statements == [], game_type_statements
+
+        response = await api_client.patch(
+            f"{self.path}{game_type.id}",
+            json={"name": GameTypeChoices.WHOS_MOST_LIKELY},
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        response = await api_client.get(self.path, headers=admin_authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == [
+            {"id": game_type.id, "name": GameTypeChoices.WHOS_MOST_LIKELY}
+        ], response.json()
+
     async def test_get_all_questions(
         self,
         api_client: AsyncClient,
@@ -166,6 +236,116 @@ class TestGameType(CommonTestCase[GameType]):
         response_data = response.json()
         assert len(response_data) == expected_count, response_data
 
+    async def test_get_all_questions_with_cursor(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        game_type: GameType = GameTypeFactory.create()
+        game_category: QnACategory = QnACategoryFactory.create()
+        player: Player = PlayerFactory.create(id=UserFactory.create().id)
+        questions = QuestionFactory.create_batch(
+            5,
+            game_type_id=game_type.id,
+            game_category_id=game_category.id,
+            author_id=player.id,
+        )
+        expected_ids = sorted((question.id for question in questions), reverse=True)
+
+        response = await api_client.get(
+            f"{self.path}{game_type.id}/questions",
+            params={"page_size": 3},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        first_page_ids = [question["id"] for question in response.json()]
+
+        response = await api_client.get(
+            f"{self.path}{game_type.id}/questions",
+            params={"page_size": 3, "after": response.headers[NEXT_CURSOR_HEADER]},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        second_page_ids = [question["id"] for question in response.json()]
+        assert NEXT_CURSOR_HEADER not in response.headers, response.headers
+
+        assert first_page_ids + second_page_ids == expected_ids
+
+    async def test_get_all_questions_query_count(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        game_type: GameType = GameTypeFactory.create()
+        game_category: QnACategory = QnACategoryFactory.create()
+        for _ in range(25):
+            author: Player = PlayerFactory.create(id=UserFactory.create().id)
+            question = QuestionFactory.create(
+                game_type_id=game_type.id,
+                game_category_id=game_category.id,
+                author_id=author.id,
+            )
+            answer_author: Player = PlayerFactory.create(id=UserFactory.create().id)
+            AnswerFactory.create(
+                game_type_id=game_type.id,
+                game_category_id=game_category.id,
+                author_id=answer_author.id,
+                question_id=question.id,
+            )
+
+        # warm up the authenticated user cache, so it does not skew the first count
+        response = await api_client.get("/auth/me", headers=authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        query_counts = {}
+        for page_size in (5, 25):
+            db_session.expunge_all()
+            with record_queries(db_session.bind) as queries:  # type: ignore
+                response = await api_client.get(
+                    f"{self.path}{game_type.id}/questions",
+                    params={"page_size": page_size},
+                    headers=authorization_headers,
+                )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            assert len(response.json()) == page_size, response.json()
+            query_counts[page_size] = len(queries)
+
+        assert query_counts[5] == query_counts[25], query_counts
+
+    async def test_get_all_questions_query_plan(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        game_type: GameType = GameTypeFactory.create()
+        game_category: QnACategory = QnACategoryFactory.create()
+        player: Player = PlayerFactory.create(id=UserFactory.create().id)
+        QuestionFactory.create(
+            game_type_id=game_type.id,
+            game_category_id=game_category.id,
+            author_id=player.id,
+        )
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(
+                f"{self.path}{game_type.id}/questions",
+                headers=authorization_headers,
+            )
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        statement, parameters = next(
+            query for query in queries if query[0].startswith("SELECT question.id")
+        )
+        query_plan = await explain_query_plan(
+            db_session.bind,  # type: ignore
+            statement,
+            parameters,
+        )
+        assert "ix_question_latest_game_type_id_id" in query_plan, query_plan
+        assert "TEMP B-TREE" not in query_plan, query_plan
+
     async def test_get_all_deleted_questions(
         self,
         api_client: AsyncClient,
@@ -299,7 +479,7 @@ class TestGameType(CommonTestCase[GameType]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
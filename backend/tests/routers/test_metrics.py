@@ -0,0 +1,115 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domuwa import auth
+from domuwa.config import settings
+from domuwa.metrics.pool import MeteredPool
+from domuwa.metrics.prometheus import CONTENT_TYPE
+
+
+class TestMetrics:
+    path = "/api/metrics/"
+
+    async def test_get_pool_stats(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        response = await api_client.get(
+            f"{self.path}pools", headers=admin_authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [stats["engine"] for stats in response_data] == ["writer"]
+        wait_time = response_data[0]["waitTimeSeconds"]
+        assert wait_time["buckets"][-1]["upperBound"] is None, wait_time
+        assert wait_time["buckets"][-1]["count"] == wait_time["count"], wait_time
+
+        # the test database has its own engine, made the same way
+        pool = db_session.bind.pool  # type: ignore
+        assert isinstance(pool, MeteredPool)
+        assert pool.wait_time.count > 0
+
+    async def test_get_pool_stats_as_non_admin(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        response = await api_client.get(
+            f"{self.path}pools", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    async def test_get_prometheus_metrics(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(
+            auth, "settings", settings.model_copy(update={"METRICS_TOKEN": "scraper"})
+        )
+        for _ in range(2):
+            response = await api_client.get(
+                "/api/questions/", headers=authorization_headers
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+        response = await api_client.get(
+            f"{self.path}pools", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+        response = await api_client.get(
+            "/metrics", headers={"Authorization": "Bearer scraper"}
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.headers["content-type"] == CONTENT_TYPE
+        lines = response.text.splitlines()
+
+        # the routes are labelled by their path template and `BaseRouter` subclass
+        labels = 'method="GET",router="QuestionRouter",route="/api/questions/"'
+        assert f'domuwa_http_requests_total{{{labels},status="200"}} 2' in lines
+        assert f"domuwa_http_request_duration_seconds_count{{{labels}}} 2" in lines
+        assert f"domuwa_http_request_db_queries_count{{{labels}}} 2" in lines
+        query_buckets = [
+            line
+            for line in lines
+            if line.startswith(f"domuwa_http_request_db_queries_bucket{{{labels}")
+        ]
+        # every request reads the questions, so none ran without a query
+        assert query_buckets[0].endswith(" 0"), query_buckets
+        assert query_buckets[-1].endswith(" 2"), query_buckets
+
+        labels = 'method="GET",router="",route="/api/metrics/pools",status="403"'
+        assert f"domuwa_auth_failures_total{{{labels}}} 1" in lines
+        # the scrape itself is in flight while the metrics are rendered
+        assert 'domuwa_http_requests_in_flight{method="GET"} 1' in lines
+
+    async def test_get_prometheus_metrics_as_admin(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        response = await api_client.get("/metrics", headers=admin_authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.headers["content-type"] == CONTENT_TYPE
+
+    async def test_get_prometheus_metrics_unauthorized(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        response = await api_client.get("/metrics")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+
+        # without METRICS_TOKEN set, only an admin's token is accepted
+        response = await api_client.get(
+            "/metrics", headers={"Authorization": "Bearer scraper"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED, response.text
+
+        response = await api_client.get("/metrics", headers=authorization_headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
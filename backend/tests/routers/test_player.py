@@ -2,15 +2,32 @@ from typing import TYPE_CHECKING
 
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
-from domuwa.players.models import Player
+from domuwa.answers.schemas import AnswerCreate
+from domuwa.answers.services import AnswerServices
+from domuwa.database import set_sqlite_pragmas
+from domuwa.game_rooms.schemas import GameRoomSnapshot
+from domuwa.game_rooms.services import GameRoomServices
+from domuwa.players.models import Player, PlayerStats
 from domuwa.players.services import PlayerServices
-from tests.factories import PlayerFactory, UserFactory
+from domuwa.questions.models import Question
+from domuwa.questions.schemas import QuestionCreate, QuestionUpdate
+from domuwa.questions.services import QuestionServices
+from tests.factories import (
+    GameCategoryFactory,
+    GameRoomFactory,
+    GameTypeFactory,
+    PlayerFactory,
+    QnACategoryFactory,
+    QuestionFactory,
+    UserFactory,
+)
 from tests.routers import CommonTestCase
 
 if TYPE_CHECKING:
+    from domuwa.game_rooms.models import GameRoom
     from domuwa.users.models import User
 
 
@@ -51,7 +68,7 @@ class TestPlayer(CommonTestCase[Player]):
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -68,7 +85,7 @@ class TestPlayer(CommonTestCase[Player]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
     ):
         await super().test_create(api_client, admin_authorization_headers, db_session)
 
@@ -121,3 +138,169 @@ class TestPlayer(CommonTestCase[Player]):
         response_data = response.json()
         self.assert_valid_response(response_data)
         assert response_data["gamesWon"] == 1
+
+    async def test_bulk_delete_referenced(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        referenced_player = self.create_model()
+        db_session.add(
+            PlayerStats(
+                player_id=referenced_player.id,  # type: ignore
+                game_type_id=GameTypeFactory.create().id,
+            )
+        )
+        await db_session.commit()
+        player = self.create_model()
+        # the new connections check the foreign keys, so the referenced player
+        # cannot be deleted
+        engine = db_session.bind
+        set_sqlite_pragmas(engine, {"foreign_keys": "ON"})  # type: ignore
+        await engine.dispose()  # type: ignore
+
+        response = await api_client.request(
+            "DELETE",
+            f"{self.path}bulk",
+            json=[referenced_player.id, player.id],
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["statusCode"] for data in response_data] == [
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_204_NO_CONTENT,
+        ], response_data
+
+        players = await self.services.get_many(
+            {referenced_player.id, player.id},  # type: ignore
+            db_session,
+        )
+        assert list(players) == [referenced_player.id]
+
+    async def test_get_stats(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        players: list[Player] = [self.create_model() for _ in range(2)]
+        game_room: GameRoom = GameRoomFactory.create(
+            game_type_id=GameTypeFactory.create().id,
+            game_category_id=GameCategoryFactory.create().id,
+        )
+        QuestionFactory.create_batch(
+            2, game_type_id=game_room.game_type_id, author_id=players[0].id
+        )
+        await GameRoomServices().save_round(
+            game_room.id,  # type: ignore
+            GameRoomSnapshot(
+                version=1,
+                cur_round=game_room.rounds,
+                finished=True,
+                scores={players[0].id: 3.0, players[1].id: 1.0},
+            ),
+            db_session,
+        )
+
+        response = await api_client.get(
+            f"{self.path}{players[0].id}/stats", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        game_type_stats = {
+            "gamesPlayed": 1,
+            "gamesWon": 1,
+            "winRate": 1.0,
+            "averagePoints": 3.0,
+            "questionsAuthored": 2,
+            "answersAuthored": 0,
+        }
+        assert response.json() == {
+            "playerId": players[0].id,
+            **game_type_stats,
+            "gameTypes": [{"gameTypeId": game_room.game_type_id, **game_type_stats}],
+        }, response.json()
+
+        response = await api_client.get(
+            f"{self.path}{players[1].id}/stats", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["winRate"] == 0.0, response_data
+        assert response_data["averagePoints"] == 1.0, response_data
+
+        response = await api_client.get(
+            f"{self.path}{players[1].id + 1}/stats", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+    async def test_get_stats_authored(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        player = self.create_model()
+        card_data = {
+            "author_id": player.id,
+            "game_type_id": GameTypeFactory.create().id,
+            "game_category_id": QnACategoryFactory.create().id,
+        }
+        question_services = QuestionServices()
+        question = await question_services.create(
+            QuestionCreate(text="Have you ever been to Paris", **card_data), db_session
+        )
+        questions = await question_services.create_many(
+            [
+                QuestionCreate(text="Never have I ever eaten a bug", **card_data),
+                QuestionCreate(text="Who would rather sing in public", **card_data),
+            ],
+            db_session,
+        )
+        await question_services.delete(question, db_session)
+        await question_services.delete(question, db_session)
+        await AnswerServices().create(
+            AnswerCreate(text="answer text", **card_data), db_session
+        )
+        # a new version by another author moves the question to them
+        other_player = self.create_model()
+        result = questions[1]
+        for question_update in (
+            QuestionUpdate(text="Who would rather dance in public"),
+            QuestionUpdate(author_id=other_player.id, text="Who would rather sing"),
+        ):
+            assert isinstance(result, Question)
+            assert result.id is not None
+            [result] = await question_services.update_many(
+                [(result.id, question_update)], db_session
+            )
+
+        # the player authored cards without finishing a game
+        response = await api_client.get(
+            f"{self.path}{player.id}/stats", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["gamesPlayed"] == 0, response_data
+        assert response_data["questionsAuthored"] == 1, response_data
+        assert response_data["answersAuthored"] == 1, response_data
+        assert response_data["gameTypes"] == [
+            {
+                "gameTypeId": card_data["game_type_id"],
+                "gamesPlayed": 0,
+                "gamesWon": 0,
+                "winRate": 0.0,
+                "averagePoints": 0.0,
+                "questionsAuthored": 1,
+                "answersAuthored": 1,
+            }
+        ], response_data
+
+        response = await api_client.get(
+            f"{self.path}{other_player.id}/stats", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["questionsAuthored"] == 1, response_data
+        assert response_data["answersAuthored"] == 0, response_data
@@ -1,6 +1,6 @@
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa.qna_categories.constants import QnACategoryChoices
@@ -44,7 +44,7 @@ class TestQnACategory(CommonTestCase[QnACategory]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -204,7 +204,7 @@ class TestQnACategory(CommonTestCase[QnACategory]):
         self,
         api_client: AsyncClient,
         admin_authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -1,11 +1,26 @@
+import csv
+import io
+import itertools
+import json
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+import pytest
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlalchemy import inspect
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from domuwa import database as db
+from domuwa.config import settings
+from domuwa.core.pagination import NEXT_CURSOR_HEADER
+from domuwa.database import create_db_and_tables, create_db_engine
+from domuwa.game_types.constants import GameTypeChoices
+from domuwa.questions.duplicates import question_duplicates
 from domuwa.questions.models import Question
 from domuwa.questions.services import QuestionServices
+from domuwa.users.cache import user_cache
 from tests.factories import (
     AnswerFactory,
     GameTypeFactory,
@@ -15,8 +30,15 @@ from tests.factories import (
     UserFactory,
 )
 from tests.routers import CommonTestCase
+from tests.utils import (
+    count_checkouts,
+    explain_query_plan,
+    record_queries,
+)
 
 if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
     from domuwa.game_types.models import GameType
     from domuwa.players.models import Player
     from domuwa.qna_categories.models import QnACategory
@@ -50,8 +72,12 @@ class TestQuestion(CommonTestCase[Question]):
         assert response_data["game_type"]["id"] == model.game_type.id  # type: ignore
         assert response_data["game_category"]["id"] == model.game_category.id  # type: ignore
 
-    async def assert_valid_delete(self, model_id: int, db_session: Session) -> None:
-        question = await self.services.get_by_id(model_id, db_session)
+    async def assert_valid_delete(
+        self, model_id: int, db_session: AsyncSession
+    ) -> None:
+        question = await self.services.get_by_id(
+            model_id, db_session, self.services.read_with_answers_options
+        )
         assert question is not None
         assert question.deleted
         for answer in question.answers:
@@ -124,6 +150,808 @@ class TestQuestion(CommonTestCase[Question]):
         response_data = response.json()
         assert len(response_data) == expected_count, response_data
 
+    async def test_get_all_latest_versions(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question_id = self.create_model().id
+        for new_text in ("first edit", "second edit"):
+            response = await api_client.patch(
+                f"{self.path}{question_id}",
+                json={"text": new_text},
+                headers=authorization_headers,
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            question_id = response.json()["id"]
+
+        response = await api_client.get(self.path, headers=authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["id"] for data in response_data] == [question_id], response_data
+
+    async def test_upgrade_db(self, db_session: AsyncSession):
+        question = self.create_model()
+        new_version: Question = QuestionFactory.create(
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+            prev_version_id=question.id,
+        )
+        # the schema from before the latest versions were tracked, its partial
+        # indexes also covered the old versions
+        latest_index_names = {
+            "ix_question_latest_excluded_id",
+            "ix_question_latest_game_type_id_id",
+        }
+        engine: AsyncEngine = db_session.bind  # type: ignore
+        async with engine.begin() as conn:
+            for index_name in latest_index_names:
+                await conn.exec_driver_sql(f"DROP INDEX {index_name}")
+            await conn.exec_driver_sql("ALTER TABLE question DROP COLUMN is_latest")
+            await conn.exec_driver_sql(
+                "CREATE INDEX ix_question_live_excluded_id "
+                "ON question (excluded, id) WHERE deleted = 0"
+            )
+
+        # the upgrade is safe to run on every start
+        for _ in range(2):
+            await create_db_and_tables(engine)
+
+        result = await db_session.exec(
+            select(Question.id, Question.is_latest).order_by(col(Question.id))
+        )
+        assert result.all() == [(question.id, False), (new_version.id, True)]
+        async with engine.connect() as conn:
+            index_names = await conn.run_sync(
+                lambda sync_conn: {
+                    index["name"]
+                    for index in inspect(sync_conn).get_indexes("question")
+                }
+            )
+        assert latest_index_names <= index_names, index_names
+        assert "ix_question_live_excluded_id" not in index_names, index_names
+
+    @pytest.mark.usefixtures("app_sessions")
+    async def test_read_replica(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # the replica is a copy of the database made before the question was written
+        replica_path = tmp_path / "replica.db"
+        async with db_session.bind.connect() as conn:  # type: ignore
+            await conn.exec_driver_sql(f"VACUUM INTO '{replica_path}'")
+        replica_engine = create_db_engine(f"sqlite:///{replica_path}")
+        monkeypatch.setattr(db, "_read_engines", itertools.cycle([replica_engine]))
+        try:
+            question_id = self.create_model().id
+
+            response = await api_client.get(self.path, headers=authorization_headers)
+            assert response.status_code == status.HTTP_200_OK, response.text
+            assert response.json() == [], response.json()
+
+            response = await api_client.get(
+                f"{self.path}{question_id}", headers=authorization_headers
+            )
+            assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+            response = await api_client.patch(
+                f"{self.path}{question_id}",
+                json={"text": "edited on the writer"},
+                headers=authorization_headers,
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+        finally:
+            await replica_engine.dispose()
+
+    @pytest.mark.usefixtures("app_sessions")
+    async def test_connections_per_request(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        # the user is read again, so the auth needs the session too
+        user_cache.clear()
+        with count_checkouts(db_session.bind) as connections:  # type: ignore
+            response = await api_client.post(
+                self.path,
+                json=self.build_model().model_dump(),
+                headers=authorization_headers,
+            )
+        assert response.status_code == status.HTTP_201_CREATED, response.text
+        assert len(connections) == 1, connections
+
+        user_cache.clear()
+        with count_checkouts(db_session.bind) as connections:  # type: ignore
+            response = await api_client.get(
+                f"{self.path}{response.json()['id']}", headers=authorization_headers
+            )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert len(connections) == 1, connections
+
+    async def test_get_all_query_plan(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        self.create_model()
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(self.path, headers=authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        statement, parameters = next(
+            query for query in queries if query[0].startswith("SELECT question.id")
+        )
+        query_plan = await explain_query_plan(
+            db_session.bind,  # type: ignore
+            statement,
+            parameters,
+        )
+        assert "ix_question_latest_excluded_id" in query_plan, query_plan
+        assert "TEMP B-TREE" not in query_plan, query_plan
+
+    async def test_search(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        best_match = QuestionFactory.create(
+            text="Who drinks the most? Who drinks the least?",
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+        match = QuestionFactory.create(
+            text="Who drinks coffee with salt and pepper every single morning?",
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+        QuestionFactory.create(
+            text="Who drinks the fastest?",
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+            deleted=True,
+        )
+
+        received_ids = []
+        params: dict[str, str | int] = {"q": "who drink", "page_size": 1}
+        for _ in range(2):
+            response = await api_client.get(
+                f"{self.path}search", params=params, headers=authorization_headers
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            received_ids += [data["id"] for data in response.json()]
+            params["after"] = response.headers[NEXT_CURSOR_HEADER]
+
+        assert received_ids == [best_match.id, match.id], received_ids
+
+        response = await api_client.get(
+            f"{self.path}search", params=params, headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == [], response.json()
+
+    async def test_search_edited_question(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question_id = self.create_model().id
+        response = await api_client.patch(
+            f"{self.path}{question_id}",
+            json={"text": "Who would survive a zombie apocalypse?"},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        new_question_id = response.json()["id"]
+
+        response = await api_client.get(
+            f"{self.path}search",
+            params={"q": "zombie"},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["id"] for data in response_data] == [new_question_id]
+        self.assert_valid_response(response_data[0])
+
+    async def test_create_near_duplicate(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        original = QuestionFactory.create(
+            text="Never have I ever eaten a bug while camping",
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+        duplicate = QuestionFactory.build(
+            text="never have i ever eaten a bug, while camping!!",
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+        other_game_type: GameType = GameTypeFactory.create(
+            name=GameTypeChoices.NEVER_HAVE_I_EVER
+        )
+
+        response = await api_client.post(
+            self.path, json=duplicate.model_dump(), headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+        assert f"Question(id={original.id})" in response.json()["detail"]
+
+        response = await api_client.post(
+            self.path,
+            json=duplicate.model_dump() | {"game_type_id": other_game_type.id},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED, response.text
+
+        response = await api_client.delete(
+            f"{self.path}{original.id}", headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT, response.text
+        response = await api_client.post(
+            self.path, json=duplicate.model_dump(), headers=authorization_headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    async def test_get_history(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        question_ids = [self.create_model().id]
+        for new_text in ("first edit", "second edit"):
+            response = await api_client.patch(
+                f"{self.path}{question_ids[-1]}",
+                json={"text": new_text},
+                headers=authorization_headers,
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            question_ids.append(response.json()["id"])
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.get(
+                f"{self.path}{question_ids[-1]}/history",
+                headers=authorization_headers,
+            )
+        statements = [statement for statement, _ in queries]
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["id"] for data in response_data] == question_ids[::-1]
+        assert response_data[0]["prevVersionId"] == question_ids[1], response_data
+        question_statements = [
+            statement for statement in statements if "FROM question" in statement
+        ]
+        assert len(question_statements) == 1, question_statements
+
+        response = await api_client.get(
+            f"{self.path}{question_ids[-1]}/history",
+            params={"max_depth": 2},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert [data["id"] for data in response.json()] == question_ids[:0:-1]
+
+    async def test_get_history_not_found(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        response = await api_client.get(
+            f"{self.path}9999/history",
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+        live_question = self.create_model()
+        question: Question = QuestionFactory.create(
+            author_id=live_question.author_id,
+            game_type_id=live_question.game_type_id,
+            game_category_id=live_question.game_category_id,
+            deleted=True,
+        )
+        response = await api_client.get(
+            f"{self.path}{question.id}/history",
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+    async def test_get_history_deleted_as_admin(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        live_question = self.create_model()
+        question: Question = QuestionFactory.create(
+            author_id=live_question.author_id,
+            game_type_id=live_question.game_type_id,
+            game_category_id=live_question.game_category_id,
+            deleted=True,
+        )
+        response = await api_client.get(
+            f"{self.path}{question.id}/history",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.headers["content-type"] == "application/json"
+        assert [data["id"] for data in response.json()] == [question.id]
+
+    async def test_bulk_create(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        question = self.build_model()
+        question_data = question.model_dump(exclude={"id"})
+        # the near-duplicate index is read once, not on every write
+        await question_duplicates.load(db_session)
+
+        with record_queries(db_session.bind) as queries:  # type: ignore
+            response = await api_client.post(
+                f"{self.path}bulk",
+                json=[
+                    question_data,
+                    question_data | {"game_type_id": 9999},
+                    question_data | {"text": "another question"},
+                ],
+                headers=admin_authorization_headers,
+            )
+        statements = [statement for statement, _ in queries]
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["statusCode"] for data in response_data] == [
+            status.HTTP_201_CREATED,
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_201_CREATED,
+        ], response_data
+        # the authored counts of the players move in the same transaction
+        question_statements = [
+            statement
+            for statement in statements
+            if "question" in statement and "player_stats" not in statement
+        ]
+        assert all(
+            statement.startswith("INSERT INTO question")
+            for statement in question_statements
+        ), question_statements
+        assert len(question_statements) == 2, question_statements
+
+        response = await api_client.get(self.path, headers=admin_authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert [data["id"] for data in response.json()] == [
+            response_data[0]["id"],
+            response_data[2]["id"],
+        ]
+
+    async def test_bulk_create_near_duplicates(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        question_data = {
+            "text": question.text,
+            "author_id": question.author_id,
+            "game_type_id": question.game_type_id,
+            "game_category_id": question.game_category_id,
+        }
+        text = "Never have I ever eaten a bug while camping"
+
+        response = await api_client.post(
+            f"{self.path}bulk",
+            json=[
+                question_data | {"text": question.text.upper()},
+                question_data | {"text": text},
+                question_data
+                | {"text": "never have i ever eaten a bug, while camping!!"},
+            ],
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["statusCode"] for data in response_data] == [
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_201_CREATED,
+            status.HTTP_400_BAD_REQUEST,
+        ], response_data
+        assert f"Question(id={question.id})" in response_data[0]["detail"]
+        assert "item 1" in response_data[2]["detail"]
+
+    async def test_bulk_create_as_non_admin(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question = self.build_model()
+
+        response = await api_client.post(
+            f"{self.path}bulk",
+            json=[question.model_dump(exclude={"id"})],
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    async def test_bulk_update(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        AnswerFactory.create_batch(
+            2,
+            question_id=question.id,
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+        excluded_question = self.create_model()
+
+        response = await api_client.patch(
+            f"{self.path}bulk",
+            json=[
+                {"id": question.id, "text": "new text"},
+                {"id": excluded_question.id, "excluded": True},
+                {"id": 9999, "text": "new text"},
+            ],
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["statusCode"] for data in response_data] == [
+            status.HTTP_200_OK,
+            status.HTTP_200_OK,
+            status.HTTP_404_NOT_FOUND,
+        ], response_data
+        assert response_data[0]["id"] != question.id, response_data
+        assert response_data[1]["id"] == excluded_question.id, response_data
+
+        response = await api_client.get(
+            f"{self.path}{response_data[0]['id']}",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        updated_question = response.json()
+        assert updated_question["text"] == "new text", updated_question
+        assert updated_question["prevVersionId"] == question.id, updated_question
+        assert len(updated_question["answers"]) == 2, updated_question
+
+    async def test_bulk_update_excluded(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        other_question = self.create_model()
+
+        response = await api_client.patch(
+            f"{self.path}bulk",
+            json=[
+                {"id": question.id, "excluded": True, "text": "new text"},
+                {"id": other_question.id, "excluded": False},
+            ],
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        # the text still makes a new version, which is excluded as well
+        assert response_data[0]["id"] != question.id, response_data
+        # an unchanged flag is not a new version
+        assert response_data[1]["id"] == other_question.id, response_data
+
+        response = await api_client.get(
+            f"{self.path}{response_data[0]['id']}",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        updated_question = response.json()
+        assert updated_question["text"] == "new text", updated_question
+        assert updated_question["excluded"], updated_question
+
+        response = await api_client.get(
+            f"{self.path}{other_question.id}/history",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert len(response.json()) == 1, response.json()
+
+    async def test_bulk_delete(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+        db_session: AsyncSession,
+    ):
+        question = self.create_model()
+
+        response = await api_client.request(
+            "DELETE",
+            f"{self.path}bulk",
+            json=[question.id, 9999],
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert [data["statusCode"] for data in response_data] == [
+            status.HTTP_204_NO_CONTENT,
+            status.HTTP_404_NOT_FOUND,
+        ], response_data
+
+        deleted_question = await self.services.get_by_id(question.id, db_session)  # type: ignore
+        await db_session.refresh(deleted_question)
+        assert deleted_question.deleted
+
+    async def test_export(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        AnswerFactory.create_batch(
+            2,
+            question_id=question.id,
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+        QuestionFactory.create(
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+            deleted=True,
+        )
+
+        response = await api_client.get(
+            f"{self.path}export",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert len(lines) == 1, lines
+        question_data = json.loads(lines[0])
+        assert question_data["id"] == question.id, question_data
+        assert len(question_data["answers"]) == 2, question_data
+
+        response = await api_client.get(
+            f"{self.path}export",
+            params={"format": "csv", "include_deleted": True},
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["question_id"] for row in rows] == [
+            str(question.id),
+            str(question.id),
+            str(question.id + 1),  # type: ignore
+        ], rows
+        assert rows[2]["answer_id"] == "", rows
+
+    async def test_export_as_non_admin(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        response = await api_client.get(
+            f"{self.path}export",
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    async def test_import(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        game_type: GameType = GameTypeFactory.create()
+        game_category: QnACategory = QnACategoryFactory.create()
+        card = {
+            "text": "question text",
+            "gameType": game_type.name,
+            "gameCategory": game_category.name,
+            "answers": ["first answer", {"text": "second answer"}],
+        }
+        lines = [
+            json.dumps(card),
+            json.dumps(card | {"gameType": "unknown"}),
+            "{not json",
+            json.dumps(card | {"text": ""}),
+            json.dumps(card | {"text": "another question"}),
+        ]
+
+        response = await api_client.post(
+            f"{self.path}import",
+            params={"chunk_size": 1},
+            content="\n".join(lines),
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        report = response.json()
+        assert report["questions"] == 2, report
+        assert report["answers"] == 4, report
+        assert report["failed"] == 3, report
+        assert report["chunks"] == 2, report
+        assert [error["line"] for error in report["errors"]] == [2, 3, 4], report
+
+        response = await api_client.get(
+            f"{self.path}export", headers=admin_authorization_headers
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        questions = [json.loads(line) for line in response.text.splitlines()]
+        assert [len(question["answers"]) for question in questions] == [2, 2]
+
+    async def test_import_near_duplicates(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        game_type: GameType = GameTypeFactory.create()
+        game_category: QnACategory = QnACategoryFactory.create()
+        original = QuestionFactory.create(
+            text="Have you ever been to Paris on a rainy day",
+            game_type_id=game_type.id,
+            game_category_id=game_category.id,
+        )
+        card = {
+            "text": "Never have I ever eaten a bug while camping",
+            "gameType": game_type.name,
+            "gameCategory": game_category.name,
+        }
+        lines = [
+            json.dumps(card),
+            json.dumps(
+                card | {"text": "never have i ever eaten a bug, while camping!!"}
+            ),
+            json.dumps(card | {"text": original.text.lower()}),
+            json.dumps(card),
+        ]
+
+        response = await api_client.post(
+            f"{self.path}import",
+            params={"chunk_size": 2},
+            content="\n".join(lines),
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        report = response.json()
+        assert report["questions"] == 1, report
+        assert report["failed"] == 3, report
+        assert report["chunks"] == 2, report
+        errors = {error["line"]: error["detail"] for error in report["errors"]}
+        assert "line 1" in errors[2], report
+        assert f"Question(id={original.id})" in errors[3], report
+        assert "Question(id=" in errors[4], report
+
+    async def test_import_exported_csv(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+        AnswerFactory.create_batch(
+            2,
+            question_id=question.id,
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+            text='multi\nline "answer"',
+        )
+        other_question = QuestionFactory.create(
+            text="a completely different question",
+            author_id=question.author_id,
+            game_type_id=question.game_type_id,
+            game_category_id=question.game_category_id,
+        )
+
+        response = await api_client.get(
+            f"{self.path}export",
+            params={"format": "csv"},
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        # the exported questions would otherwise be rejected as near-duplicates
+        for question_id in (question.id, other_question.id):
+            delete_response = await api_client.delete(
+                f"{self.path}{question_id}", headers=admin_authorization_headers
+            )
+            assert delete_response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = await api_client.post(
+            f"{self.path}import",
+            params={"format": "csv"},
+            content=response.content,
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        report = response.json()
+        assert report["questions"] == 2, report
+        assert report["answers"] == 2, report
+        assert report["failed"] == 0, report
+
+    async def test_import_invalid_utf8(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        game_type: GameType = GameTypeFactory.create()
+        game_category: QnACategory = QnACategoryFactory.create()
+        card = {
+            "text": "Have you ever been to Paris",
+            "gameType": game_type.name,
+            "gameCategory": game_category.name,
+        }
+        ndjson_lines = [
+            json.dumps(card).encode(),
+            b'{"text": "caf\xe9"}',
+            json.dumps(card | {"text": "Never have I ever eaten a bug"}).encode(),
+        ]
+        csv_lines = [
+            b"game_type,game_category,question_text",
+            f"{game_type.name},{game_category.name},Who would rather sing".encode(),
+            f"{game_type.name},{game_category.name},caf\xe9".encode("latin-1"),
+        ]
+
+        for import_format, lines, questions, line in (
+            ("ndjson", ndjson_lines, 2, 2),
+            ("csv", csv_lines, 1, 3),
+        ):
+            response = await api_client.post(
+                f"{self.path}import",
+                params={"format": import_format},
+                content=b"\n".join(lines),
+                headers=admin_authorization_headers,
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            report = response.json()
+            assert report["questions"] == questions, report
+            assert report["failed"] == 1, report
+            [error] = report["errors"]
+            assert error["line"] == line, report
+            assert "invalid UTF-8: byte 0xe9" in error["detail"], report
+
+    async def test_import_as_non_admin(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        response = await api_client.post(
+            f"{self.path}import",
+            content="{}",
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
+    async def test_import_chunk_size_too_large(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        response = await api_client.post(
+            f"{self.path}import",
+            params={"chunk_size": settings.BULK_MAX_SIZE + 1},
+            content="{}",
+            headers=admin_authorization_headers,
+        )
+        assert (
+            response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        ), response.text
+
     # noinspection DuplicatedCode
     async def test_update(
         self,
@@ -165,12 +993,49 @@ class TestQuestion(CommonTestCase[Question]):
         ), response_data
         assert response_data["game_category"]["name"] == question.game_category.name  # type: ignore
 
+    async def test_update_excluded_with_text(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+
+        # toggling excluded does not drop the rest of the update
+        response = await api_client.patch(
+            f"{self.path}{question.id}",
+            json={"excluded": True, "text": "new text"},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["id"] != question.id, response_data
+        assert response_data["text"] == "new text", response_data
+        assert response_data["excluded"], response_data
+
+    async def test_update_unchanged(
+        self,
+        api_client: AsyncClient,
+        authorization_headers: dict[str, str],
+    ):
+        question = self.create_model()
+
+        # only the editor is set by the route, which is not a new version
+        response = await api_client.patch(
+            f"{self.path}{question.id}",
+            json={"text": question.text},
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert response_data["id"] == question.id, response_data
+        assert response_data["author"]["id"] == question.author_id, response_data
+
     # noinspection DuplicatedCode
     async def test_delete_with_answers(
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
     ):
         model = self.create_model()
         model_id = model.id
@@ -1,6 +1,6 @@
 from fastapi import status
 from httpx import AsyncClient
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing_extensions import override
 
 from domuwa.auth.security import get_password_hash
@@ -61,7 +61,7 @@ class TestUser(CommonTestCase[User]):
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -184,7 +184,7 @@ class TestUser(CommonTestCase[User]):
         self,
         api_client: AsyncClient,
         authorization_headers: dict[str, str],
-        db_session: Session,
+        db_session: AsyncSession,
         *args,
         **kwargs,
     ):
@@ -219,6 +219,33 @@ class TestUser(CommonTestCase[User]):
         )
         assert response.status_code == status.HTTP_204_NO_CONTENT, response.text
 
+    async def test_delete_user_as_admin_logs_user_out(
+        self,
+        api_client: AsyncClient,
+        admin_authorization_headers: dict[str, str],
+    ):
+        user_data = UserData(username="deleted_user", password="<PASSWORD>")
+        user: User = UserFactory.create(
+            username=user_data["username"],
+            hashed_password=get_password_hash(user_data["password"]),
+        )
+        authorization_headers = await get_authorization_headers(api_client, user_data)
+
+        response = await api_client.get("/auth/me", headers=authorization_headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+        response = await api_client.delete(
+            f"{self.path}{user.id}",
+            headers=admin_authorization_headers,
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT, response.text
+
+        response = await api_client.get(
+            f"{self.path}{user.id}",
+            headers=authorization_headers,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.text
+
     async def test_delete_non_existing_user_as_admin(
         self,
         api_client: AsyncClient,
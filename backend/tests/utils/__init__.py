@@ -1,6 +1,13 @@
+import asyncio
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import TypedDict
 
 from httpx import AsyncClient
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message
 
 
 class UserData(TypedDict):
@@ -20,3 +27,113 @@ async def get_authorization_headers(api_client: AsyncClient, user_data: UserData
     response_data = response.json()
     access_token = response_data["accessToken"]
     return {"Authorization": f"Bearer {access_token}"}
+
+
+@contextmanager
+def count_checkouts(engine: AsyncEngine) -> Iterator[list[object]]:
+    connections: list[object] = []
+
+    def checkout(dbapi_connection: object, *args) -> None:
+        connections.append(dbapi_connection)
+
+    event.listen(engine.sync_engine, "checkout", checkout)
+    try:
+        yield connections
+    finally:
+        event.remove(engine.sync_engine, "checkout", checkout)
+
+
+@contextmanager
+def record_queries(engine: AsyncEngine) -> Iterator[list[tuple[str, tuple]]]:
+    queries: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(
+        _conn: Connection,
+        _cursor: object,
+        statement: str,
+        parameters: tuple,
+        *args,
+    ) -> None:
+        queries.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def explain_query_plan(
+    engine: AsyncEngine,
+    statement: str,
+    parameters: tuple,
+) -> str:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}",
+            parameters,
+        )
+        return "\n".join(row.detail for row in result)
+
+
+class WebSocketClosedError(Exception):
+    def __init__(self, code: int, reason: str = "") -> None:
+        self.code = code
+        self.reason = reason
+        super().__init__(code, reason)
+
+
+class WebSocketTestSession:
+    # httpx has no websocket support, so the ASGI protocol is driven directly
+    # on the test's event loop, which keeps the async test session usable
+    def __init__(self, app: ASGIApp, path: str, query_string: str = "") -> None:
+        self.app = app
+        self.path = path
+        self.query_string = query_string
+        self._to_app: asyncio.Queue[Message] = asyncio.Queue()
+        self._from_app: asyncio.Queue[Message] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "WebSocketTestSession":
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "root_path": "",
+            "query_string": self.query_string.encode(),
+            "headers": [],
+            "client": ("localhost", 9000),
+            "server": ("test", 80),
+            "subprotocols": [],
+            "state": {},
+        }
+        self._task = asyncio.create_task(
+            self.app(scope, self._to_app.get, self._from_app.put)  # type: ignore
+        )
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._receive()
+        if message["type"] == "websocket.close":
+            await self._task
+            raise WebSocketClosedError(message["code"], message.get("reason", ""))
+        assert message["type"] == "websocket.accept", message
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        assert self._task is not None
+        if not self._task.done():
+            await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        await self._task
+
+    async def send_json(self, data: object) -> None:
+        await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json(self) -> dict:
+        message = await self._receive()
+        assert message["type"] == "websocket.send", message
+        return json.loads(message["text"])
+
+    async def _receive(self) -> Message:
+        return await asyncio.wait_for(self._from_app.get(), timeout=5)